@@ -0,0 +1,318 @@
+"""End-to-end benchmark of the decision path, against a generated dataset.
+
+Runs offline in a temporary directory (DB, logs, model registry, drift / similarity /
+velocity artifacts; removed afterwards unless --keep) and reports, per
+stage, n / mean / p50 / p95 / p99 / max latency (µs) and ops/s:
+
+- build_features, score_transaction (heuristic, trained model), DecisionEngine.decide
+- append_audit_jsonl, record_decision_event (inline writes and background writers)
+- decision_only (end to end)
+- compute_kpis at several decision_events sizes
+- POST /decision through an in-process ASGI client (sequential latency and
+  concurrent throughput)
+
+Results are written as JSON (with the git commit) so runs can be compared:
+
+    PYTHONPATH=src python benchmarks/bench_decision_path.py --out /tmp/after.json \
+        --compare /tmp/before.json --fail-over 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+# ------------------------------------------------------------------ helpers
+def _summary(lat_ns: List[int], wall_s: Optional[float] = None) -> Dict[str, Any]:
+    lat = sorted(lat_ns)
+    n = len(lat)
+
+    def pct(p: float) -> float:
+        return round(lat[min(n - 1, int(n * p))] / 1000.0, 1)
+
+    total_s = wall_s if wall_s is not None else sum(lat) / 1e9
+    return {
+        "n": n,
+        "mean_us": round(sum(lat) / n / 1000.0, 1),
+        "p50_us": pct(0.50),
+        "p95_us": pct(0.95),
+        "p99_us": pct(0.99),
+        "max_us": round(lat[-1] / 1000.0, 1),
+        "ops_per_s": round(n / total_s, 1) if total_s > 0 else None,
+    }
+
+
+def _bench(fn: Callable[[Any], Any], args: Sequence[Any], warmup: int = 50) -> Dict[str, Any]:
+    for a in args[:warmup]:
+        fn(a)
+    lat: List[int] = []
+    for a in args:
+        t0 = time.perf_counter_ns()
+        fn(a)
+        lat.append(time.perf_counter_ns() - t0)
+    return _summary(lat)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _load_dataset(users: int, transactions: int, seed: int) -> List[str]:
+    from fraudshield.data.bulk import load_synthetic
+    from fraudshield.data.synthetic import SyntheticConfig
+
+    load_synthetic(SyntheticConfig(users=users, transactions=transactions, seed=seed))
+    return [f"T{i:09d}" for i in range(transactions)]
+
+
+def _load_events(n: int, trans_ids: Sequence[str], seed: int) -> None:
+    """Replace decision_events with `n` events spread over the last 30 days."""
+    from fraudshield.data.bulk import bulk_load
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    decisions = ("ALLOW", "ALLOW", "ALLOW", "CHALLENGE", "DENY")
+
+    def chunks():
+        for lo in range(0, n, 50_000):
+            yield "decision_events", [
+                (
+                    f"bench-{i}",
+                    rng.choice(trans_ids),
+                    rng.choice(decisions),
+                    round(rng.random(), 4),
+                    "heuristic_baseline_v2",
+                    (now - timedelta(seconds=rng.randrange(30 * 86400))).strftime("%Y-%m-%d %H:%M:%S"),
+                )
+                for i in range(lo, min(lo + 50_000, n))
+            ]
+
+    bulk_load(chunks(), tables=["decision_events"], truncate=True)
+
+
+def _train_model() -> bool:
+    try:
+        from fraudshield.modeling.holder import get_model_holder
+        from fraudshield.modeling.train_supervised import train_and_register
+    except ImportError:
+        return False
+    try:
+        with contextlib.redirect_stdout(sys.stderr):  # keep stdout clean for the JSON report
+            train_and_register()
+    except ImportError:
+        return False
+    return get_model_holder().reload() is not None
+
+
+async def _bench_endpoint(trans_ids: Sequence[str], concurrency: int) -> Dict[str, Any]:
+    import httpx
+
+    from fraudshield.api.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def call(tid: str) -> int:
+                t0 = time.perf_counter_ns()
+                r = await client.post("/decision", json={"trans_id": tid})
+                r.raise_for_status()
+                return time.perf_counter_ns() - t0
+
+            for tid in trans_ids[:50]:
+                await call(tid)
+
+            sequential = [await call(tid) for tid in trans_ids]
+
+            sem = asyncio.Semaphore(concurrency)
+
+            async def bounded(tid: str) -> int:
+                async with sem:
+                    return await call(tid)
+
+            t0 = time.perf_counter()
+            concurrent = await asyncio.gather(*(bounded(t) for t in trans_ids))
+            wall = time.perf_counter() - t0
+
+    return {
+        "sequential": _summary(sequential),
+        f"concurrency_{concurrency}": _summary(list(concurrent), wall_s=wall),
+    }
+
+
+# ------------------------------------------------------------------ suite
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from fraudshield.core.workflow import build_features, decision_only
+    from fraudshield.decisioning.engine import DecisionEngine
+    from fraudshield.governance.audit import append_audit_jsonl, start_audit_writer, stop_audit_writer
+    from fraudshield.governance.events import record_decision_event, start_event_sink, stop_event_sink
+    from fraudshield.modeling.scoring import score_transaction
+    from fraudshield.monitoring.kpis import compute_kpis
+
+    t0 = time.perf_counter()
+    all_ids = _load_dataset(args.users, args.transactions, args.seed)
+    load_s = time.perf_counter() - t0
+
+    rng = random.Random(args.seed)
+    sample = rng.choices(all_ids, k=args.iterations)
+    features = [build_features(t) for t in sample]
+    engine = DecisionEngine()
+    results: Dict[str, Any] = {}
+
+    results["build_features"] = _bench(build_features, sample)
+    results["score_transaction.heuristic"] = _bench(score_transaction, features)
+    scores = [score_transaction(f).risk_score for f in features]
+    results["decision_engine.decide"] = _bench(lambda i: engine.decide(features[i], scores[i]), range(len(features)))
+
+    def audit(tid: str) -> None:
+        append_audit_jsonl(tid, "ALLOW", 0.1, "bench", [], [], extra={"api": "bench"})
+
+    def event(tid: str) -> None:
+        record_decision_event(tid, "ALLOW", 0.1, "bench")
+
+    results["append_audit_jsonl.inline"] = _bench(audit, sample)
+    results["record_decision_event.inline"] = _bench(event, sample)
+    results["decision_only.inline"] = _bench(decision_only, sample)
+
+    start_audit_writer()
+    start_event_sink()
+    try:
+        results["append_audit_jsonl.background"] = _bench(audit, sample)
+        results["record_decision_event.background"] = _bench(event, sample)
+        results["decision_only.background"] = _bench(decision_only, sample)
+    finally:
+        stop_event_sink()
+        stop_audit_writer()
+
+    # Whatever artifact the registry serves (joblib or `*.linear.json`), not necessarily sklearn.
+    if _train_model():
+        results["score_transaction.model"] = _bench(score_transaction, features)
+        results["decision_only.model"] = _bench(decision_only, sample)
+    else:
+        results["score_transaction.model"] = {"skipped": "scikit-learn/joblib not installed"}
+
+    for n in args.kpi_sizes:
+        _load_events(n, all_ids, args.seed)
+        results[f"compute_kpis.events_{n}"] = _bench(lambda _: compute_kpis(30), range(args.kpi_iterations), warmup=3)
+
+    endpoint_ids = rng.choices(all_ids, k=args.endpoint_requests)
+    results["api.post_decision"] = asyncio.run(_bench_endpoint(endpoint_ids, args.concurrency))
+
+    return {
+        "meta": {
+            "benchmark": "decision_path",
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": {"users": args.users, "transactions": args.transactions, "seed": args.seed},
+            "dataset_load_s": round(load_s, 2),
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+
+
+def _flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for k, v in results.items():
+        if isinstance(v, dict) and "p50_us" in v:
+            out[prefix + k] = v
+        elif isinstance(v, dict):
+            out.update(_flatten(v, prefix + k + "."))
+    return out
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], fail_over_pct: Optional[float]) -> int:
+    """Print p50/p99 deltas vs a baseline run; non-zero if any p50 regressed past the limit."""
+    cur, base = _flatten(current["results"]), _flatten(baseline["results"])
+    regressions = 0
+    print(f"\nvs {baseline['meta'].get('commit')} ({baseline['meta'].get('created_at')})", file=sys.stderr)
+    for name in sorted(cur.keys() & base.keys()):
+        deltas = []
+        for key in ("p50_us", "p99_us"):
+            b, c = base[name][key], cur[name][key]
+            deltas.append(100.0 * (c - b) / b if b else 0.0)
+        flag = ""
+        if fail_over_pct is not None and deltas[0] > fail_over_pct:
+            regressions += 1
+            flag = "  <-- regression"
+        print(f"  {name:<44} p50 {deltas[0]:+7.1f}%  p99 {deltas[1]:+7.1f}%{flag}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def _run_in(work: str, args: argparse.Namespace) -> Dict[str, Any]:
+    os.environ["FRAUDSHIELD_DB_PATH"] = os.path.join(work, "bench.db")
+    os.environ["LOGS_PATH"] = os.path.join(work, "logs")
+    os.environ["MODEL_REGISTRY_PATH"] = os.path.join(work, "models")
+    os.environ["REPORTS_PATH"] = os.path.join(work, "reports")
+    os.environ["DRIFT_PATH"] = os.path.join(work, "drift")
+    os.environ["SIMILARITY_INDEX_PATH"] = os.path.join(work, "similarity")
+    os.environ["VELOCITY_SNAPSHOT_PATH"] = os.path.join(work, "velocity_snapshot.json")
+    from fraudshield.data.pool import close_pools
+
+    try:
+        return run(args)
+    finally:
+        close_pools()  # release the DB files before the directory is removed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="FraudShield decision-path benchmark")
+    ap.add_argument("--users", type=int, default=20_000)
+    ap.add_argument("--transactions", type=int, default=200_000)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--iterations", type=int, default=2000)
+    ap.add_argument("--kpi-sizes", type=lambda s: [int(x) for x in s.split(",")], default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--kpi-iterations", type=int, default=50)
+    ap.add_argument("--endpoint-requests", type=int, default=1000)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--out", default="-", help="JSON results path (default: stdout)")
+    ap.add_argument("--compare", help="baseline JSON from a previous run")
+    ap.add_argument("--fail-over", type=float, help="exit 1 if any p50 regressed by more than this %%")
+    ap.add_argument("--keep", action="store_true", help="keep the work dir (DB, logs, artifacts) for inspection")
+    args = ap.parse_args()
+
+    if args.keep:
+        work = tempfile.mkdtemp(prefix="fraudshield-bench-")
+        print(f"Work dir kept at {work}", file=sys.stderr)
+        report = _run_in(work, args)
+    else:
+        # Holds a --transactions sized DB and up to max(--kpi-sizes) events.
+        with tempfile.TemporaryDirectory(prefix="fraudshield-bench-", ignore_cleanup_errors=True) as work:
+            report = _run_in(work, args)
+
+    text = json.dumps(report, indent=2)
+    if args.out == "-":
+        print(text)
+    else:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"✅ Wrote {args.out}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        sys.exit(compare(report, baseline, args.fail_over))
+
+
+if __name__ == "__main__":
+    main()
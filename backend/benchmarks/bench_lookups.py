@@ -0,0 +1,119 @@
+"""Micro-benchmark: per-lookup latency of the enrichment point lookups.
+
+Compares the previous pandas path (`pd.read_sql(...).iloc[0].to_dict()`) with the
+row-level path now used by `tools/enrichment.py`, against a throwaway SQLite DB.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_lookups.py --users 2000 --iterations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+
+def _seed(n_users: int, txns_per_user: int) -> list[str]:
+    from fraudshield.data.db import init_db
+    from fraudshield.data.pool import connection
+
+    init_db()
+    rng = random.Random(7)
+    users, txns, ips = [], [], []
+    for u in range(n_users):
+        uid = f"BU{u}"
+        ip = f"10.0.{u // 250}.{u % 250}"
+        users.append((uid, "Bench User", f"user{u}@ex.com", ip, rng.randint(1, 2000), "Gold", "US"))
+        ips.append((ip, rng.randint(0, 100), "BenchISP", rng.random() < 0.1))
+        for k in range(txns_per_user):
+            txns.append(
+                (f"BTX-{u}-{k}", uid, round(rng.uniform(5, 5000), 2), "Shop", ip, "A", "A",
+                 "2024-01-01 00:00:00")
+            )
+    with connection() as conn:
+        conn.executemany("INSERT OR REPLACE INTO users VALUES (?,?,?,?,?,?,?)", users)
+        conn.executemany("INSERT OR REPLACE INTO transactions VALUES (?,?,?,?,?,?,?,?)", txns)
+        conn.executemany("INSERT OR REPLACE INTO ip_intel VALUES (?,?,?,?)", ips)
+    return [t[0] for t in txns]
+
+
+def _legacy_lookup_transaction(trans_id: str) -> dict:
+    """The pre-row-path implementation (fresh connection + pandas DataFrame per call)."""
+    import sqlite3
+
+    import pandas as pd
+
+    from fraudshield.core.settings import settings
+
+    conn = sqlite3.connect(settings().db_path)
+    df = pd.read_sql(
+        """
+        SELECT t.trans_id, t.user_id, t.amount, t.merchant, t.device_ip, t.shipping_addr,
+               t.billing_addr, t.timestamp, u.name, u.email, u.home_ip, u.account_age_days,
+               u.vip_status, u.country
+        FROM transactions t JOIN users u ON t.user_id = u.user_id
+        WHERE t.trans_id = ?
+        """,
+        conn,
+        params=(trans_id,),
+    )
+    conn.close()
+    return df.iloc[0].to_dict() if not df.empty else {}
+
+
+def _time_us(fn, keys: list[str]) -> dict:
+    lat = []
+    for k in keys:
+        t0 = time.perf_counter_ns()
+        fn(k)
+        lat.append((time.perf_counter_ns() - t0) / 1000.0)
+    lat.sort()
+    return {
+        "n": len(lat),
+        "mean_us": round(statistics.fmean(lat), 1),
+        "p50_us": round(lat[len(lat) // 2], 1),
+        "p99_us": round(lat[min(len(lat) - 1, int(len(lat) * 0.99))], 1),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--users", type=int, default=2000)
+    ap.add_argument("--txns-per-user", type=int, default=5)
+    ap.add_argument("--iterations", type=int, default=2000)
+    args = ap.parse_args()
+
+    os.environ["FRAUDSHIELD_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+    from fraudshield.tools import enrichment as E
+
+    keys = _seed(args.users, args.txns_per_user)
+    sample = random.Random(11).choices(keys, k=args.iterations)
+
+    # Warm-up both paths (imports, page cache, statement cache).
+    for k in sample[:50]:
+        _legacy_lookup_transaction(k)
+        E.lookup_transaction(k)
+
+    report = {
+        "lookup_transaction": {
+            "pandas_fresh_connection": _time_us(_legacy_lookup_transaction, sample),
+            "row_path_pooled": _time_us(E.lookup_transaction, sample),
+        },
+        "lookup_ip_intel": {
+            "row_path_pooled": _time_us(E.lookup_ip_intel, [f"10.0.0.{i % 250}" for i in range(args.iterations)]),
+        },
+    }
+    before = report["lookup_transaction"]["pandas_fresh_connection"]["p50_us"]
+    after = report["lookup_transaction"]["row_path_pooled"]["p50_us"]
+    report["lookup_transaction"]["p50_speedup"] = round(before / after, 1) if after else None
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
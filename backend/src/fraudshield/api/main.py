@@ -1,27 +1,81 @@
 from __future__  import annotations
 from contextlib import asynccontextmanager
+from typing import List
 
-from fastapi import FastAPI, Depends, HTTPException, Header
+from fastapi import FastAPI, Depends, HTTPException, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from ..core.settings import settings
-from ..data.db import init_db
-from ..core.workflow import decision_only, investigate_optional
-from ..monitoring.kpis import compute_kpis
-from ..tools import enrichment as E
+from ..data.db import init_db, seed_demo
+from ..data.pool import close_pools, pool_stats
+from ..decisioning.engine import parse_rules
+from ..core.async_workflow import (
+    async_runtime_stats,
+    case_context_async,
+    decision_batch_async,
+    decision_only_async,
+    run_blocking,
+    shutdown_async_runtime,
+)
+from ..core.warmup import warm_up, warmup_stats
+from ..core.workflow import investigate_optional
+from ..governance.audit import audit_writer_stats, start_audit_writer, stop_audit_writer
+from ..governance.events import event_sink_stats, start_event_sink, stop_event_sink
+from ..modeling.holder import get_model_holder
+from ..modeling.shadow import compare_shadow, shadow_stats, start_shadow, stop_shadow
+from ..monitoring.drift import get_drift_monitor, start_drift, stop_drift
+from ..monitoring.kpi_cache import cached_kpis, get_kpi_cache
+from ..monitoring.metrics import CONTENT_TYPE, gauge_func, render_prometheus
+from ..tools.similarity import (
+    close_similarity_index,
+    get_similarity_index,
+    similarity_writer_stats,
+    start_similarity_writer,
+    stop_similarity_writer,
+)
+from ..tools.velocity import get_velocity_service, start_velocity, stop_velocity
 
 class DecisionRequest(BaseModel):
     trans_id: str
 
+class DecisionBatchRequest(BaseModel):
+    trans_ids: List[str] = Field(min_length=1)
+
 class InvestigateRequest(BaseModel):
     trans_id: str
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Production-friendly: always init DB on boot (demo)
+    # Reject a bad DECISION_RULES at boot instead of failing every /decision with a 500.
+    parse_rules(s.decision_rules)
+    # Apply pending schema migrations (no-op when up to date); demo seeding is opt-in.
     init_db()
+    if s.seed_demo_data:
+        seed_demo()
+    # Load the champion now: afterwards the holder only hot-swaps in the background,
+    # so scoring on the event loop never waits on a model load.
+    get_model_holder().reload()
+    start_velocity()
+    start_audit_writer()
+    start_event_sink()
+    start_drift()
+    start_shadow()
+    start_similarity_writer()
+    # Requests are only accepted after this yields, so warming here keeps cold-start
+    # cost (model load, DB connections, lazy imports) off the first live requests.
+    if s.warmup_on_start:
+        warm_up()
     yield
+    stop_similarity_writer()
+    stop_shadow()
+    stop_drift()
+    stop_event_sink()
+    stop_audit_writer()
+    stop_velocity()
+    shutdown_async_runtime()
+    close_similarity_index()
+    close_pools()
 
 app = FastAPI(title="FraudShield API", version="0.5.0", lifespan=lifespan)
 
@@ -36,6 +90,29 @@ if allow_origins:
         allow_headers=["*"],
     )
 
+# Scrape-time gauges over the same sources as /stats.
+gauge_func(
+    "fraudshield_db_pool_in_use",
+    "Pooled SQLite connections currently checked out.",
+    lambda: {(path,): st["in_use"] for path, st in pool_stats().items()},
+    ("db_path",),
+)
+gauge_func(
+    "fraudshield_writer_queue_depth",
+    "Records waiting in the background audit / event writers.",
+    lambda: {
+        (name,): st.get("queue_depth", 0)
+        for name, st in (("audit", audit_writer_stats()), ("events", event_sink_stats()))
+        if st.get("running")
+    },
+    ("writer",),
+)
+gauge_func(
+    "fraudshield_decisions_in_flight",
+    "Async decision pipelines currently running.",
+    lambda: {(): async_runtime_stats()["in_flight"]},
+)
+
 def verify_key(x_api_key: str | None = Header(default=None, alias="X-API-Key")):
     if s.api_key and x_api_key != s.api_key:
         raise HTTPException(status_code=401, detail="Invalid API key.")
@@ -46,32 +123,30 @@ def health():
     return {"status": "ok", "version": "0.5.0"}
 
 @app.post("/decision", dependencies=[Depends(verify_key)])
-def decision(req: DecisionRequest):
-    out = decision_only(req.trans_id)
+async def decision(req: DecisionRequest):
+    out = await decision_only_async(req.trans_id)
     if out.get("error"):
         raise HTTPException(status_code=404, detail=out["error"])
     return out
 
+@app.post("/decision/batch", dependencies=[Depends(verify_key)])
+async def decision_batch_endpoint(req: DecisionBatchRequest):
+    """Decide many transactions in one call; unknown IDs are reported per item."""
+    if len(req.trans_ids) > s.decision_batch_max:
+        raise HTTPException(
+            status_code=413,
+            detail=f"batch_too_large (max {s.decision_batch_max} trans_ids)",
+        )
+    return await decision_batch_async(req.trans_ids)
+
 
 @app.get("/case/{trans_id}", dependencies=[Depends(verify_key)])
-def case(trans_id: str):
+async def case(trans_id: str):
     """Fetch case context for the ops UI (PII redacted by default)."""
-    txn = E.lookup_transaction(trans_id)
-    if not txn.get("found"):
+    out = await case_context_async(trans_id)
+    if out is None:
         raise HTTPException(status_code=404, detail="transaction_not_found")
-
-    t = txn["transaction"]
-    user_id = t.get("user_id")
-
-    return {
-        "transaction_id": trans_id,
-        "transaction": t,
-        "user_history": E.lookup_user_history(user_id) if user_id else {},
-        "ip_intel": E.lookup_ip_intel(t.get("device_ip", "")),
-        "kyc": E.lookup_kyc(user_id) if user_id else {},
-        "disputes": E.lookup_disputes(user_id) if user_id else {},
-        "similar_cases": E.find_similar_cases_stub(trans_id),
-    }
+    return out
 
 @app.post("/investigate", dependencies=[Depends(verify_key)])
 def investigate(req: InvestigateRequest):
@@ -85,6 +160,51 @@ def investigate(req: InvestigateRequest):
         raise HTTPException(status_code=400, detail=out.get("message", "missing OPENAI_API_KEY"))
     return out
 
+@app.get("/stats", dependencies=[Depends(verify_key)])
+def stats():
+    """Runtime internals for operators (connection pool, caches, background writers)."""
+    velocity = get_velocity_service()
+    similarity = get_similarity_index()
+    return {
+        "db_pool": pool_stats(),
+        "model": get_model_holder().stats(),
+        "audit_writer": audit_writer_stats(),
+        "event_sink": event_sink_stats(),
+        "kpi_cache": get_kpi_cache().stats(),
+        "async": async_runtime_stats(),
+        "velocity": velocity.stats() if velocity is not None else {"mode": "sql"},
+        "drift": get_drift_monitor().stats(),
+        "shadow": shadow_stats(),
+        "warmup": warmup_stats(),
+        "similarity": similarity.stats() if similarity is not None else {"mode": "not_built"},
+        "similarity_writer": similarity_writer_stats(),
+    }
+
 @app.get("/kpis", dependencies=[Depends(verify_key)])
-def kpis(window_days: int = 30):
-    return compute_kpis(window_days=window_days)
+async def kpis(window_days: int = 30):
+    return await run_blocking(cached_kpis, window_days=window_days)
+
+@app.get("/drift", dependencies=[Depends(verify_key)])
+def drift():
+    """PSI / KS per model input and risk_score: current window vs the frozen reference."""
+    monitor = get_drift_monitor()
+    monitor.load_reference(s.drift_path)  # picks up references rebuilt by the CLI
+    return monitor.report()
+
+@app.post("/drift/reference", dependencies=[Depends(verify_key)])
+def drift_reference():
+    """Freeze the current window as the drift reference."""
+    monitor = get_drift_monitor()
+    ref = monitor.freeze()
+    monitor.save_reference(s.drift_path)
+    return {"frozen_at": ref["frozen_at"], "source": ref["source"], "n": sum(ref["histograms"]["risk_score"])}
+
+@app.get("/shadow", dependencies=[Depends(verify_key)])
+async def shadow(window_hours: int = 24):
+    """Champion vs challenger comparison over shadow-scored decisions."""
+    return {"runtime": shadow_stats(), **await run_blocking(compare_shadow, window_hours)}
+
+@app.get("/metrics", dependencies=[Depends(verify_key)])
+def metrics():
+    """Prometheus text exposition: per-stage latency histograms, decision counters, gauges."""
+    return Response(content=render_prometheus(), media_type=CONTENT_TYPE)
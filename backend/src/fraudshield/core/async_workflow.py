@@ -0,0 +1,184 @@
+"""Async request path for the API.
+
+The decision pipeline itself stays synchronous (sqlite3, joblib models); this module
+runs its blocking steps on a dedicated, bounded executor instead of Starlette's
+shared threadpool, so an `async def` handler only holds an event-loop task while it
+waits on I/O:
+
+- feature assembly (pooled DB reads) -> executor
+- scoring + rules (in-memory, microseconds) -> inline on the loop
+- event + audit persistence (queue submits to the background sinks) -> executor
+- case enrichments are independent lookups and run concurrently (`asyncio.gather`)
+
+At most DECISION_MAX_CONCURRENCY requests run the pipeline at once; further requests
+wait on a semaphore (FIFO) instead of piling up threads.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from ..monitoring.metrics import STAGE_SECONDS
+from ..tools import enrichment as E
+from .settings import settings
+from .workflow import (
+    after_decisions,
+    build_features,
+    decide_features,
+    decision_batch,
+    decision_packet,
+    persist_decision,
+)
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# asyncio primitives are bound to the loop they are first used on, so the limiter is
+# (re)created per running loop.
+_limiter: Optional[asyncio.Semaphore] = None
+_limiter_loop: Optional[asyncio.AbstractEventLoop] = None
+
+_in_flight = 0
+_waiting = 0
+_completed = 0
+_max_in_flight = 0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings().async_io_workers, thread_name_prefix="fraudshield-io"
+                )
+    return _executor
+
+
+def _get_limiter() -> asyncio.Semaphore:
+    global _limiter, _limiter_loop
+    loop = asyncio.get_running_loop()
+    if _limiter is None or _limiter_loop is not loop:
+        _limiter = asyncio.Semaphore(settings().decision_max_concurrency)
+        _limiter_loop = loop
+    return _limiter
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on the I/O executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(fn, *args, **kwargs))
+
+
+class _Slot:
+    """`async with _Slot():` bounds the number of pipelines in flight."""
+
+    async def __aenter__(self) -> None:
+        global _waiting, _in_flight, _max_in_flight
+        limiter = _get_limiter()
+        _waiting += 1
+        try:
+            await limiter.acquire()
+        finally:
+            _waiting -= 1
+        _in_flight += 1
+        _max_in_flight = max(_max_in_flight, _in_flight)
+
+    async def __aexit__(self, *exc: Any) -> None:
+        global _in_flight, _completed
+        _in_flight -= 1
+        _completed += 1
+        _get_limiter().release()
+
+
+def _persist_and_record(features: Dict[str, Any], score: Any, dec: Dict[str, Any]) -> Any:
+    out = persist_decision(features["trans_id"], score, dec)
+    after_decisions([features], [score], [out[0]])
+    return out
+
+
+async def decision_only_async(trans_id: str) -> Dict[str, Any]:
+    """Async equivalent of `workflow.decision_only` (same packet, same side effects)."""
+    async with _Slot():
+        t0 = time.perf_counter()
+        features = await run_blocking(build_features, trans_id)
+        if features.get("_error"):
+            return {"transaction_id": trans_id, "error": features["_error"]}
+
+        # Inline on the loop: pure CPU. The model holder never loads or stats here
+        # (hot reloads run on its background thread; see modeling/holder.py).
+        score, dec = decide_features(features)
+        event_id, audit_path = await run_blocking(_persist_and_record, features, score, dec)
+        # Includes executor hand-off time, unlike the per-stage timings.
+        STAGE_SECONDS.observe(time.perf_counter() - t0, "decision", "total")
+        return decision_packet(trans_id, score, dec, event_id, audit_path)
+
+
+async def decision_batch_async(trans_ids: List[str]) -> Dict[str, Any]:
+    """`workflow.decision_batch` off the event loop; counts as one in-flight pipeline."""
+    async with _Slot():
+        return await run_blocking(decision_batch, trans_ids)
+
+
+async def case_context_async(trans_id: str) -> Optional[Dict[str, Any]]:
+    """Case context for the ops UI; None when the transaction does not exist.
+
+    The transaction is fetched first (it yields user_id / device_ip); the remaining
+    lookups are independent and are awaited together.
+    """
+    async with _Slot():
+        txn = await run_blocking(E.lookup_transaction, trans_id)
+        if not txn.get("found"):
+            return None
+
+        t = txn["transaction"]
+        user_id = t.get("user_id")
+
+        async def _none() -> Dict[str, Any]:
+            return {}
+
+        user_history, ip_intel, kyc, disputes, similar = await asyncio.gather(
+            run_blocking(E.lookup_user_history, user_id) if user_id else _none(),
+            run_blocking(E.lookup_ip_intel, t.get("device_ip", "")),
+            run_blocking(E.lookup_kyc, user_id) if user_id else _none(),
+            run_blocking(E.lookup_disputes, user_id) if user_id else _none(),
+            run_blocking(E.find_similar_cases, trans_id),
+        )
+
+    return {
+        "transaction_id": trans_id,
+        "transaction": t,
+        "user_history": user_history,
+        "ip_intel": ip_intel,
+        "kyc": kyc,
+        "disputes": disputes,
+        "similar_cases": similar,
+    }
+
+
+def shutdown_async_runtime(wait: bool = True) -> None:
+    """Stop the I/O executor (API lifespan shutdown); it is recreated on next use."""
+    global _executor
+    with _executor_lock:
+        ex, _executor = _executor, None
+    if ex is not None:
+        ex.shutdown(wait=wait)
+
+
+def async_runtime_stats() -> Dict[str, Any]:
+    s = settings()
+    return {
+        "max_concurrency": s.decision_max_concurrency,
+        "io_workers": s.async_io_workers,
+        "in_flight": _in_flight,
+        "waiting": _waiting,
+        "max_in_flight": _max_in_flight,
+        "completed": _completed,
+    }
@@ -0,0 +1,150 @@
+"""Online feature assembly.
+
+All inputs for the decision path come back from ONE fused query:
+transaction ⋈ user ⋈ ip_intel plus the two velocity counts, each computed over a
+bounded time window (never over the user's whole history). Only the columns the
+features need are selected. With VELOCITY_MODE=memory the velocity subqueries are
+dropped and the counts come from the in-memory ring buffers (tools/velocity.py).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..data.rows import fetch_all, fetch_one
+from ..tools.velocity import VelocityService, get_velocity_service
+
+# Max bound parameters per IN (...) query (SQLite default limit is 999 on older builds).
+_BATCH_CHUNK = 500
+
+_FEATURE_COLUMNS = """
+        t.trans_id,
+        t.user_id,
+        t.amount,
+        t.merchant,
+        t.device_ip,
+        t.shipping_addr,
+        t.billing_addr,
+        u.home_ip,
+        u.account_age_days,
+        u.vip_status,
+        u.country,
+        ip.reputation_score,
+        ip.is_proxy"""
+
+_VELOCITY_COLUMNS = """,
+        (
+            SELECT COUNT(*) FROM transactions v
+            WHERE v.user_id = t.user_id AND v.timestamp >= datetime('now', '-1 hour')
+        ) AS txn_count_1h,
+        (
+            SELECT COUNT(*) FROM transactions v
+            WHERE v.user_id = t.user_id AND v.timestamp >= datetime('now', '-24 hour')
+        ) AS txn_count_24h"""
+
+_FEATURE_FROM = """
+    FROM transactions t
+    JOIN users u ON u.user_id = t.user_id
+    LEFT JOIN ip_intel ip ON ip.ip_address = t.device_ip
+"""
+
+# With SQL velocity (default) vs. VELOCITY_MODE=memory (counts from tools/velocity.py;
+# the rowid tells the counters whether they have seen this transaction yet).
+_FEATURE_SELECT = "    SELECT" + _FEATURE_COLUMNS + _VELOCITY_COLUMNS + _FEATURE_FROM
+_FEATURE_SELECT_NO_VELOCITY = "    SELECT t.rowid AS txn_rowid," + _FEATURE_COLUMNS + _FEATURE_FROM
+
+FEATURE_SQL = _FEATURE_SELECT + "    WHERE t.trans_id = ?\n"
+_FEATURE_SQL_NO_VELOCITY = _FEATURE_SELECT_NO_VELOCITY + "    WHERE t.trans_id = ?\n"
+
+
+def _with_memory_velocity(row: Dict[str, Any], svc: VelocityService) -> Dict[str, Any]:
+    v = svc.counts(row["user_id"])
+    row["txn_count_1h"] = v["txn_count_1h"]
+    row["txn_count_24h"] = v["txn_count_24h"]
+    return row
+
+
+def features_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Derive the model/rule features from one row of FEATURE_SQL."""
+    shipping = str(row.get("shipping_addr", "") or "").lower()
+    billing = str(row.get("billing_addr", "") or "").lower()
+
+    shipping_is_ff = ("freight forwarder" in shipping) or ("forwarder" in shipping)
+    ship_bill_mismatch = bool(shipping) and bool(billing) and (shipping != billing)
+
+    home_ip = str(row.get("home_ip", "") or "")
+    device_ip = str(row.get("device_ip", "") or "")
+    device_ip_mismatch = bool(home_ip) and bool(device_ip) and (home_ip != device_ip)
+
+    return {
+        "trans_id": row.get("trans_id"),
+        "user_id": row.get("user_id"),
+        "amount": float(row.get("amount", 0.0) or 0.0),
+        "merchant": row.get("merchant"),
+        "device_ip": device_ip,
+        "account_age_days": int(row.get("account_age_days", 0) or 0),
+        "vip_status": row.get("vip_status"),
+        "country": row.get("country"),
+        "txn_count_1h": int(row.get("txn_count_1h", 0) or 0),
+        "txn_count_24h": int(row.get("txn_count_24h", 0) or 0),
+        "ip_reputation_score": int(row.get("reputation_score", 0) or 0),
+        "ip_is_proxy": bool(row.get("is_proxy", False)),
+        "shipping_is_freight_forwarder": shipping_is_ff,
+        "ship_bill_mismatch": ship_bill_mismatch,
+        "device_ip_mismatch": device_ip_mismatch,
+    }
+
+
+def assemble_features(trans_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch and derive features for one transaction (one DB round trip).
+
+    Returns None if the transaction (or its user) does not exist.
+    """
+    svc = get_velocity_service()
+    row = fetch_one(FEATURE_SQL if svc is None else _FEATURE_SQL_NO_VELOCITY, (trans_id,))
+    if row is None:
+        return None
+    if svc is not None:
+        svc.catch_up(upto_rowid=row["txn_rowid"])
+        row = _with_memory_velocity(row, svc)
+    return features_from_row(row)
+
+
+def assemble_features_batch(trans_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Set-based variant of `assemble_features`: one query per chunk of IDs.
+
+    Returns {trans_id: features}; unknown IDs are simply absent.
+    """
+    svc = get_velocity_service()
+    select = _FEATURE_SELECT if svc is None else _FEATURE_SELECT_NO_VELOCITY
+
+    unique = list(dict.fromkeys(trans_ids))
+    rows: List[Dict[str, Any]] = []
+    for i in range(0, len(unique), _BATCH_CHUNK):
+        chunk = unique[i : i + _BATCH_CHUNK]
+        sql = select + f"    WHERE t.trans_id IN ({','.join('?' * len(chunk))})\n"
+        rows.extend(fetch_all(sql, chunk))
+
+    if svc is not None and rows:
+        svc.catch_up(upto_rowid=max(r["txn_rowid"] for r in rows))
+        rows = [_with_memory_velocity(r, svc) for r in rows]
+    return {r["trans_id"]: features_from_row(r) for r in rows}
+
+
+def scan_features(batch_size: int = 10_000, since_rowid: int = 0) -> Iterator[List[Dict[str, Any]]]:
+    """Stream features for every stored transaction, in rowid order, `batch_size` at a time.
+
+    For offline jobs (similarity index build). Velocity counts are NOT computed: they
+    are relative to "now", which is meaningless for historical rows.
+    """
+    sql = (
+        _FEATURE_SELECT_NO_VELOCITY.replace("SELECT", "SELECT t.rowid AS _rowid,", 1)
+        + "    WHERE t.rowid > ? ORDER BY t.rowid LIMIT ?\n"
+    )
+    last = since_rowid
+    while True:
+        rows = fetch_all(sql, (last, batch_size))
+        if not rows:
+            return
+        last = rows[-1]["_rowid"]
+        yield [features_from_row(r) for r in rows]
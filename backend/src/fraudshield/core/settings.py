@@ -24,6 +24,133 @@ class Settings(BaseModel):
     logs_path: str = Field(default_factory=lambda: os.getenv("LOGS_PATH", "logs"))
     reports_path: str = Field(default_factory=lambda: os.getenv("REPORTS_PATH", "reports"))
 
+    # Seed the U105 / TX-999 demo records at API boot (dev only; see `make db-seed`)
+    seed_demo_data: bool = Field(
+        default_factory=lambda: os.getenv("FRAUDSHIELD_SEED_DEMO", "false").strip().lower() == "true"
+    )
+
+    # SQLite connection pool (data/pool.py)
+    db_pool_size: int = Field(
+        default_factory=lambda: int(os.getenv("FRAUDSHIELD_DB_POOL_SIZE", "8"))
+    )
+    db_pool_timeout_s: float = Field(
+        default_factory=lambda: float(os.getenv("FRAUDSHIELD_DB_POOL_TIMEOUT_S", "30"))
+    )
+    db_busy_timeout_ms: int = Field(
+        default_factory=lambda: int(os.getenv("FRAUDSHIELD_DB_BUSY_TIMEOUT_MS", "5000"))
+    )
+    db_journal_mode: str = Field(
+        default_factory=lambda: os.getenv("FRAUDSHIELD_DB_JOURNAL_MODE", "WAL")
+    )
+    db_synchronous: str = Field(
+        default_factory=lambda: os.getenv("FRAUDSHIELD_DB_SYNCHRONOUS", "NORMAL")
+    )
+    # Negative values are KiB (SQLite convention): -16000 ~= 16 MB page cache per connection.
+    db_cache_size: int = Field(
+        default_factory=lambda: int(os.getenv("FRAUDSHIELD_DB_CACHE_SIZE", "-16000"))
+    )
+    db_mmap_size: int = Field(
+        default_factory=lambda: int(os.getenv("FRAUDSHIELD_DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+    )
+
+    # Model holder: how often (seconds) the scorer re-checks the registry pointer
+    model_reload_interval_s: float = Field(
+        default_factory=lambda: float(os.getenv("MODEL_RELOAD_INTERVAL_S", "2"))
+    )
+
+    # API warm-up (core/warmup.py): before the lifespan reports ready, load the model,
+    # open this many pooled DB connections and run one dummy decision
+    warmup_on_start: bool = Field(
+        default_factory=lambda: os.getenv("FRAUDSHIELD_WARMUP", "true").strip().lower() == "true"
+    )
+    warmup_db_connections: int = Field(
+        default_factory=lambda: int(os.getenv("FRAUDSHIELD_WARMUP_DB_CONNECTIONS", "4"))
+    )
+
+    # Shadow scoring (modeling/shadow.py): share of decisions re-scored by challenger
+    # models off the request path (0 disables), worker threads, queue bound
+    # (drop-on-overload) and max decision-to-shadow-score latency before work is dropped
+    shadow_sample_rate: float = Field(default_factory=lambda: float(os.getenv("SHADOW_SAMPLE_RATE", "0.1")))
+    shadow_workers: int = Field(default_factory=lambda: int(os.getenv("SHADOW_WORKERS", "2")))
+    shadow_queue_max: int = Field(default_factory=lambda: int(os.getenv("SHADOW_QUEUE_MAX", "2000")))
+    shadow_budget_ms: float = Field(default_factory=lambda: float(os.getenv("SHADOW_BUDGET_MS", "250")))
+
+    # Max transaction IDs accepted by POST /decision/batch
+    decision_batch_max: int = Field(
+        default_factory=lambda: int(os.getenv("DECISION_BATCH_MAX", "1000"))
+    )
+
+    # Decision policy (decisioning/engine.py): score cut-offs and enabled rule signals
+    # ("all", "none" or a comma list of RULE_* codes); try alternatives with decisioning/backtest.py
+    deny_threshold: float = Field(default_factory=lambda: float(os.getenv("DENY_THRESHOLD", "0.90")))
+    challenge_threshold: float = Field(default_factory=lambda: float(os.getenv("CHALLENGE_THRESHOLD", "0.70")))
+    decision_rules: str = Field(default_factory=lambda: os.getenv("DECISION_RULES", "all"))
+
+    # Velocity features (tools/velocity.py): "sql" = windowed COUNT(*) per decision,
+    # "memory" = per-user ring buffers warmed at startup, fed by tailing `transactions`
+    # and snapshotted to disk
+    velocity_mode: str = Field(default_factory=lambda: os.getenv("VELOCITY_MODE", "sql"))
+    velocity_snapshot_path: str = Field(
+        default_factory=lambda: os.getenv("VELOCITY_SNAPSHOT_PATH", "artifacts/velocity_snapshot.json")
+    )
+    velocity_snapshot_interval_s: float = Field(
+        default_factory=lambda: float(os.getenv("VELOCITY_SNAPSHOT_INTERVAL_S", "300"))
+    )
+    # How often (seconds) the counters tail new `transactions` rows (0 = on demand only)
+    velocity_tail_interval_s: float = Field(
+        default_factory=lambda: float(os.getenv("VELOCITY_TAIL_INTERVAL_S", "1"))
+    )
+
+    # Audit log writer (governance/audit.py)
+    # - audit_mode: "async" = background group commit once started by the API, "sync" = inline
+    # - audit_durability per batch: "none" | "flush" (to OS) | "fsync" (to disk)
+    audit_mode: str = Field(default_factory=lambda: os.getenv("AUDIT_MODE", "async"))
+    audit_durability: str = Field(default_factory=lambda: os.getenv("AUDIT_DURABILITY", "flush"))
+    audit_batch_size: int = Field(default_factory=lambda: int(os.getenv("AUDIT_BATCH_SIZE", "256")))
+    audit_flush_ms: float = Field(default_factory=lambda: float(os.getenv("AUDIT_FLUSH_MS", "50")))
+    audit_queue_max: int = Field(default_factory=lambda: int(os.getenv("AUDIT_QUEUE_MAX", "10000")))
+    audit_put_timeout_ms: float = Field(
+        default_factory=lambda: float(os.getenv("AUDIT_PUT_TIMEOUT_MS", "100"))
+    )
+
+    # decision_events sink (governance/events.py): "async" = batched background inserts
+    # once started by the API, "sync" = one insert transaction per call
+    event_mode: str = Field(default_factory=lambda: os.getenv("EVENT_MODE", "async"))
+    event_batch_size: int = Field(default_factory=lambda: int(os.getenv("EVENT_BATCH_SIZE", "500")))
+    event_flush_ms: float = Field(default_factory=lambda: float(os.getenv("EVENT_FLUSH_MS", "25")))
+    event_queue_max: int = Field(default_factory=lambda: int(os.getenv("EVENT_QUEUE_MAX", "20000")))
+    event_put_timeout_ms: float = Field(
+        default_factory=lambda: float(os.getenv("EVENT_PUT_TIMEOUT_MS", "100"))
+    )
+
+    # GET /kpis result cache (monitoring/kpi_cache.py)
+    kpi_cache_ttl_s: float = Field(default_factory=lambda: float(os.getenv("KPI_CACHE_TTL_S", "15")))
+    kpi_cache_stale_s: float = Field(default_factory=lambda: float(os.getenv("KPI_CACHE_STALE_S", "60")))
+    # New events only end freshness once an entry is at least this old.
+    kpi_cache_min_fresh_s: float = Field(default_factory=lambda: float(os.getenv("KPI_CACHE_MIN_FRESH_S", "5")))
+
+    # Async request path (core/async_workflow.py): max decisions in flight per process and
+    # the size of the executor that runs their blocking DB / file I/O
+    decision_max_concurrency: int = Field(default_factory=lambda: int(os.getenv("DECISION_MAX_CONCURRENCY", "256")))
+    async_io_workers: int = Field(default_factory=lambda: int(os.getenv("ASYNC_IO_WORKERS", "16")))
+
+    # Similar-case index (tools/similarity.py); nprobe = IVF lists scanned per query
+    similarity_index_path: str = Field(
+        default_factory=lambda: os.getenv("SIMILARITY_INDEX_PATH", "artifacts/similarity")
+    )
+    similarity_nprobe: int = Field(default_factory=lambda: int(os.getenv("SIMILARITY_NPROBE", "8")))
+
+    # Drift monitor (monitoring/drift.py): rolling window of binned inputs / scores,
+    # compared with a frozen reference; state + reference live under drift_path
+    drift_path: str = Field(default_factory=lambda: os.getenv("DRIFT_PATH", "artifacts/drift"))
+    drift_window_s: float = Field(default_factory=lambda: float(os.getenv("DRIFT_WINDOW_S", "86400")))
+    drift_snapshot_interval_s: float = Field(
+        default_factory=lambda: float(os.getenv("DRIFT_SNAPSHOT_INTERVAL_S", "60"))
+    )
+    drift_psi_threshold: float = Field(default_factory=lambda: float(os.getenv("DRIFT_PSI_THRESHOLD", "0.25")))
+    drift_ks_threshold: float = Field(default_factory=lambda: float(os.getenv("DRIFT_KS_THRESHOLD", "0.15")))
+    drift_min_samples: int = Field(default_factory=lambda: int(os.getenv("DRIFT_MIN_SAMPLES", "500")))
+
     # Security / compliance
     include_pii: bool = Field(
         default_factory=lambda: os.getenv("INCLUDE_PII", "false").strip().lower() == "true"
@@ -0,0 +1,84 @@
+"""
+Process warm-up, run from the API lifespan before it reports ready.
+
+Cold start pays for lazy imports (NumPy for batch scoring / similarity / drift), the
+first model load, SQLite connection setup (pragmas, mmap) and statement preparation on
+the first requests. `warm_up` moves that cost to boot: uvicorn only accepts traffic
+once the lifespan has yielded, so pods behind a readiness probe on /health never serve
+a cold request. Each step is timed; a failing step is recorded and skipped, it never
+blocks startup. The dummy decision calls the scorer and the rules engine directly
+with metrics off, so /metrics never shows warm-up traffic. Disable with
+FRAUDSHIELD_WARMUP=false.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Optional
+
+from ..data.pool import get_pool
+from ..decisioning.engine import DecisionEngine
+from ..modeling.holder import get_model_holder
+from ..modeling.scoring import score_batch, score_transaction
+from ..tools.similarity import get_similarity_index
+from .features import assemble_features
+from .settings import settings
+
+# Scored and run through the rules, never persisted or counted in metrics.
+_DUMMY_FEATURES: Dict[str, Any] = {
+    "trans_id": "__warmup__",
+    "amount": 100.0,
+    "ip_is_proxy": False,
+    "txn_count_1h": 0,
+    "account_age_days": 365,
+    "device_ip_mismatch": False,
+    "shipping_is_freight_forwarder": False,
+    "ship_bill_mismatch": False,
+}
+
+_last: Optional[Dict[str, Any]] = None
+
+
+def _warm_decision() -> None:
+    features = dict(_DUMMY_FEATURES)
+    DecisionEngine().decide(features, score_transaction(features, record_metrics=False).risk_score)
+
+
+def warm_up() -> Dict[str, Any]:
+    """Preload pools, model and lazy imports; returns per-step timings (ms)."""
+    global _last
+
+    s = settings()
+    steps = {
+        "db_pool": lambda: get_pool().warm(s.warmup_db_connections),
+        "feature_query": lambda: assemble_features(_DUMMY_FEATURES["trans_id"]),
+        "model": lambda: get_model_holder().get(),
+        "decision": _warm_decision,
+        "batch_scoring": lambda: score_batch([dict(_DUMMY_FEATURES)], record_metrics=False),
+        "similarity_index": get_similarity_index,
+    }
+
+    t0 = time.perf_counter()
+    timings: Dict[str, float] = {}
+    errors: Dict[str, str] = {}
+    for name, step in steps.items():
+        t = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+        timings[name] = round((time.perf_counter() - t) * 1000.0, 3)
+
+    loaded = get_model_holder().get()
+    _last = {
+        "ran_at": time.time(),
+        "total_ms": round((time.perf_counter() - t0) * 1000.0, 3),
+        "steps_ms": timings,
+        "errors": errors,
+        "model_version": loaded.model_version if loaded else None,
+    }
+    return _last
+
+
+def warmup_stats() -> Dict[str, Any]:
+    return _last or {"ran_at": None}
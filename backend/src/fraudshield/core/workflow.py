@@ -1,67 +1,44 @@
 from __future__  import annotations
 import os
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..data.db import init_db
-from ..tools.enrichment import (
-    lookup_transaction, lookup_user_history, lookup_ip_intel, lookup_kyc, lookup_disputes, find_similar_cases_stub
-)
-from ..modeling.scoring import score_transaction
+from .features import assemble_features, assemble_features_batch
+from ..modeling.scoring import score_batch, score_transaction
+from ..modeling.shadow import submit_shadow
 from ..decisioning.engine import DecisionEngine
-from ..governance.audit import append_audit_jsonl
-from ..governance.events import record_decision_event
+from ..governance.audit import append_audit_jsonl, append_audit_records, build_audit_record
+from ..governance.events import record_decision_event, record_decision_events
 from ..core.settings import settings
+from ..monitoring.metrics import DECISIONS, STAGE_SECONDS
+from ..monitoring.drift import observe_decisions
+from ..tools.similarity import index_decisions
 
 def build_features(trans_id: str) -> Dict[str, Any]:
-    txn = lookup_transaction(trans_id)
-    if not txn.get("found"):
+    t0 = time.perf_counter()
+    features = assemble_features(trans_id)
+    STAGE_SECONDS.observe(time.perf_counter() - t0, "decision", "features")
+    if features is None:
         return {"_error": "transaction_not_found", "trans_id": trans_id}
-
-    t = txn["transaction"]
-    user_id = t.get("user_id")
-
-    hist = lookup_user_history(user_id)
-    ip = lookup_ip_intel(t.get("device_ip", ""))
-
-    shipping = str(t.get("shipping_addr", "") or "").lower()
-    billing = str(t.get("billing_addr", "") or "").lower()
-
-    shipping_is_ff = ("freight forwarder" in shipping) or ("forwarder" in shipping)
-    ship_bill_mismatch = bool(shipping) and bool(billing) and (shipping != billing)
-
-    home_ip = str(t.get("home_ip", "") or "")
-    device_ip = str(t.get("device_ip", "") or "")
-    device_ip_mismatch = bool(home_ip) and bool(device_ip) and (home_ip != device_ip)
-
-    features = {
-        "trans_id": trans_id,
-        "user_id": user_id,
-        "amount": float(t.get("amount", 0.0) or 0.0),
-        "merchant": t.get("merchant"),
-        "device_ip": device_ip,
-        "account_age_days": int(t.get("account_age_days", 0) or 0),
-        "vip_status": t.get("vip_status"),
-        "country": t.get("country"),
-        "txn_count_1h": int(hist.get("velocity", {}).get("txn_count_1h", 0) or 0),
-        "txn_count_24h": int(hist.get("velocity", {}).get("txn_count_24h", 0) or 0),
-        "ip_reputation_score": int(ip.get("intel", {}).get("reputation_score", 0) or 0),
-        "ip_is_proxy": bool(ip.get("intel", {}).get("is_proxy", False)),
-        "shipping_is_freight_forwarder": shipping_is_ff,
-        "ship_bill_mismatch": ship_bill_mismatch,
-        "device_ip_mismatch": device_ip_mismatch,
-    }
     return features
 
-def decision_only(trans_id: str) -> Dict[str, Any]:
-    features = build_features(trans_id)
-    if features.get("_error"):
-        return {"transaction_id": trans_id, "error": features["_error"]}
-
+def decide_features(features: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+    """Score + rules for already-assembled features (pure CPU, no I/O)."""
+    t0 = time.perf_counter()
     score = score_transaction(features)
+    t1 = time.perf_counter()
     dec = DecisionEngine().decide(features, score.risk_score)
+    STAGE_SECONDS.observe(t1 - t0, "decision", "score")
+    STAGE_SECONDS.observe(time.perf_counter() - t1, "decision", "rules")
+    return score, dec
 
+def persist_decision(trans_id: str, score: Any, dec: Dict[str, Any], api: str = "decision") -> Tuple[str, str]:
+    """Record the decision event + audit record. Returns (event_id, audit_log_path)."""
+    t0 = time.perf_counter()
     event_id = record_decision_event(trans_id, dec["decision"], score.risk_score, score.model_version)
+    t1 = time.perf_counter()
     audit_path = append_audit_jsonl(
         txn_id=trans_id,
         decision=dec["decision"],
@@ -69,9 +46,14 @@ def decision_only(trans_id: str) -> Dict[str, Any]:
         model_version=score.model_version,
         reason_codes=dec["reason_codes"],
         rule_hits=dec["rule_hits"],
-        extra={"decision_event_id": event_id, "api": "decision"},
+        extra={"decision_event_id": event_id, "api": api},
     )
+    STAGE_SECONDS.observe(t1 - t0, "decision", "event")
+    STAGE_SECONDS.observe(time.perf_counter() - t1, "decision", "audit")
+    DECISIONS.inc(api, dec["decision"], score.model_version)
+    return event_id, audit_path
 
+def decision_packet(trans_id: str, score: Any, dec: Dict[str, Any], event_id: str, audit_path: str) -> Dict[str, Any]:
     return {
         "transaction_id": trans_id,
         "model_version": score.model_version,
@@ -83,6 +65,112 @@ def decision_only(trans_id: str) -> Dict[str, Any]:
         "audit_log_path": audit_path,
     }
 
+def after_decisions(features_list: List[Dict[str, Any]], scores: List[Any], event_ids: List[str]) -> None:
+    """Post-decision hooks: similar-case index inserts, drift histograms, shadow scoring."""
+    index_decisions(features_list)
+    observe_decisions(features_list, [sc.risk_score for sc in scores])
+    submit_shadow(features_list, scores, event_ids)
+
+def decision_only(trans_id: str) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    features = build_features(trans_id)
+    if features.get("_error"):
+        return {"transaction_id": trans_id, "error": features["_error"]}
+
+    score, dec = decide_features(features)
+    event_id, audit_path = persist_decision(trans_id, score, dec)
+    after_decisions([features], [score], [event_id])
+    STAGE_SECONDS.observe(time.perf_counter() - t0, "decision", "total")
+    return decision_packet(trans_id, score, dec, event_id, audit_path)
+
+def decision_batch(
+    trans_ids: List[str],
+    api: str = "decision_batch",
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Set-based variant of `decision_only` for settlement / back-office flows.
+    - features for all IDs via chunked IN (...) queries
+    - one predict_proba over the whole matrix
+    - rules evaluated with boolean masks (DecisionEngine.decide_batch)
+    - events + audit records written in one transaction / one append
+    Unknown IDs get a per-item error instead of failing the batch.
+
+    `api` is stamped on the audit records; if `timings` is given, seconds spent per stage
+    (features / score / rules / persist) are added to it.
+    """
+    t0 = time.perf_counter()
+    features_by_id = assemble_features_batch(trans_ids)
+    found = [features_by_id[t] for t in trans_ids if t in features_by_id]
+    t1 = time.perf_counter()
+
+    scores = score_batch(found)
+    t2 = time.perf_counter()
+    rule_cols = {
+        name: [bool(f.get(name)) for f in found]
+        for name in ("ip_is_proxy", "shipping_is_freight_forwarder", "ship_bill_mismatch")
+    }
+    bulk = DecisionEngine().decide_batch(rule_cols, [sc.risk_score for sc in scores])
+    decs = [bulk.row(i) for i in range(len(bulk))]
+    t3 = time.perf_counter()
+
+    event_ids = record_decision_events(
+        [(f["trans_id"], d["decision"], sc.risk_score, sc.model_version) for f, d, sc in zip(found, decs, scores)]
+    )
+    audit_path = append_audit_records(
+        [
+            build_audit_record(
+                txn_id=f["trans_id"],
+                decision=d["decision"],
+                risk_score=sc.risk_score,
+                model_version=sc.model_version,
+                reason_codes=d["reason_codes"],
+                rule_hits=d["rule_hits"],
+                extra={"decision_event_id": eid, "api": api},
+            )
+            for f, d, sc, eid in zip(found, decs, scores, event_ids)
+        ]
+    )
+    after_decisions(found, scores, event_ids)
+    t4 = time.perf_counter()
+    for stage, dt in (("features", t1 - t0), ("score", t2 - t1), ("rules", t3 - t2), ("persist", t4 - t3)):
+        STAGE_SECONDS.observe(dt, "batch", stage)
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + dt
+    STAGE_SECONDS.observe(t4 - t0, "batch", "total")
+    outcomes: Dict[Tuple[str, str], int] = {}
+    for d, sc in zip(decs, scores):
+        key = (d["decision"], sc.model_version)
+        outcomes[key] = outcomes.get(key, 0) + 1
+    for (decision, model_version), n in outcomes.items():
+        DECISIONS.inc(api, decision, model_version, amount=n)
+
+    decided = iter(zip(decs, scores, event_ids))
+    results: List[Dict[str, Any]] = []
+    for trans_id in trans_ids:
+        if trans_id not in features_by_id:
+            results.append({"transaction_id": trans_id, "error": "transaction_not_found"})
+            continue
+        dec, score, event_id = next(decided)
+        results.append(
+            {
+                "transaction_id": trans_id,
+                "model_version": score.model_version,
+                "risk_score": score.risk_score,
+                "decision": dec["decision"],
+                "reason_codes": dec["reason_codes"],
+                "rule_hits": dec["rule_hits"],
+                "decision_event_id": event_id,
+            }
+        )
+
+    return {
+        "count": len(results),
+        "errors": len(trans_ids) - len(found),
+        "audit_log_path": audit_path,
+        "results": results,
+    }
+
 def investigate_optional(trans_id: str) -> Dict[str, Any]:
     """
     Optional ops workflow. Requires `fraudshield[ops]`.
@@ -0,0 +1,253 @@
+"""Bulk ingestion into the SQLite store (benchmarks, backfills, migrations from files).
+
+    python -m fraudshield.data.bulk synth --users 200000 --transactions 10000000 --seed 7
+    python -m fraudshield.data.bulk load transactions feed.csv
+
+Compared with row-at-a-time inserts through the pool this:
+- uses one dedicated connection with loader PRAGMAs (synchronous=OFF, big page cache,
+  in-memory temp store); pooled connections keep their own durable settings
+- inserts with `executemany` in large explicit transactions (`commit_rows` per commit)
+- drops the secondary indexes of the target tables first and rebuilds them once at the
+  end (sorted build instead of per-row B-tree maintenance), then runs ANALYZE
+- drops the triggers of the target tables (per-row rollup maintenance) and rebuilds
+  the rollups they maintain once at the end; KPI rollups likewise when
+  decision_events were loaded
+
+Without `truncate`, loads are idempotent: keyed tables upsert (`INSERT OR REPLACE`),
+and tables without a primary key (kyc_events, chargebacks, disputes) skip rows that
+are already present, so re-running a load does not duplicate them. Those tables keep
+their indexes during such a load, since the duplicate check looks rows up through them.
+
+A crash mid-load can lose the uncommitted tail (synchronous=OFF) and leaves indexes
+and triggers dropped until the next load (rollups then need `kpis rebuild-rollups`); this is a batch/dev tool, not a request path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from ..core.settings import settings
+from .db import init_db
+from .synthetic import SyntheticConfig, generate, summarize
+
+_LOADER_PRAGMAS = (
+    "PRAGMA synchronous=OFF",
+    "PRAGMA cache_size=-262144",  # 256 MiB
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA wal_autocheckpoint=10000",
+)
+
+
+# sqlite_master keeps the original CREATE text; make the rebuild idempotent.
+_IF_NOT_EXISTS = re.compile(r"^(\s*CREATE\s+(?:(?:UNIQUE\s+)?INDEX|TRIGGER)\s+)(?!IF\s+NOT\s+EXISTS)", re.I)
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute(f"PRAGMA busy_timeout={int(settings().db_busy_timeout_ms)}")
+    for pragma in _LOADER_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    cols = [r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')]
+    if not cols:
+        raise ValueError(f"unknown table: {table}")
+    return cols
+
+
+def _has_primary_key(conn: sqlite3.Connection, table: str) -> bool:
+    return any(r[5] for r in conn.execute(f'PRAGMA table_info("{table}")'))
+
+
+def _insert_sql(conn: sqlite3.Connection, table: str, dedupe: bool) -> str:
+    cols = _table_columns(conn, table)
+    marks = ",".join("?" * len(cols))
+    if not dedupe:
+        return f'INSERT OR REPLACE INTO "{table}" VALUES ({marks})'
+    # Params are the row twice: the values, then the same values for the lookup.
+    match = " AND ".join(f'"{c}" IS ?' for c in cols)
+    return f'INSERT INTO "{table}" SELECT {marks} WHERE NOT EXISTS (SELECT 1 FROM "{table}" WHERE {match})'
+
+
+def _schema_objects(conn: sqlite3.Connection, kind: str, tables: Sequence[str]) -> List[Tuple[str, str]]:
+    """(name, sql) of the explicitly created indexes / triggers on `tables`."""
+    marks = ",".join("?" * len(tables))
+    return conn.execute(
+        f"SELECT name, sql FROM sqlite_master "
+        f"WHERE type = ? AND sql IS NOT NULL AND tbl_name IN ({marks}) ORDER BY name",
+        (kind, *tables),
+    ).fetchall()
+
+
+def bulk_load(
+    chunks: Iterable[Tuple[str, Sequence[Tuple[Any, ...]]]],
+    tables: Optional[Sequence[str]] = None,
+    commit_rows: int = 500_000,
+    defer_indexes: bool = True,
+    truncate: bool = False,
+    db_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Load (table, rows) chunks; rows must be in the table's column order.
+
+    `tables` names the tables that will be touched (needed up front to drop their
+    indexes / truncate); defaults to every table with secondary indexes if omitted.
+    """
+    init_db()
+    path = db_path or settings().db_path
+    conn = _connect(path)
+    t_start = time.perf_counter()
+    counts: Dict[str, int] = {}
+    sql_by_table: Dict[str, str] = {}
+    deduped: Set[str] = set()
+    index_s = 0.0
+
+    try:
+        if tables is None:
+            tables = [r[0] for r in conn.execute(
+                "SELECT DISTINCT tbl_name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            )]
+        for table in tables:
+            if not truncate and not _has_primary_key(conn, table):
+                deduped.add(table)
+            sql_by_table[table] = _insert_sql(conn, table, table in deduped)
+
+        deferred = [t for t in tables if t not in deduped]
+        dropped = _schema_objects(conn, "index", deferred) if defer_indexes and deferred else []
+        triggers = _schema_objects(conn, "trigger", list(tables))
+        conn.execute("BEGIN IMMEDIATE")
+        for name, _sql in dropped:
+            conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+        for name, _sql in triggers:
+            conn.execute(f'DROP TRIGGER IF EXISTS "{name}"')
+        if truncate:
+            for table in tables:
+                conn.execute(f'DELETE FROM "{table}"')
+
+        pending = 0
+        try:
+            for table, rows in chunks:
+                sql = sql_by_table.get(table)
+                if sql is None:
+                    raise ValueError(f"table {table!r} not declared in `tables`")
+                conn.executemany(sql, (r + r for r in map(tuple, rows)) if table in deduped else rows)
+                counts[table] = counts.get(table, 0) + len(rows)
+                pending += len(rows)
+                if pending >= commit_rows:
+                    conn.execute("COMMIT")
+                    conn.execute("BEGIN IMMEDIATE")
+                    pending = 0
+            conn.execute("COMMIT")
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            # Indexes come back even if the load failed half-way.
+            t0 = time.perf_counter()
+            for _name, sql in dropped:
+                conn.execute(_IF_NOT_EXISTS.sub(r"\1IF NOT EXISTS ", sql, count=1))
+            if dropped:
+                conn.execute("ANALYZE")
+            index_s = time.perf_counter() - t0
+            if triggers:
+                from ..monitoring.rollups import rebuild_volume_rollups
+
+                conn.execute("BEGIN IMMEDIATE")
+                for _name, sql in triggers:
+                    conn.execute(_IF_NOT_EXISTS.sub(r"\1IF NOT EXISTS ", sql, count=1))
+                if "transactions" in tables:
+                    rebuild_volume_rollups(conn)
+                conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    if "decision_events" in counts:
+        from ..monitoring.rollups import rebuild_rollups
+
+        rebuild_rollups()
+
+    elapsed = time.perf_counter() - t_start
+    total = sum(counts.values())
+    return {
+        "db_path": path,
+        "rows": counts,
+        "total_rows": total,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_s": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "indexes_rebuilt": len(dropped),
+        "index_rebuild_s": round(index_s, 3),
+    }
+
+
+_SYNTH_TABLES = ("users", "ip_intel", "kyc_events", "disputes", "transactions", "chargebacks")
+
+
+def load_synthetic(cfg: SyntheticConfig, truncate: bool = False, **kwargs: Any) -> Dict[str, Any]:
+    """Generate and load a synthetic dataset (replacing those tables only when `truncate`)."""
+    report = bulk_load(generate(cfg), tables=_SYNTH_TABLES, truncate=truncate, **kwargs)
+    return {**report, "synthetic": summarize(cfg)}
+
+
+def load_file(table: str, path: str, fmt: Optional[str] = None, chunk_rows: int = 50_000, **kwargs: Any) -> Dict[str, Any]:
+    """Load a JSONL/CSV file (or "-" for stdin) whose fields are named like the table's columns."""
+    from ..streaming.sources import micro_batches, read_records
+
+    init_db()
+    conn = sqlite3.connect(kwargs.get("db_path") or settings().db_path)
+    try:
+        cols = _table_columns(conn, table)
+    finally:
+        conn.close()
+
+    chunks = (
+        (table, [tuple(None if rec.get(c) == "" else rec.get(c) for c in cols) for _off, rec in batch])
+        for batch in micro_batches(read_records(path, fmt), chunk_rows)
+    )
+    return bulk_load(chunks, tables=[table], **kwargs)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="FraudShield bulk loader")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    sp = sub.add_parser("synth", help="generate + load a deterministic synthetic dataset")
+    sp.add_argument("--users", type=int, default=SyntheticConfig.users)
+    sp.add_argument("--transactions", type=int, default=SyntheticConfig.transactions)
+    sp.add_argument("--seed", type=int, default=SyntheticConfig.seed)
+    sp.add_argument("--days", type=int, default=SyntheticConfig.days)
+    sp.add_argument("--start", default=SyntheticConfig.start)
+    sp.add_argument(
+        "--truncate", action="store_true", help="delete existing rows in the target tables first (default: merge)"
+    )
+
+    lp = sub.add_parser("load", help="load a JSONL/CSV file into one table")
+    lp.add_argument("table")
+    lp.add_argument("path", help="file path, or - for stdin")
+    lp.add_argument("--format", choices=["jsonl", "csv"])
+
+    for p in (sp, lp):
+        p.add_argument("--commit-rows", type=int, default=500_000)
+        p.add_argument("--keep-indexes", action="store_true", help="do not drop/rebuild indexes")
+
+    args = ap.parse_args()
+    opts = {"commit_rows": args.commit_rows, "defer_indexes": not args.keep_indexes}
+    if args.command == "synth":
+        cfg = SyntheticConfig(
+            users=args.users, transactions=args.transactions, seed=args.seed, days=args.days, start=args.start
+        )
+        report = load_synthetic(cfg, truncate=args.truncate, **opts)
+    else:
+        report = load_file(args.table, args.path, fmt=args.format, **opts)
+
+    print(f"✅ Loaded {report['total_rows']} rows in {report['elapsed_s']}s ({report['rows_per_s']} rows/s)")
+    for table, n in report["rows"].items():
+        print(f"  {table:<14} {n:>12}")
+    print(f"  indexes rebuilt: {report['indexes_rebuilt']} in {report['index_rebuild_s']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,155 +1,115 @@
 from __future__ import annotations
 
-import os
-import sqlite3
+import argparse
+import threading
+from typing import Any, Dict, List
 
 from ..core.settings import settings
+from .migrations import LATEST_VERSION, current_version, migrate
+from .pool import connection
+
+_migrated: set = set()
+_migrate_lock = threading.Lock()
 
 
 def init_db() -> None:
-    """Initialize the demo SQLite database.
+    """Bring the SQLite schema up to date (versioned migrations, see data/migrations.py).
 
-    In this scaffold we initialize the DB at service start for convenience.
-    For real production, use migrations and a server DB (e.g., Postgres).
+    Cheap after the first call in a process: the check is memoised per DB path, so boot
+    and `compute_kpis` no longer re-run DDL or rewrite rows. Demo data is seeded only by
+    the explicit `seed_demo()` / `python -m fraudshield.data.db seed` dev command.
+    For real production, use a server DB (e.g., Postgres) with its own migration tool.
     """
-
-    s = settings()
-
-    db_dir = os.path.dirname(s.db_path)
-    if db_dir:
-        os.makedirs(db_dir, exist_ok=True)
-
-    conn = sqlite3.connect(s.db_path)
-    cur = conn.cursor()
-
-    # Users
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            user_id TEXT PRIMARY KEY,
-            name TEXT,
-            email TEXT,
-            home_ip TEXT,
-            account_age_days INTEGER,
-            vip_status TEXT,
-            country TEXT
-        )
-        """
-    )
-
-    # Transactions
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS transactions (
-            trans_id TEXT PRIMARY KEY,
-            user_id TEXT,
-            amount REAL,
-            merchant TEXT,
-            device_ip TEXT,
-            shipping_addr TEXT,
-            billing_addr TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    path = settings().db_path
+    if path in _migrated:
+        return
+
+    with _migrate_lock:
+        if path in _migrated:
+            return
+        with connection() as conn:
+            migrate(conn)
+        _migrated.add(path)
+
+
+def seed_demo() -> None:
+    """Insert the minimal demo records (U105 / TX-999). Idempotent; dev/demo only."""
+    init_db()
+
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT OR IGNORE INTO users VALUES (?,?,?,?,?,?,?)",
+            ("U105", "Alice Smith", "alice@ex.com", "192.168.1.50", 1400, "Platinum", "US"),
         )
-        """
-    )
-
-    # IP Intel
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS ip_intel (
-            ip_address TEXT PRIMARY KEY,
-            reputation_score INTEGER,
-            isp TEXT,
-            is_proxy BOOLEAN
+        cur.execute(
+            "INSERT OR IGNORE INTO transactions VALUES (?,?,?,?,?,?,?,?)",
+            (
+                "TX-999",
+                "U105",
+                2800.00,
+                "BestBuy",
+                "45.22.19.11",
+                "Freight Forwarder, DE",
+                "Alice Smith, US",
+                "2023-10-27 10:00:00",
+            ),
         )
-        """
-    )
-
-    # KYC evidence
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS kyc_events (
-            user_id TEXT,
-            kyc_status TEXT,
-            kyc_level TEXT,
-            event_ts DATETIME DEFAULT CURRENT_TIMESTAMP
+        cur.execute(
+            "INSERT OR IGNORE INTO ip_intel VALUES (?,?,?,?)",
+            ("45.22.19.11", 95, "Hostinger", 1),
         )
-        """
-    )
-
-    # Labels / loss amounts
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS chargebacks (
-            trans_id TEXT,
-            chargeback_amount REAL,
-            reason_code TEXT,
-            chargeback_date DATE
+        # Tables without a natural key: insert once.
+        cur.execute(
+            "INSERT INTO kyc_events SELECT ?,?,?,? "
+            "WHERE NOT EXISTS (SELECT 1 FROM kyc_events WHERE user_id = ?)",
+            ("U105", "VERIFIED", "L2", "2023-01-01 00:00:00", "U105"),
         )
-        """
-    )
-
-    # User-level disputes snapshot
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS disputes (
-            user_id TEXT,
-            dispute_count_90d INTEGER,
-            loss_amount_90d REAL,
-            last_dispute_date DATE
+        cur.execute(
+            "INSERT INTO disputes SELECT ?,?,?,? "
+            "WHERE NOT EXISTS (SELECT 1 FROM disputes WHERE user_id = ?)",
+            ("U105", 0, 0.0, None, "U105"),
         )
-        """
-    )
-
-    # KPI tracking / decision events
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS decision_events (
-            event_id TEXT PRIMARY KEY,
-            trans_id TEXT,
-            decision TEXT,
-            risk_score REAL,
-            model_version TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        # Placeholder chargeback row (keeps schema exercised)
+        cur.execute(
+            "INSERT INTO chargebacks SELECT ?,?,?,? "
+            "WHERE NOT EXISTS (SELECT 1 FROM chargebacks WHERE trans_id = ?)",
+            ("TX-999", 0.0, None, None, "TX-999"),
         )
-        """
-    )
-
-    # Seed minimal demo data
-    cur.execute(
-        "INSERT OR REPLACE INTO users VALUES (?,?,?,?,?,?,?)",
-        ("U105", "Alice Smith", "alice@ex.com", "192.168.1.50", 1400, "Platinum", "US"),
-    )
-    cur.execute(
-        "INSERT OR REPLACE INTO transactions VALUES (?,?,?,?,?,?,?,?)",
-        (
-            "TX-999",
-            "U105",
-            2800.00,
-            "BestBuy",
-            "45.22.19.11",
-            "Freight Forwarder, DE",
-            "Alice Smith, US",
-            "2023-10-27 10:00:00",
-        ),
-    )
-    cur.execute(
-        "INSERT OR REPLACE INTO ip_intel VALUES (?,?,?,?)",
-        ("45.22.19.11", 95, "Hostinger", 1),
-    )
-    cur.execute(
-        "INSERT OR REPLACE INTO kyc_events VALUES (?,?,?,?)",
-        ("U105", "VERIFIED", "L2", "2023-01-01 00:00:00"),
-    )
-    cur.execute(
-        "INSERT OR REPLACE INTO disputes VALUES (?,?,?,?)",
-        ("U105", 0, 0.0, None),
-    )
-    # Placeholder chargeback row (keeps schema exercised)
-    cur.execute(
-        "INSERT OR REPLACE INTO chargebacks VALUES (?,?,?,?)",
-        ("TX-999", 0.0, None, None),
-    )
-
-    conn.commit()
-    conn.close()
+
+
+def schema_status() -> Dict[str, Any]:
+    with connection() as conn:
+        version = current_version(conn)
+        rows: List[tuple] = conn.execute(
+            "SELECT version, name, applied_at FROM schema_version ORDER BY version"
+        ).fetchall()
+    return {
+        "db_path": settings().db_path,
+        "version": version,
+        "latest": LATEST_VERSION,
+        "applied": [{"version": v, "name": n, "applied_at": a} for v, n, a in rows],
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="FraudShield database admin (dev)")
+    ap.add_argument("command", choices=["migrate", "seed", "status"])
+    args = ap.parse_args()
+
+    if args.command == "migrate":
+        with connection() as conn:
+            applied = migrate(conn)
+        print(f"✅ Applied migrations: {applied or 'none (up to date)'}")
+    elif args.command == "seed":
+        seed_demo()
+        print("✅ Seeded demo data (U105 / TX-999)")
+    else:
+        st = schema_status()
+        print(f"{st['db_path']}: schema v{st['version']} (latest v{st['latest']})")
+        for m in st["applied"]:
+            print(f"  v{m['version']:<3} {m['name']:<24} {m['applied_at']}")
+
+
+if __name__ == "__main__":
+    main()
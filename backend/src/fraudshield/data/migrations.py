@@ -0,0 +1,276 @@
+"""Versioned, forward-only schema migrations for the SQLite store.
+
+Each migration runs once per database, inside its own write transaction, and is
+recorded in `schema_version`. Statements are idempotent (`IF NOT EXISTS`) so that
+databases created by the pre-migration `init_db` upgrade cleanly.
+
+Add new migrations at the end of MIGRATIONS with the next version number; never
+edit one that has shipped.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: Tuple[str, ...]
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "base_schema",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                user_id TEXT PRIMARY KEY,
+                name TEXT,
+                email TEXT,
+                home_ip TEXT,
+                account_age_days INTEGER,
+                vip_status TEXT,
+                country TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS transactions (
+                trans_id TEXT PRIMARY KEY,
+                user_id TEXT,
+                amount REAL,
+                merchant TEXT,
+                device_ip TEXT,
+                shipping_addr TEXT,
+                billing_addr TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS ip_intel (
+                ip_address TEXT PRIMARY KEY,
+                reputation_score INTEGER,
+                isp TEXT,
+                is_proxy BOOLEAN
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS kyc_events (
+                user_id TEXT,
+                kyc_status TEXT,
+                kyc_level TEXT,
+                event_ts DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS chargebacks (
+                trans_id TEXT,
+                chargeback_amount REAL,
+                reason_code TEXT,
+                chargeback_date DATE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS disputes (
+                user_id TEXT,
+                dispute_count_90d INTEGER,
+                loss_amount_90d REAL,
+                last_dispute_date DATE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS decision_events (
+                event_id TEXT PRIMARY KEY,
+                trans_id TEXT,
+                decision TEXT,
+                risk_score REAL,
+                model_version TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+        ),
+    ),
+    Migration(
+        2,
+        "hot_path_indexes",
+        (
+            # Velocity windows + user history (features.py, enrichment.py)
+            "CREATE INDEX IF NOT EXISTS idx_transactions_user_ts ON transactions(user_id, timestamp)",
+            # Latest KYC per user
+            "CREATE INDEX IF NOT EXISTS idx_kyc_events_user_ts ON kyc_events(user_id, event_ts)",
+            "CREATE INDEX IF NOT EXISTS idx_disputes_user ON disputes(user_id)",
+            # Label joins (performance monitoring)
+            "CREATE INDEX IF NOT EXISTS idx_chargebacks_trans ON chargebacks(trans_id)",
+            # KPI windows
+            "CREATE INDEX IF NOT EXISTS idx_decision_events_ts ON decision_events(timestamp)",
+        ),
+    ),
+    Migration(
+        3,
+        "kpi_rollups",
+        (
+            # Hourly KPI rollups maintained on event write (monitoring/rollups.py)
+            """
+            CREATE TABLE IF NOT EXISTS kpi_rollup_hourly (
+                bucket_hour TEXT NOT NULL,
+                decision TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                event_count INTEGER NOT NULL DEFAULT 0,
+                score_sum REAL NOT NULL DEFAULT 0,
+                volume REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (bucket_hour, decision, model_version)
+            ) WITHOUT ROWID
+            """,
+            # Backfill from events recorded before this migration
+            """
+            INSERT OR REPLACE INTO kpi_rollup_hourly
+            SELECT
+                strftime('%Y-%m-%d %H:00:00', e.timestamp),
+                e.decision,
+                COALESCE(e.model_version, 'unknown'),
+                COUNT(*),
+                COALESCE(SUM(e.risk_score), 0),
+                COALESCE(SUM(t.amount), 0)
+            FROM decision_events e
+            LEFT JOIN transactions t ON t.trans_id = e.trans_id
+            WHERE e.timestamp IS NOT NULL AND e.decision IS NOT NULL
+            GROUP BY 1, 2, 3
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_chargebacks_date ON chargebacks(chargeback_date)",
+        ),
+    ),
+    Migration(
+        4,
+        "shadow_scores",
+        (
+            # Challenger scores for a sample of decisions (modeling/shadow.py), keyed by
+            # the champion's decision event
+            """
+            CREATE TABLE IF NOT EXISTS shadow_scores (
+                event_id TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                trans_id TEXT,
+                risk_score REAL,
+                champion_version TEXT,
+                champion_score REAL,
+                latency_ms REAL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (event_id, model_version)
+            ) WITHOUT ROWID
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_shadow_scores_model_ts ON shadow_scores(model_version, created_at)",
+        ),
+    ),
+    Migration(
+        5,
+        "txn_volume_rollups",
+        (
+            # Hourly transaction volume for KPIs (monitoring/rollups.py), maintained by
+            # triggers so every writer (API, stream, seeding) is covered; the bulk loader
+            # drops the triggers and rebuilds the table instead. Supersedes
+            # kpi_rollup_hourly.volume, which counted a transaction once per decision.
+            """
+            CREATE TABLE IF NOT EXISTS txn_volume_hourly (
+                bucket_hour TEXT PRIMARY KEY,
+                txn_count INTEGER NOT NULL DEFAULT 0,
+                volume REAL NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_txn_volume_insert AFTER INSERT ON transactions
+            WHEN strftime('%Y-%m-%d %H:00:00', NEW.timestamp) IS NOT NULL
+            BEGIN
+                INSERT INTO txn_volume_hourly(bucket_hour, txn_count, volume)
+                VALUES (strftime('%Y-%m-%d %H:00:00', NEW.timestamp), 1, COALESCE(NEW.amount, 0))
+                ON CONFLICT(bucket_hour) DO UPDATE SET
+                    txn_count = txn_count + 1, volume = volume + excluded.volume;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_txn_volume_delete AFTER DELETE ON transactions
+            BEGIN
+                UPDATE txn_volume_hourly
+                SET txn_count = txn_count - 1, volume = volume - COALESCE(OLD.amount, 0)
+                WHERE bucket_hour = strftime('%Y-%m-%d %H:00:00', OLD.timestamp);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_txn_volume_update AFTER UPDATE OF amount, timestamp ON transactions
+            BEGIN
+                UPDATE txn_volume_hourly
+                SET txn_count = txn_count - 1, volume = volume - COALESCE(OLD.amount, 0)
+                WHERE bucket_hour = strftime('%Y-%m-%d %H:00:00', OLD.timestamp);
+                INSERT INTO txn_volume_hourly(bucket_hour, txn_count, volume)
+                SELECT strftime('%Y-%m-%d %H:00:00', NEW.timestamp), 1, COALESCE(NEW.amount, 0)
+                WHERE strftime('%Y-%m-%d %H:00:00', NEW.timestamp) IS NOT NULL
+                ON CONFLICT(bucket_hour) DO UPDATE SET
+                    txn_count = txn_count + 1, volume = volume + excluded.volume;
+            END
+            """,
+            """
+            INSERT OR REPLACE INTO txn_volume_hourly
+            SELECT strftime('%Y-%m-%d %H:00:00', timestamp), COUNT(*), COALESCE(SUM(amount), 0)
+            FROM transactions
+            WHERE strftime('%Y-%m-%d %H:00:00', timestamp) IS NOT NULL
+            GROUP BY 1
+            """,
+        ),
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def _ensure_version_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    if conn.in_transaction:
+        conn.commit()
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    _ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return int(row[0] or 0)
+
+
+def migrate(conn: sqlite3.Connection, target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations up to `target` (default: latest). Returns applied versions."""
+    target = LATEST_VERSION if target is None else target
+    applied: List[int] = []
+
+    for m in MIGRATIONS:
+        if m.version > target or m.version <= current_version(conn):
+            continue
+
+        # BEGIN IMMEDIATE takes the write lock up front; re-check under the lock so two
+        # processes booting at once do not both apply the same migration.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            done = conn.execute(
+                "SELECT 1 FROM schema_version WHERE version = ?", (m.version,)
+            ).fetchone()
+            if done is None:
+                for stmt in m.statements:
+                    conn.execute(stmt)
+                conn.execute(
+                    "INSERT INTO schema_version(version, name) VALUES (?, ?)", (m.version, m.name)
+                )
+                applied.append(m.version)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    return applied
@@ -0,0 +1,245 @@
+"""Pooled, long-lived SQLite connections.
+
+Every module that touches the database borrows a connection from here instead of
+calling `sqlite3.connect()` itself. Connections are opened once, tuned with PRAGMAs
+(WAL journal, relaxed `synchronous`, larger page cache, mmap I/O, busy timeout) and
+reused across requests and uvicorn worker threads.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from ..core.settings import settings
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections for a single database file.
+
+    Notes:
+    - At most `size` connections exist; callers block up to `timeout_s` when all are in use.
+    - Connections are created lazily and kept open (LIFO reuse keeps the hot ones warm).
+    - A connection is rolled back before it returns to the pool if the borrower left a
+      transaction open, so state never leaks between requests.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        size: int = 8,
+        timeout_s: float = 30.0,
+        busy_timeout_ms: int = 5000,
+        journal_mode: str = "WAL",
+        synchronous: str = "NORMAL",
+        cache_size: int = -16000,
+        mmap_size: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.db_path = db_path
+        self.size = max(1, int(size))
+        self.timeout_s = float(timeout_s)
+        self._pragmas = {
+            "journal_mode": journal_mode,
+            "synchronous": synchronous,
+            "cache_size": int(cache_size),
+            "mmap_size": int(mmap_size),
+            "busy_timeout": int(busy_timeout_ms),
+            "temp_store": "MEMORY",
+            # INSERT OR REPLACE fires DELETE triggers for the row it replaces only with
+            # this on (keeps the trigger-maintained rollups exact).
+            "recursive_triggers": "ON",
+        }
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._created = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_s = 0.0
+
+    def _open(self) -> sqlite3.Connection:
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self._pragmas["busy_timeout"] / 1000.0,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        for name, value in self._pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+
+        with self._lock:
+            self._created += 1
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise RuntimeError("connection pool is closed")
+
+        if not self._slots.acquire(blocking=False):
+            t0 = time.perf_counter()
+            ok = self._slots.acquire(timeout=self.timeout_s)
+            with self._lock:
+                self._waits += 1
+                self._wait_s += time.perf_counter() - t0
+                if not ok:
+                    self._timeouts += 1
+            if not ok:
+                raise TimeoutError(
+                    f"database connection pool exhausted (size={self.size}, "
+                    f"timeout={self.timeout_s}s)"
+                )
+
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                conn = self._open()
+            except Exception:
+                self._slots.release()
+                raise
+
+        with self._lock:
+            self._checkouts += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Broken connection: drop it, a fresh one is opened on next acquire.
+            conn.close()
+            with self._lock:
+                self._created -= 1
+            self._slots.release()
+            return
+
+        if self._closed:
+            conn.close()
+            with self._lock:
+                self._created -= 1
+        else:
+            self._idle.put(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection; commits on success, rolls back on error."""
+        conn = self.acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def warm(self, n: Optional[int] = None) -> int:
+        """Open up to `n` (default: `size`) connections ahead of traffic. Returns how many are idle."""
+        want = self.size if n is None else max(0, min(int(n), self.size))
+        borrowed = []
+        try:
+            while len(borrowed) < want:
+                borrowed.append(self.acquire())
+        finally:
+            for conn in borrowed:
+                self.release(conn)
+        return self._idle.qsize()
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            idle = self._idle.qsize()
+            return {
+                "db_path": self.db_path,
+                "size": self.size,
+                "open_connections": self._created,
+                "idle": idle,
+                "in_use": self._created - idle,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_ms_total": round(self._wait_s * 1000.0, 3),
+                "pragmas": dict(self._pragmas),
+            }
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+
+
+def get_pool(db_path: Optional[str] = None) -> ConnectionPool:
+    """Return the process-wide pool for `db_path` (defaults to settings().db_path)."""
+    global _pools_pid
+
+    s = settings()
+    path = db_path or s.db_path
+
+    with _pools_lock:
+        # Connections must not cross a fork (e.g. uvicorn/gunicorn pre-fork workers).
+        if os.getpid() != _pools_pid:
+            _pools.clear()
+            _pools_pid = os.getpid()
+
+        pool = _pools.get(path)
+        if pool is None:
+            pool = ConnectionPool(
+                path,
+                size=s.db_pool_size,
+                timeout_s=s.db_pool_timeout_s,
+                busy_timeout_ms=s.db_busy_timeout_ms,
+                journal_mode=s.db_journal_mode,
+                synchronous=s.db_synchronous,
+                cache_size=s.db_cache_size,
+                mmap_size=s.db_mmap_size,
+            )
+            _pools[path] = pool
+        return pool
+
+
+@contextmanager
+def connection(db_path: Optional[str] = None) -> Iterator[sqlite3.Connection]:
+    """Shortcut for `get_pool(db_path).connection()`."""
+    with get_pool(db_path).connection() as conn:
+        yield conn
+
+
+def pool_stats() -> Dict[str, Any]:
+    with _pools_lock:
+        return {path: pool.stats() for path, pool in _pools.items()}
+
+
+def close_pools() -> None:
+    """Close idle connections of every pool (call on shutdown)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
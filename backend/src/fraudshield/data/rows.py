@@ -0,0 +1,36 @@
+"""Lightweight row-level data access for the online decision path.
+
+Point lookups return plain Python values (str/int/float/None) straight from the
+sqlite3 cursor. SQL strings are module constants at the call sites so that the
+per-connection statement cache (see `data/pool.py`) reuses the prepared statement.
+
+Analytical paths read aggregates instead (e.g. `monitoring/kpis.py` over the hourly
+rollups) or vectorise with NumPy; the package does not import pandas.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence
+
+from .pool import connection
+
+
+def _dict_row(cur: sqlite3.Cursor, row: tuple) -> Dict[str, Any]:
+    return {d[0]: v for d, v in zip(cur.description, row)}
+
+
+def fetch_one(sql: str, params: Sequence[Any] = ()) -> Optional[Dict[str, Any]]:
+    """Return the first row as a dict, or None."""
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.row_factory = _dict_row
+        return cur.execute(sql, params).fetchone()
+
+
+def fetch_all(sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+    """Return all rows as a list of dicts."""
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.row_factory = _dict_row
+        return cur.execute(sql, params).fetchall()
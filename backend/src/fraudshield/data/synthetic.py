@@ -0,0 +1,233 @@
+"""Deterministic synthetic dataset for benchmarking at production-like volume.
+
+Same `SyntheticConfig` (incl. `seed` and `start`) -> byte-identical rows. Without an
+explicit `start` the window ends at today's UTC midnight, so velocity windows and KPI
+queries over "the last N days" see data; pin `start` for runs that must be reproducible
+across days. Skew is built in so
+queries and KPIs see realistic shapes rather than uniform noise:
+
+- heavy users: users are picked with Zipf-like weights (a few users own most traffic)
+- shared IPs: ~15% of traffic comes from a shared pool (Zipf-weighted, some proxies)
+- fraud rings: small groups of users transacting in bursts from a couple of
+  datacenter proxies, high amounts, freight-forwarder shipping; most of it charged back
+- background fraud at `fraud_rate`, partially charged back
+
+Rows are generated in numpy-vectorised chunks and yielded as (table, rows) pairs
+ready for `data.bulk.bulk_load`, so memory stays bounded for 10M+ transactions.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
+
+Chunk = Tuple[str, List[Tuple[Any, ...]]]
+
+_VIP = ("None", "Silver", "Gold", "Platinum")
+_VIP_P = (0.70, 0.15, 0.10, 0.05)
+_COUNTRIES = ("US", "GB", "DE", "FR", "ES", "IT", "NL", "BR", "MX", "IN")
+_COUNTRY_P = (0.40, 0.12, 0.10, 0.08, 0.06, 0.06, 0.05, 0.05, 0.04, 0.04)
+_ISPS = ("Comcast", "Vodafone", "Orange", "Telefonica", "Hostinger", "OVH", "DigitalOcean")
+_KYC_STATUS = ("VERIFIED", "PENDING", "FAILED")
+_KYC_P = (0.90, 0.07, 0.03)
+_CB_REASONS = ("10.4", "13.1", "4837", "4863", "UA02")
+_FORWARDERS = ("Freight Forwarder, DE", "Freight Forwarder, NL", "Freight Forwarder, US")
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    users: int = 10_000
+    transactions: int = 1_000_000
+    seed: int = 42
+    start: Optional[str] = None  # None -> `days` before today's UTC midnight
+    days: int = 90
+    merchants: int = 500
+    shared_ips: int = 0  # 0 -> users // 20 (min 16)
+    proxy_share: float = 0.10  # fraction of the shared pool that is datacenter/proxy
+    rings: int = 0  # 0 -> users // 2000 (min 1)
+    ring_size: int = 8
+    ring_traffic: float = 0.003  # fraction of transactions made by ring members
+    fraud_rate: float = 0.002  # background (non-ring) fraud
+    chunk_size: int = 100_000
+
+    @property
+    def window_start(self) -> str:
+        if self.start:
+            return self.start
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        return (today - timedelta(days=self.days)).strftime("%Y-%m-%dT%H:%M:%S")
+
+    @property
+    def n_shared_ips(self) -> int:
+        return self.shared_ips or max(16, self.users // 20)
+
+    @property
+    def n_rings(self) -> int:
+        return min(self.rings or max(1, self.users // 2000), max(1, self.users // self.ring_size))
+
+
+def _zipf_cdf(n: int, s: float = 1.1) -> "np.ndarray":
+    import numpy as np
+
+    w = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** s
+    return np.cumsum(w) / w.sum()
+
+
+def _pick(rng: "np.random.Generator", cdf: "np.ndarray", k: int) -> "np.ndarray":
+    import numpy as np
+
+    return np.minimum(np.searchsorted(cdf, rng.random(k)), len(cdf) - 1)
+
+
+def _home_ip(i: int) -> str:
+    return f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+
+def _shared_ip(i: int) -> str:
+    return f"45.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+
+def _ts_strings(base: "np.datetime64", secs: "np.ndarray") -> List[str]:
+    import numpy as np
+
+    stamps = np.datetime_as_string(base + secs.astype("timedelta64[s]"), unit="s")
+    return [s.replace("T", " ") for s in stamps.tolist()]
+
+
+def generate(cfg: SyntheticConfig = SyntheticConfig()) -> Iterator[Chunk]:
+    """Yield (table, rows) chunks for users, ip_intel, kyc_events, disputes,
+    transactions and chargebacks (rows in each table's column order)."""
+    import numpy as np
+
+    rng = np.random.default_rng(cfg.seed)
+    n_users, n_ips, n_rings = cfg.users, cfg.n_shared_ips, cfg.n_rings
+    base = np.datetime64(cfg.window_start, "s")
+    span = cfg.days * 86400
+
+    # ---- users (shuffled so heavy users are not simply the lowest IDs)
+    user_rank = rng.permutation(n_users)
+    vip = rng.choice(len(_VIP), n_users, p=_VIP_P).tolist()
+    country = rng.choice(len(_COUNTRIES), n_users, p=_COUNTRY_P)
+    age = rng.integers(0, 3650, n_users).tolist()
+
+    # Per-entity strings, built once.
+    user_ids = [f"U{i:07d}" for i in range(n_users)]
+    home_ips = [_home_ip(i) for i in range(n_users)]
+    country_names = [_COUNTRIES[c] for c in country.tolist()]
+    for lo in range(0, n_users, cfg.chunk_size):
+        yield "users", [
+            (user_ids[i], f"User {i}", f"user{i}@example.com", home_ips[i], age[i], _VIP[vip[i]], country_names[i])
+            for i in range(lo, min(lo + cfg.chunk_size, n_users))
+        ]
+
+    # ---- shared IP pool + intel
+    is_proxy = rng.random(n_ips) < cfg.proxy_share
+    rep = np.where(is_proxy, rng.integers(70, 100, n_ips), rng.integers(0, 40, n_ips))
+    isp = np.where(is_proxy, rng.integers(4, len(_ISPS), n_ips), rng.integers(0, 4, n_ips))
+    shared_ips = [_shared_ip(i) for i in range(n_ips)]
+    yield "ip_intel", [
+        (shared_ips[i], r, _ISPS[p], int(x))
+        for i, (r, p, x) in enumerate(zip(rep.tolist(), isp.tolist(), is_proxy.tolist()))
+    ]
+    proxies = np.flatnonzero(is_proxy)
+    if proxies.size == 0:
+        proxies = np.array([0])
+
+    # ---- KYC (1-3 events per user; the latest one wins) and disputes (~5% of users)
+    kyc_user = np.repeat(np.arange(n_users), rng.integers(1, 4, n_users))
+    kyc_status = rng.choice(len(_KYC_STATUS), kyc_user.size, p=_KYC_P).tolist()
+    kyc_day = rng.integers(0, 3650, kyc_user.size)
+    kyc_ts = _ts_strings(base, -kyc_day * 86400)
+    kyc_user_l, kyc_day_l = kyc_user.tolist(), kyc_day.tolist()
+    for lo in range(0, kyc_user.size, cfg.chunk_size):
+        yield "kyc_events", [
+            (user_ids[kyc_user_l[j]], _KYC_STATUS[kyc_status[j]], "L2" if kyc_day_l[j] % 3 else "L1", kyc_ts[j])
+            for j in range(lo, min(lo + cfg.chunk_size, kyc_user.size))
+        ]
+
+    disputed = np.flatnonzero(rng.random(n_users) < 0.05)
+    d_count = rng.integers(1, 6, disputed.size)
+    d_loss = np.round(rng.lognormal(5.0, 1.0, disputed.size), 2)
+    d_date = _ts_strings(base, -rng.integers(0, 90, disputed.size) * 86400)
+    yield "disputes", [
+        (user_ids[u], c, loss, d[:10])
+        for u, c, loss, d in zip(disputed.tolist(), d_count.tolist(), d_loss.tolist(), d_date)
+    ]
+
+    # ---- fraud rings: members, proxies and burst windows
+    ring_members = rng.choice(n_users, n_rings * cfg.ring_size, replace=False).reshape(n_rings, cfg.ring_size)
+    ring_ips = proxies[rng.integers(0, proxies.size, (n_rings, 2))]
+    ring_bursts = rng.integers(0, max(1, span - 3600), (n_rings, 3))
+
+    billing_by_user = [f"User {i}, {country_names[i]}" for i in range(n_users)]
+    merchant_ids = [f"M{i:04d}" for i in range(cfg.merchants)]
+
+    user_cdf = _zipf_cdf(n_users)
+    ip_cdf = _zipf_cdf(n_ips, 1.2)
+    merchant_cdf = _zipf_cdf(cfg.merchants, 1.0)
+
+    # ---- transactions (+ chargebacks for the fraudulent ones)
+    for lo in range(0, cfg.transactions, cfg.chunk_size):
+        k = min(cfg.chunk_size, cfg.transactions - lo)
+        ids = np.arange(lo, lo + k)
+
+        in_ring = rng.random(k) < cfg.ring_traffic
+        ring = rng.integers(0, n_rings, k)
+        user = np.where(
+            in_ring, ring_members[ring, rng.integers(0, cfg.ring_size, k)], user_rank[_pick(rng, user_cdf, k)]
+        )
+        secs = np.where(
+            in_ring,
+            ring_bursts[ring, rng.integers(0, 3, k)] + rng.integers(0, 3600, k),
+            rng.integers(0, span, k),
+        )
+        amount = np.round(np.where(in_ring, rng.lognormal(6.8, 0.4, k), rng.lognormal(3.6, 1.0, k)), 2)
+        shared = rng.random(k) < 0.15
+        shared_ip = _pick(rng, ip_cdf, k)
+        ring_ip = ring_ips[ring, rng.integers(0, 2, k)]
+        merchant = _pick(rng, merchant_cdf, k)
+        ship_other = rng.random(k) < 0.08
+        forwarder = rng.integers(0, len(_FORWARDERS), k)
+        fraud = in_ring | (rng.random(k) < cfg.fraud_rate)
+        charged_back = fraud & (rng.random(k) < np.where(in_ring, 0.8, 0.6))
+        cb_delay = rng.integers(7, 60, k)
+        cb_reason = rng.integers(0, len(_CB_REASONS), k)
+
+        ts = _ts_strings(base, secs)
+        ring_l, ring_ip_l, fwd_l = in_ring.tolist(), ring_ip.tolist(), forwarder.tolist()
+        shared_l, shared_ip_l, other_l = shared.tolist(), shared_ip.tolist(), ship_other.tolist()
+        txns: List[Tuple[Any, ...]] = []
+        for n, (tid, u, amt, m) in enumerate(zip(ids.tolist(), user.tolist(), amount.tolist(), merchant.tolist())):
+            billing = billing_by_user[u]
+            if ring_l[n]:
+                ip, shipping = shared_ips[ring_ip_l[n]], _FORWARDERS[fwd_l[n]]
+            else:
+                ip = shared_ips[shared_ip_l[n]] if shared_l[n] else home_ips[u]
+                shipping = f"Addr {tid % 9973}, {country_names[u]}" if other_l[n] else billing
+            txns.append((f"T{tid:09d}", user_ids[u], amt, merchant_ids[m], ip, shipping, billing, ts[n]))
+        yield "transactions", txns
+
+        cb = np.flatnonzero(charged_back)
+        if cb.size:
+            cb_dates = _ts_strings(base, secs[cb] + cb_delay[cb] * 86400)
+            yield "chargebacks", [
+                (f"T{int(ids[n]):09d}", float(amount[n]), _CB_REASONS[cb_reason[n]], d[:10])
+                for n, d in zip(cb.tolist(), cb_dates)
+            ]
+
+
+def summarize(cfg: SyntheticConfig) -> Dict[str, Any]:
+    return {
+        "seed": cfg.seed,
+        "start": cfg.window_start,
+        "days": cfg.days,
+        "users": cfg.users,
+        "transactions": cfg.transactions,
+        "shared_ips": cfg.n_shared_ips,
+        "rings": cfg.n_rings,
+        "ring_size": cfg.ring_size,
+    }
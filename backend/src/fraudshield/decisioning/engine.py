@@ -2,7 +2,80 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional
+
+from ..core.settings import settings
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Code tables for the bulk mode (decide_batch). Rule/reason tables are sorted so that
+# decoding a bitset in bit order yields the same `sorted(set(...))` lists as `decide`.
+DECISIONS = ("ALLOW", "CHALLENGE", "DENY")
+RULE_CODES = tuple(
+    sorted(("RULE_PROXY_SIGNAL", "RULE_FREIGHT_FORWARDER_SIGNAL", "RULE_SHIP_BILL_MISMATCH"))
+)
+REASON_CODES = tuple(
+    sorted(
+        (
+            "RC014_IP_DATACENTER_PROXY",
+            "RC031_FREIGHT_FORWARDER",
+            "RC041_SHIP_BILL_MISMATCH",
+            "RC_ML_HIGH_RISK",
+            "RC_ML_MEDIUM_HIGH_RISK",
+        )
+    )
+)
+
+
+@lru_cache(maxsize=32)
+def parse_rules(spec: str) -> frozenset:
+    """DECISION_RULES value -> enabled rule codes ("all", "none" or a comma list)."""
+    spec = (spec or "").strip()
+    if spec.lower() == "all":
+        return frozenset(RULE_CODES)
+    if spec.lower() in ("", "none"):
+        return frozenset()
+    rules = frozenset(r.strip() for r in spec.split(",") if r.strip())
+    unknown = rules - set(RULE_CODES)
+    if unknown:
+        raise ValueError(f"unknown decision rules: {sorted(unknown)}")
+    return rules
+
+
+def _bit(table: tuple, code: str) -> int:
+    return 1 << table.index(code)
+
+
+def decode_bits(bits: int, table: tuple) -> List[str]:
+    b = int(bits)
+    return [code for i, code in enumerate(table) if b >> i & 1]
+
+
+@dataclass(frozen=True)
+class BatchDecisions:
+    """
+    Compact result of `DecisionEngine.decide_batch`:
+    - decision: uint8 index into DECISIONS
+    - rule_bits / reason_bits: uint8 bitsets over RULE_CODES / REASON_CODES
+    """
+
+    decision: "np.ndarray"
+    rule_bits: "np.ndarray"
+    reason_bits: "np.ndarray"
+
+    def __len__(self) -> int:
+        return len(self.decision)
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Row `i` in the same shape `DecisionEngine.decide` returns."""
+        return {
+            "decision": DECISIONS[int(self.decision[i])],
+            "rule_hits": decode_bits(self.rule_bits[i], RULE_CODES),
+            "reason_codes": decode_bits(self.reason_bits[i], REASON_CODES),
+        }
 
 
 class DecisionEngine:
@@ -14,32 +87,45 @@ class DecisionEngine:
     Notes:
     - This layer should remain deterministic and auditable.
     - LLM outputs must not affect decisions directly.
+    - Thresholds and enabled rules default to DENY_THRESHOLD / CHALLENGE_THRESHOLD /
+      DECISION_RULES; `decisioning/backtest.py` replays alternatives.
     """
 
+    def __init__(
+        self,
+        deny_threshold: Optional[float] = None,
+        challenge_threshold: Optional[float] = None,
+        rules: Optional[Iterable[str]] = None,
+    ) -> None:
+        s = settings()
+        self.deny_threshold = float(s.deny_threshold if deny_threshold is None else deny_threshold)
+        self.challenge_threshold = float(s.challenge_threshold if challenge_threshold is None else challenge_threshold)
+        self.rules = parse_rules(s.decision_rules) if rules is None else frozenset(rules)
+
     def decide(self, features: Dict[str, Any], risk_score: float) -> Dict[str, Any]:
         rule_hits: List[str] = []
         reason_codes: List[str] = []
 
         # Rule signals (feature-driven)
-        if bool(features.get("ip_is_proxy")):
+        if "RULE_PROXY_SIGNAL" in self.rules and bool(features.get("ip_is_proxy")):
             rule_hits.append("RULE_PROXY_SIGNAL")
             reason_codes.append("RC014_IP_DATACENTER_PROXY")
 
-        if bool(features.get("shipping_is_freight_forwarder")):
+        if "RULE_FREIGHT_FORWARDER_SIGNAL" in self.rules and bool(features.get("shipping_is_freight_forwarder")):
             rule_hits.append("RULE_FREIGHT_FORWARDER_SIGNAL")
             reason_codes.append("RC031_FREIGHT_FORWARDER")
 
-        if bool(features.get("ship_bill_mismatch")):
+        if "RULE_SHIP_BILL_MISMATCH" in self.rules and bool(features.get("ship_bill_mismatch")):
             rule_hits.append("RULE_SHIP_BILL_MISMATCH")
             reason_codes.append("RC041_SHIP_BILL_MISMATCH")
 
         # Thresholds + rule bias
-        if risk_score >= 0.90:
+        if risk_score >= self.deny_threshold:
             decision = "DENY"
             reason_codes.append("RC_ML_HIGH_RISK")
-        elif risk_score >= 0.70 or len(rule_hits) > 0:
+        elif risk_score >= self.challenge_threshold or len(rule_hits) > 0:
             decision = "CHALLENGE"
-            if risk_score >= 0.70:
+            if risk_score >= self.challenge_threshold:
                 reason_codes.append("RC_ML_MEDIUM_HIGH_RISK")
         else:
             decision = "ALLOW"
@@ -49,3 +135,44 @@ class DecisionEngine:
             "rule_hits": sorted(set(rule_hits)),
             "reason_codes": sorted(set(reason_codes)),
         }
+
+    def decide_batch(self, features: Mapping[str, Any], risk_scores: Any) -> BatchDecisions:
+        """
+        Same policy as `decide`, evaluated over arrays with boolean masks.
+
+        `features` is a dict-of-arrays (or structured array) with `ip_is_proxy`,
+        `shipping_is_freight_forwarder` and `ship_bill_mismatch`; `risk_scores` is
+        array-like. Row i of the result equals `decide(row_i, risk_scores[i])`.
+        """
+        import numpy as np  # type: ignore
+
+        score = np.asarray(risk_scores, dtype=np.float64)
+        proxy = np.asarray(features["ip_is_proxy"]).astype(bool) & ("RULE_PROXY_SIGNAL" in self.rules)
+        ff = np.asarray(features["shipping_is_freight_forwarder"]).astype(bool) & (
+            "RULE_FREIGHT_FORWARDER_SIGNAL" in self.rules
+        )
+        sbm = np.asarray(features["ship_bill_mismatch"]).astype(bool) & ("RULE_SHIP_BILL_MISMATCH" in self.rules)
+
+        rule_bits = (
+            proxy * np.uint8(_bit(RULE_CODES, "RULE_PROXY_SIGNAL"))
+            | ff * np.uint8(_bit(RULE_CODES, "RULE_FREIGHT_FORWARDER_SIGNAL"))
+            | sbm * np.uint8(_bit(RULE_CODES, "RULE_SHIP_BILL_MISMATCH"))
+        ).astype(np.uint8)
+
+        deny = score >= self.deny_threshold
+        medium = ~deny & (score >= self.challenge_threshold)
+        challenge = ~deny & (medium | (rule_bits != 0))
+
+        reason_bits = (
+            proxy * np.uint8(_bit(REASON_CODES, "RC014_IP_DATACENTER_PROXY"))
+            | ff * np.uint8(_bit(REASON_CODES, "RC031_FREIGHT_FORWARDER"))
+            | sbm * np.uint8(_bit(REASON_CODES, "RC041_SHIP_BILL_MISMATCH"))
+            | deny * np.uint8(_bit(REASON_CODES, "RC_ML_HIGH_RISK"))
+            | medium * np.uint8(_bit(REASON_CODES, "RC_ML_MEDIUM_HIGH_RISK"))
+        ).astype(np.uint8)
+
+        decision = np.zeros(score.shape, dtype=np.uint8)
+        decision[challenge] = DECISIONS.index("CHALLENGE")
+        decision[deny] = DECISIONS.index("DENY")
+
+        return BatchDecisions(decision=decision, rule_bits=rule_bits, reason_bits=reason_bits)
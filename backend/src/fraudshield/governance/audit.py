@@ -4,10 +4,12 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Dict, List, Optional, Tuple
 
 from ..core.settings import settings
+from ..util.batching import GroupCommitWorker
 
 
 def append_audit_jsonl(
@@ -26,12 +28,20 @@ def append_audit_jsonl(
     - In production, prefer a write-once store (e.g., immutable bucket/table) with retention controls.
     - Do NOT store raw PII here; keep it to IDs, scores, decisions, reason codes, and metadata.
     """
-    s = settings()
-    os.makedirs(s.logs_path, exist_ok=True)
+    rec = build_audit_record(txn_id, decision, risk_score, model_version, reason_codes, rule_hits, extra)
+    return append_audit_records([rec])
 
-    path = os.path.join(s.logs_path, "decisions.jsonl")
 
-    rec = {
+def build_audit_record(
+    txn_id: str,
+    decision: str,
+    risk_score: float,
+    model_version: str,
+    reason_codes: List[str],
+    rule_hits: List[str],
+    extra: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    return {
         "ts_utc": datetime.now(timezone.utc).isoformat(),
         "transaction_id": txn_id,
         "decision": decision,
@@ -42,7 +52,146 @@ def append_audit_jsonl(
         "extra": extra or {},
     }
 
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+def append_audit_records(records: List[Dict[str, Any]]) -> str:
+    """
+    Append many audit records with a single open/write (batch decision path).
+    Records are built with the same shape as `append_audit_jsonl`.
+
+    When the background writer is running (see `start_audit_writer`), records are
+    queued and group-committed off the request path instead.
+    """
+    path = _audit_path()
+    if not records:
+        return path
+
+    w, sink = _writer, _sink
+    if sink is not None:
+        # Back-pressure: submit() blocks while the queue is full; if it still cannot
+        # accept, write inline so no record is ever lost. Inline writes go through the
+        # writer's own handle (under its lock): a second handle would interleave with
+        # its buffered, possibly partial, writes. If the disk is failing, this raises.
+        if w is not None and w.running:
+            records = [rec for rec in records if not w.submit(rec)]
+        if records:
+            sink.write(records)
+        return path
+
+    with _open_append(path) as f:
+        f.write(_encode(records))
 
     return path
+
+
+_path: Optional[Tuple[str, str]] = None  # (LOGS_PATH, its decisions.jsonl)
+
+
+def _audit_path() -> str:
+    # Runs on every decision: no filesystem calls here. The directory is created when
+    # the writer starts and when an open finds it missing (`_open_append`).
+    global _path
+    logs = settings().logs_path
+    cached = _path
+    if cached is None or cached[0] != logs:
+        cached = _path = (logs, os.path.join(logs, "decisions.jsonl"))
+    return cached[1]
+
+
+def _open_append(path: str) -> IO[str]:
+    try:
+        return open(path, "a", encoding="utf-8")
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return open(path, "a", encoding="utf-8")
+
+
+def _encode(records: List[Dict[str, Any]]) -> str:
+    return "".join(json.dumps(rec, ensure_ascii=False) + "\n" for rec in records)
+
+
+class _AuditFileSink:
+    """Long-lived append handle shared by the background writer and inline fallbacks."""
+
+    def __init__(self, path: str, durability: str) -> None:
+        if durability not in ("none", "flush", "fsync"):
+            raise ValueError(f"invalid audit durability: {durability!r} (none|flush|fsync)")
+        self.path = path
+        self.durability = durability
+        self._f: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        data = _encode(records)
+        with self._lock:
+            if self._f is None:
+                self._f = _open_append(self.path)
+            self._f.write(data)
+            if self.durability in ("flush", "fsync"):
+                self._f.flush()
+            if self.durability == "fsync":
+                os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._f is not None:
+                self._f.flush()
+                os.fsync(self._f.fileno())
+                self._f.close()
+                self._f = None
+
+
+_sink: Optional[_AuditFileSink] = None
+
+
+_writer: Optional[GroupCommitWorker] = None
+_writer_lock = threading.Lock()
+
+
+def start_audit_writer() -> Optional[GroupCommitWorker]:
+    """
+    Start the background group-commit audit writer (API lifespan startup).
+    No-op when AUDIT_MODE=sync.
+    """
+    global _writer, _sink
+    s = settings()
+    if s.audit_mode != "async":
+        return None
+
+    with _writer_lock:
+        if _writer is None or not _writer.running:
+            path = _audit_path()
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            sink = _AuditFileSink(path, s.audit_durability)
+            _sink = sink
+            _writer = GroupCommitWorker(
+                "fraudshield-audit-writer",
+                flush_fn=sink.write,
+                batch_size=s.audit_batch_size,
+                flush_interval_ms=s.audit_flush_ms,
+                queue_max=s.audit_queue_max,
+                put_timeout_s=s.audit_put_timeout_ms / 1000.0,
+                # Append-only log: never drop a batch. A failing disk stalls the writer
+                # until it recovers; producers then hit the inline path and get the error.
+                max_retries=None,
+                on_close=sink.close,
+            ).start()
+        return _writer
+
+
+def stop_audit_writer(timeout: Optional[float] = 10.0) -> None:
+    """Drain queued records to disk and stop the writer (API lifespan shutdown)."""
+    global _writer, _sink
+    with _writer_lock:
+        w, _writer = _writer, None
+    if w is not None:
+        w.stop(timeout)
+    # Records written inline while the writer drained went through the same handle.
+    with _writer_lock:
+        sink, _sink = _sink, None
+    if sink is not None:
+        sink.close()
+
+
+def audit_writer_stats() -> Dict[str, Any]:
+    w = _writer
+    return {"mode": settings().audit_mode, **(w.stats() if w is not None else {"running": False})}
@@ -1,27 +1,182 @@
 from __future__ import annotations
 
-import sqlite3
+import json
+import logging
+import os
+import threading
 import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from ..core.settings import settings
+from ..data.pool import connection
+from ..monitoring.rollups import apply_rollups
+from ..util.batching import GroupCommitWorker
+
+_SQL_INSERT_EVENT = (
+    "INSERT INTO decision_events(event_id, trans_id, decision, risk_score, model_version, timestamp) "
+    "VALUES(?,?,?,?,?,?)"
+)
+
+EventRow = Tuple[str, str, str, float, str, str]
+
+log = logging.getLogger(__name__)
+
+# Batches the sink could not insert after its retries; replayed by `replay_spilled_events`.
+_SPILL_FILE = "decision_events.spill.jsonl"
+_spill_lock = threading.Lock()
+
+
+def _event_row(trans_id: str, decision: str, risk_score: float, model_version: str) -> EventRow:
+    # event_id and timestamp are fixed at decision time, not at (possibly deferred) insert time.
+    # Timestamp format matches SQLite CURRENT_TIMESTAMP (UTC) so window queries keep working.
+    ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    return (str(uuid.uuid4()), trans_id, decision, float(risk_score), model_version, ts)
+
+
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def events_generation() -> int:
+    """Counter bumped after every committed events write (cache invalidation signal)."""
+    return _generation
+
+
+def _insert_events(rows: Sequence[EventRow]) -> None:
+    global _generation
+    # Events and their KPI rollup increments commit (or roll back) together.
+    with connection() as conn:
+        conn.executemany(_SQL_INSERT_EVENT, rows)
+        apply_rollups(conn, rows)
+    with _generation_lock:
+        _generation += 1
+
+
+def _spill_path() -> str:
+    s = settings()
+    os.makedirs(s.logs_path, exist_ok=True)
+    return os.path.join(s.logs_path, _SPILL_FILE)
+
+
+def _spill_events(rows: Sequence[EventRow]) -> None:
+    # The API already returned these event IDs: park the rows on disk rather than drop them.
+    with _spill_lock, open(_spill_path(), "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(list(r)) + "\n" for r in rows))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def replay_spilled_events() -> int:
+    """Insert spilled events (skipping IDs already present). Returns the rows inserted."""
+    path = _spill_path()
+    replay = path + ".replay"
+    with _spill_lock:
+        if os.path.exists(path):
+            if os.path.exists(replay):
+                # A previous replay failed part-way: fold the new spills into it.
+                with open(path, "r", encoding="utf-8") as src, open(replay, "a", encoding="utf-8") as dst:
+                    dst.write(src.read())
+                os.remove(path)
+            else:
+                os.replace(path, replay)
+    if not os.path.exists(replay):
+        return 0
+
+    with open(replay, "r", encoding="utf-8") as f:
+        rows = [tuple(json.loads(line)) for line in f if line.strip()]
+    rows = list({r[0]: r for r in rows}.values())
+    with connection() as conn:
+        known = set()
+        for i in range(0, len(rows), 500):
+            ids = [r[0] for r in rows[i : i + 500]]
+            q = f"SELECT event_id FROM decision_events WHERE event_id IN ({','.join('?' * len(ids))})"
+            known.update(e for (e,) in conn.execute(q, ids))
+    missing = [r for r in rows if r[0] not in known]
+    if missing:
+        _insert_events(missing)
+    os.remove(replay)
+    if missing:
+        log.warning("replayed %d spilled decision events", len(missing))
+    return len(missing)
 
 
 def record_decision_event(
     trans_id: str, decision: str, risk_score: float, model_version: str
 ) -> str:
     """Persist an event for KPI computation."""
+    return record_decision_events([(trans_id, decision, risk_score, model_version)])[0]
+
+
+def record_decision_events(events: Sequence[Tuple[str, str, float, str]]) -> List[str]:
+    """Persist many (trans_id, decision, risk_score, model_version) events.
+
+    The event IDs are generated here, synchronously, so callers can return them right away.
+    When the batched sink is running (see `start_event_sink`), rows are queued and
+    inserted in multi-row transactions on a background thread; otherwise (or if the
+    queue stays full) they are inserted in one transaction inline.
+    """
+    rows = [_event_row(t, d, r, m) for t, d, r, m in events]
+    if not rows:
+        return []
+
+    pending = rows
+    sink = _sink
+    if sink is not None and sink.running:
+        pending = [row for row in rows if not sink.submit(row)]
+
+    if pending:
+        _insert_events(pending)
+    return [row[0] for row in rows]
+
+
+_sink: Optional[GroupCommitWorker] = None
+_sink_lock = threading.Lock()
 
+
+def start_event_sink() -> Optional[GroupCommitWorker]:
+    """Start the batched decision_events writer (API lifespan startup). No-op when EVENT_MODE=sync.
+
+    Events spilled by an earlier run (see `_spill_events`) are inserted first.
+    """
+    global _sink
     s = settings()
-    conn = sqlite3.connect(s.db_path)
-    try:
-        cur = conn.cursor()
-        event_id = str(uuid.uuid4())
-        cur.execute(
-            "INSERT INTO decision_events(event_id, trans_id, decision, risk_score, model_version) "
-            "VALUES(?,?,?,?,?)",
-            (event_id, trans_id, decision, float(risk_score), model_version),
-        )
-        conn.commit()
-        return event_id
-    finally:
-        conn.close()
+    if s.event_mode != "async":
+        return None
+
+    replay_spilled_events()
+    with _sink_lock:
+        if _sink is None or not _sink.running:
+            _sink = GroupCommitWorker(
+                "fraudshield-event-sink",
+                flush_fn=_insert_events,
+                batch_size=s.event_batch_size,
+                flush_interval_ms=s.event_flush_ms,
+                queue_max=s.event_queue_max,
+                put_timeout_s=s.event_put_timeout_ms / 1000.0,
+                # ~4s of backoff (database locked, disk busy), then spill to disk:
+                # callers already hold these event IDs, so a batch is never just dropped.
+                max_retries=10,
+                on_failure=_spill_events,
+            ).start()
+        return _sink
+
+
+def flush_events(timeout: Optional[float] = 10.0) -> bool:
+    """Wait until every event queued so far is in the database."""
+    sink = _sink
+    return sink.wait_flushed(timeout) if sink is not None else True
+
+
+def stop_event_sink(timeout: Optional[float] = 10.0) -> None:
+    """Flush queued events and stop the writer (API lifespan shutdown)."""
+    global _sink
+    with _sink_lock:
+        sink, _sink = _sink, None
+    if sink is not None:
+        sink.stop(timeout)
+
+
+def event_sink_stats() -> Dict[str, Any]:
+    sink = _sink
+    return {"mode": settings().event_mode, **(sink.stats() if sink is not None else {"running": False})}
@@ -0,0 +1,157 @@
+# FraudShield-Enterprise/backend/src/fraudshield/modeling/holder.py
+
+"""
+In-process model cache.
+
+The scorer asks the holder for the resident model instead of reading `latest.json`
+and deserialising the artifact on every transaction. The holder re-checks the
+registry pointer at most every `model_reload_interval_s` seconds (a single `stat`),
+loads a new artifact off to the side when the pointer changes, and swaps it in with
+one reference assignment, so in-flight requests keep scoring on the old model.
+
+After the first load, the pointer check and any artifact load run on a background
+thread: `get()` is an attribute read plus a clock compare, safe to call on the event
+loop. Only the very first `get()` in a process (nothing to serve yet) loads inline;
+the API loads at startup instead (`reload()` in the lifespan).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from ..core.settings import settings
+from ..monitoring.metrics import MODEL_LOAD_SECONDS
+from .linear import is_linear_artifact, load_linear
+from .registry import get_latest, pointer_signature
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    model: Any
+    model_version: str
+    model_path: str
+    loaded_at: float
+    load_ms: float
+
+
+def _load_artifact(model_path: str) -> Any:
+    if is_linear_artifact(model_path):
+        # Compact linear artifact: plain JSON, no sklearn import (modeling/linear.py).
+        from .scoring import MODEL_INPUTS
+
+        return load_linear(model_path, expected_features=MODEL_INPUTS)
+
+    # joblib only available when installing `fraudshield[ml]`
+    import joblib  # type: ignore
+
+    return joblib.load(model_path)
+
+
+class ModelHolder:
+    def __init__(self, reload_interval_s: Optional[float] = None) -> None:
+        self.reload_interval_s = (
+            settings().model_reload_interval_s if reload_interval_s is None else reload_interval_s
+        )
+        self._current: Optional[LoadedModel] = None
+        self._signature: Any = object()  # sentinel: forces the first check
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._checked = False
+
+        self.loads = 0
+        self.load_errors = 0
+        self.last_error: Optional[str] = None
+
+    def get(self) -> Optional[LoadedModel]:
+        """Return the resident model (None if no usable model is registered)."""
+        if time.monotonic() >= self._next_check:
+            if not self._checked:
+                return self.reload()
+            # Only one thread checks/reloads, in the background; callers keep serving
+            # the current model meanwhile.
+            if self._reload_lock.acquire(blocking=False):
+                self._next_check = time.monotonic() + self.reload_interval_s
+                threading.Thread(target=self._check_locked, name="fraudshield-model-reload", daemon=True).start()
+        return self._current
+
+    def _check_locked(self) -> None:
+        # Runs with _reload_lock held (acquired by `get`).
+        try:
+            self._check()
+        finally:
+            self._reload_lock.release()
+
+    def reload(self) -> Optional[LoadedModel]:
+        """Force a pointer check now (e.g. right after registering a model)."""
+        with self._reload_lock:
+            self._signature = object()
+            self._check()
+        return self._current
+
+    def _check(self) -> None:
+        self._next_check = time.monotonic() + self.reload_interval_s
+        self._checked = True
+
+        sig = pointer_signature()
+        if sig == self._signature:
+            return
+        self._signature = sig
+
+        ptr = get_latest()
+        if ptr is None:
+            self._current = None
+            return
+
+        cur = self._current
+        if cur is not None and (cur.model_path, cur.model_version) == (ptr.model_path, ptr.model_version):
+            return
+
+        t0 = time.perf_counter()
+        try:
+            model = _load_artifact(ptr.model_path)
+        except Exception as e:
+            # Keep serving the previous model; retried when the pointer changes again.
+            self.load_errors += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            return
+
+        self._current = LoadedModel(
+            model=model,
+            model_version=ptr.model_version,
+            model_path=ptr.model_path,
+            loaded_at=time.time(),
+            load_ms=(time.perf_counter() - t0) * 1000.0,
+        )
+        MODEL_LOAD_SECONDS.observe(self._current.load_ms / 1000.0)
+        self.loads += 1
+        self.last_error = None
+
+    def stats(self) -> Dict[str, Any]:
+        cur = self._current
+        return {
+            "model_version": cur.model_version if cur else None,
+            "model_path": cur.model_path if cur else None,
+            "load_ms": round(cur.load_ms, 3) if cur else None,
+            "loaded_at": cur.loaded_at if cur else None,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "last_error": self.last_error,
+            "reload_interval_s": self.reload_interval_s,
+        }
+
+
+_holder: Optional[ModelHolder] = None
+_holder_lock = threading.Lock()
+
+
+def get_model_holder() -> ModelHolder:
+    """Process-wide model holder used by `scoring.py`."""
+    global _holder
+    if _holder is None:
+        with _holder_lock:
+            if _holder is None:
+                _holder = ModelHolder()
+    return _holder
@@ -0,0 +1,266 @@
+# FraudShield-Enterprise/backend/src/fraudshield/modeling/linear.py
+
+"""
+Compact artifact format for linear models (`*.linear.json`).
+
+A logistic regression is a handful of floats, but scoring it through a joblib'd sklearn
+estimator costs an sklearn import at cold start and input validation on every call.
+`export_linear` flattens a fitted model into JSON (feature order, coefficients,
+intercept, optional StandardScaler and sigmoid calibration); `load_linear` reads it
+back into a `LinearModel`, which scores with a dot product and never imports sklearn.
+
+Supported estimators: `LogisticRegression`, a `Pipeline` of an optional `StandardScaler`
+followed by `LogisticRegression`, and `CalibratedClassifierCV(method="sigmoid",
+ensemble=False)` around either of those.
+
+    python -m fraudshield.modeling.linear export models/sklearn_lr_x.joblib [--register]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
+
+LINEAR_FORMAT = "fraudshield-linear"
+LINEAR_FORMAT_VERSION = 1
+LINEAR_SUFFIX = ".linear.json"
+
+
+def _expit(z: float) -> float:
+    # Overflow-safe logistic, same values as scipy.special.expit.
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+@dataclass(frozen=True)
+class LinearModel:
+    """Binary logistic model: p = sigmoid(a * z + b) or sigmoid(z), z = w . ((x - mean) / scale) + c."""
+
+    features: Tuple[str, ...]
+    coef: Tuple[float, ...]
+    intercept: float
+    scaler_mean: Optional[Tuple[float, ...]] = None
+    scaler_scale: Optional[Tuple[float, ...]] = None
+    calibration: Optional[Dict[str, float]] = None  # {"method": "sigmoid", "a": .., "b": ..}
+
+    def decision_one(self, x: Sequence[float]) -> float:
+        z = self.intercept
+        mean, scale = self.scaler_mean, self.scaler_scale
+        if mean is None and scale is None:
+            for w, v in zip(self.coef, x):
+                z += w * v
+        else:
+            for i, (w, v) in enumerate(zip(self.coef, x)):
+                if mean is not None:
+                    v -= mean[i]
+                if scale is not None:
+                    v /= scale[i]
+                z += w * v
+        return z
+
+    def predict_one(self, x: Sequence[float]) -> float:
+        """P(fraud) for one row, in pure Python (fastest for a single 7-feature row)."""
+        z = self.decision_one(x)
+        cal = self.calibration
+        if cal is not None:
+            # sklearn's _SigmoidCalibration: expit(-(a * T + b))
+            return _expit(-(cal["a"] * z + cal["b"]))
+        return _expit(z)
+
+    def decision_function(self, X: Any) -> "np.ndarray":
+        import numpy as np
+
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.coef):
+            raise ValueError(f"expected an (n, {len(self.coef)}) matrix, got shape {X.shape}")
+        if self.scaler_mean is not None:
+            X = X - np.asarray(self.scaler_mean)
+        if self.scaler_scale is not None:
+            X = X / np.asarray(self.scaler_scale)
+        return X @ np.asarray(self.coef) + self.intercept
+
+    def predict_proba(self, X: Any) -> "np.ndarray":
+        """(n, 2) [P(legit), P(fraud)], drop-in for the sklearn method the scorers call."""
+        import numpy as np
+
+        z = self.decision_function(X)
+        cal = self.calibration
+        if cal is not None:
+            z = -(cal["a"] * z + cal["b"])
+        # Overflow-safe expit: exp of a non-positive argument only.
+        e = np.exp(-np.abs(z))
+        p = np.where(z >= 0, 1.0 / (1.0 + e), e / (1.0 + e))
+        return np.column_stack([1.0 - p, p])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": LINEAR_FORMAT,
+            "format_version": LINEAR_FORMAT_VERSION,
+            "kind": "logistic",
+            "features": list(self.features),
+            "coef": list(self.coef),
+            "intercept": self.intercept,
+            "scaler": None
+            if self.scaler_mean is None and self.scaler_scale is None
+            else {
+                "mean": None if self.scaler_mean is None else list(self.scaler_mean),
+                "scale": None if self.scaler_scale is None else list(self.scaler_scale),
+            },
+            "calibration": self.calibration,
+        }
+
+
+def _floats(v: Any) -> Optional[Tuple[float, ...]]:
+    return None if v is None else tuple(float(x) for x in v)
+
+
+def from_dict(d: Dict[str, Any]) -> LinearModel:
+    if d.get("format") != LINEAR_FORMAT:
+        raise ValueError(f"not a {LINEAR_FORMAT} artifact")
+    if int(d.get("format_version", 0)) > LINEAR_FORMAT_VERSION:
+        raise ValueError(f"unsupported {LINEAR_FORMAT} version: {d.get('format_version')}")
+
+    features = tuple(d["features"])
+    coef = _floats(d["coef"]) or ()
+    scaler = d.get("scaler") or {}
+    mean, scale = _floats(scaler.get("mean")), _floats(scaler.get("scale"))
+    cal = d.get("calibration")
+    if len(coef) != len(features) or any(v is not None and len(v) != len(features) for v in (mean, scale)):
+        raise ValueError("coefficient / scaler lengths do not match the feature list")
+    if cal is not None:
+        if cal.get("method") != "sigmoid":
+            raise ValueError(f"unsupported calibration: {cal.get('method')}")
+        cal = {"method": "sigmoid", "a": float(cal["a"]), "b": float(cal["b"])}
+
+    return LinearModel(
+        features=features,
+        coef=coef,
+        intercept=float(d["intercept"]),
+        scaler_mean=mean,
+        scaler_scale=scale,
+        calibration=cal,
+    )
+
+
+def load_linear(path: str, expected_features: Optional[Sequence[str]] = None) -> LinearModel:
+    """Read a `*.linear.json` artifact; with `expected_features`, reject a different feature order."""
+    with open(path, "r", encoding="utf-8") as f:
+        model = from_dict(json.load(f))
+    if expected_features is not None and model.features != tuple(expected_features):
+        raise ValueError(f"feature order mismatch: artifact {list(model.features)} != {list(expected_features)}")
+    return model
+
+
+def is_linear_artifact(path: str) -> bool:
+    return path.endswith(LINEAR_SUFFIX)
+
+
+def _from_logistic(estimator: Any) -> Tuple[Tuple[float, ...], float, Optional[Any], Optional[Any]]:
+    """(coef, intercept, scaler_mean, scaler_scale) of a LogisticRegression or scaler+LR Pipeline."""
+    scaler = None
+    if hasattr(estimator, "steps"):
+        steps = [est for _, est in estimator.steps if est not in (None, "passthrough")]
+        if len(steps) == 2 and type(steps[0]).__name__ == "StandardScaler":
+            scaler, estimator = steps
+        elif len(steps) == 1:
+            estimator = steps[0]
+        else:
+            raise ValueError("only Pipeline([StandardScaler?, LogisticRegression]) can be exported")
+    if type(estimator).__name__ != "LogisticRegression":
+        raise ValueError(f"not a logistic regression: {type(estimator).__name__}")
+    if len(estimator.classes_) != 2:
+        raise ValueError("only binary classifiers can be exported")
+
+    coef = tuple(float(w) for w in estimator.coef_[0])
+    intercept = float(estimator.intercept_[0])
+    if scaler is None:
+        return coef, intercept, None, None
+    # sklearn still fits mean_ with with_mean=False (and scale_ is None with with_std=False);
+    # export only what transform() actually applies.
+    mean = getattr(scaler, "mean_", None) if getattr(scaler, "with_mean", True) else None
+    scale = getattr(scaler, "scale_", None) if getattr(scaler, "with_std", True) else None
+    return coef, intercept, mean, scale
+
+
+def to_linear(model: Any, features: Sequence[str]) -> LinearModel:
+    """Flatten a fitted sklearn estimator (see module docstring for what is supported)."""
+    calibration = None
+    if hasattr(model, "calibrated_classifiers_"):
+        members = model.calibrated_classifiers_
+        if len(members) != 1 or members[0].method != "sigmoid":
+            raise ValueError("only CalibratedClassifierCV(method='sigmoid', ensemble=False) can be exported")
+        cal = members[0].calibrators[0]
+        calibration = {"method": "sigmoid", "a": float(cal.a_), "b": float(cal.b_)}
+        model = members[0].estimator
+
+    coef, intercept, mean, scale = _from_logistic(model)
+    if len(coef) != len(features):
+        raise ValueError(f"model has {len(coef)} coefficients but {len(features)} feature names were given")
+    return LinearModel(
+        features=tuple(features),
+        coef=coef,
+        intercept=intercept,
+        scaler_mean=_floats(mean),
+        scaler_scale=_floats(scale),
+        calibration=calibration,
+    )
+
+
+def export_linear(model: Any, path: str, features: Optional[Sequence[str]] = None) -> LinearModel:
+    """Write `model` as a `*.linear.json` artifact (default feature order: the scorer's)."""
+    if features is None:
+        from .scoring import MODEL_INPUTS
+
+        features = MODEL_INPUTS
+    linear = to_linear(model, features)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        # json writes floats with repr(), so weights round-trip bit-exactly.
+        json.dump(linear.to_dict(), f, indent=2)
+    os.replace(tmp, path)
+    return linear
+
+
+def linear_path_for(model_path: str) -> str:
+    base = model_path[: -len(".joblib")] if model_path.endswith(".joblib") else model_path
+    return base + LINEAR_SUFFIX
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="FraudShield linear model artifacts")
+    sub = ap.add_subparsers(dest="command", required=True)
+    ep = sub.add_parser("export", help="convert a joblib'd sklearn model to *.linear.json")
+    ep.add_argument("model_path")
+    ep.add_argument("--out", help="default: next to the joblib file")
+    ep.add_argument("--version", help="register under this model version (default: file stem)")
+    ep.add_argument("--register", action="store_true", help="register the exported artifact")
+    ep.add_argument("--promote", action="store_true", help="register and make it the champion")
+    args = ap.parse_args()
+
+    import joblib  # type: ignore
+
+    out = args.out or linear_path_for(args.model_path)
+    linear = export_linear(joblib.load(args.model_path), out)
+    print(f"✅ Exported {len(linear.coef)}-feature linear model: {out}")
+
+    if args.register or args.promote:
+        from .registry import register_model, set_latest
+
+        version = args.version or os.path.basename(out)[: -len(LINEAR_SUFFIX)]
+        path = os.path.abspath(out)
+        (set_latest if args.promote else register_model)(path, version)
+        print(f"✅ {'Promoted' if args.promote else 'Registered'} {version}")
+
+
+if __name__ == "__main__":
+    main()
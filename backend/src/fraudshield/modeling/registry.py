@@ -1,11 +1,26 @@
 # FraudShield-Enterprise/backend/src/fraudshield/modeling/registry.py
 
+"""
+File-based model registry.
+
+- `versions.json` lists every registered model version (name -> artifact path) and
+  which of them run as shadow challengers (modeling/shadow.py).
+- `latest.json` points at the champion, i.e. the model `score_transaction` uses; it is
+  what the ModelHolder watches, so promoting a version is one atomic pointer write.
+
+    python -m fraudshield.modeling.registry list
+    python -m fraudshield.modeling.registry promote sklearn_lr_20240101000000
+    python -m fraudshield.modeling.registry challengers sklearn_lr_a,sklearn_lr_b
+"""
+
 from __future__ import annotations
 
+import argparse
 import json
 import os
+import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from ..core.settings import settings
 
@@ -25,13 +40,100 @@ def _latest_path() -> str:
     return os.path.join(s.model_registry_path, "latest.json")
 
 
+def _versions_path() -> str:
+    s = settings()
+    os.makedirs(s.model_registry_path, exist_ok=True)
+    return os.path.join(s.model_registry_path, "versions.json")
+
+
+def _write_json(path: str, payload: Dict[str, Any]) -> None:
+    # Replaced atomically so a concurrently reloading scorer never reads a half-written file.
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_versions() -> Dict[str, Any]:
+    """{"versions": {version: {"model_path", "registered_at"}}, "challengers": [version, ...]}"""
+    try:
+        with open(_versions_path(), "r", encoding="utf-8") as f:
+            d = json.load(f)
+    except FileNotFoundError:
+        d = {}
+    d.setdefault("versions", {})
+    d.setdefault("challengers", [])
+    return d
+
+
+def register_model(model_path: str, model_version: str) -> None:
+    """Add (or re-point) a named version without changing the champion."""
+    d = load_versions()
+    d["versions"][model_version] = {"model_path": model_path, "registered_at": time.time()}
+    _write_json(_versions_path(), d)
+
+
 def set_latest(model_path: str, model_version: str) -> None:
     """
-    Persist the pointer to the latest model artifact.
+    Persist the pointer to the latest (champion) model artifact; the version is also
+    registered in versions.json.
     """
-    payload = {"model_path": model_path, "model_version": model_version}
-    with open(_latest_path(), "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2)
+    register_model(model_path, model_version)
+    _write_json(_latest_path(), {"model_path": model_path, "model_version": model_version})
+
+
+def get_model(model_version: str) -> Optional[ModelPointer]:
+    """Pointer for a registered version; None if unknown or its artifact is missing."""
+    entry = load_versions()["versions"].get(model_version)
+    if not entry or not os.path.exists(entry.get("model_path", "")):
+        return None
+    return ModelPointer(model_path=entry["model_path"], model_version=model_version)
+
+
+def promote(model_version: str) -> ModelPointer:
+    """Make a registered version the champion (it stops being a challenger)."""
+    ptr = get_model(model_version)
+    if ptr is None:
+        raise KeyError(f"model version not registered (or artifact missing): {model_version}")
+    set_challengers([v for v in load_versions()["challengers"] if v != model_version])
+    set_latest(ptr.model_path, ptr.model_version)
+    return ptr
+
+
+def set_challengers(model_versions: Sequence[str]) -> None:
+    """Versions scored in shadow. Must be registered (the heuristic baseline is built in)."""
+    from .scoring import HEURISTIC_VERSION
+
+    d = load_versions()
+    unknown = [v for v in model_versions if v not in d["versions"] and v != HEURISTIC_VERSION]
+    if unknown:
+        raise KeyError(f"model versions not registered: {unknown}")
+    d["challengers"] = list(dict.fromkeys(model_versions))
+    _write_json(_versions_path(), d)
+
+
+def get_challengers() -> List[str]:
+    return list(load_versions()["challengers"])
+
+
+def versions_signature() -> Optional[Tuple[int, int, int]]:
+    """Cheap change detector for versions.json (see `pointer_signature`)."""
+    try:
+        st = os.stat(os.path.join(settings().model_registry_path, "versions.json"))
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def pointer_signature() -> Optional[Tuple[int, int, int]]:
+    """
+    Cheap change detector for the latest pointer: (mtime_ns, size, inode), or None if unset.
+    """
+    try:
+        st = os.stat(os.path.join(settings().model_registry_path, "latest.json"))
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
 
 
 def get_latest() -> Optional[ModelPointer]:
@@ -54,3 +156,36 @@ def get_latest() -> Optional[ModelPointer]:
         model_path=model_path,
         model_version=d.get("model_version", "unknown"),
     )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="FraudShield model registry")
+    sub = ap.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="registered versions, champion and challengers")
+    rp = sub.add_parser("register", help="register an artifact without promoting it")
+    rp.add_argument("model_path")
+    rp.add_argument("model_version")
+    pp = sub.add_parser("promote", help="make a registered version the champion")
+    pp.add_argument("model_version")
+    cp = sub.add_parser("challengers", help="set the shadow challengers (comma list; '' = none)")
+    cp.add_argument("model_versions")
+    args = ap.parse_args()
+
+    if args.command == "register":
+        register_model(os.path.abspath(args.model_path), args.model_version)
+    elif args.command == "promote":
+        promote(args.model_version)
+    elif args.command == "challengers":
+        set_challengers([v.strip() for v in args.model_versions.split(",") if v.strip()])
+
+    champion = get_latest()
+    d = load_versions()
+    print(json.dumps({
+        "champion": champion.model_version if champion else None,
+        "challengers": d["challengers"],
+        "versions": d["versions"],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
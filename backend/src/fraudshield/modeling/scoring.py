@@ -3,12 +3,41 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Tuple
 
-from .registry import get_latest
+from ..monitoring.metrics import SCORING_FALLBACKS
+from .holder import get_model_holder
+from .linear import LinearModel
+
+if TYPE_CHECKING:
+    import numpy as np
 
 HEURISTIC_VERSION = "heuristic_baseline_v2"
 
+# Columnar scorer contract: input columns, and reason-code bit i <-> HEURISTIC_REASON_CODES[i].
+# Bit order == the order `_heuristic` appends reasons, so decoding a mask reproduces its list.
+HEURISTIC_INPUTS = (
+    "amount",
+    "ip_is_proxy",
+    "txn_count_1h",
+    "account_age_days",
+    "device_ip_mismatch",
+    "shipping_is_freight_forwarder",
+    "ship_bill_mismatch",
+)
+HEURISTIC_REASON_CODES = (
+    "RC014_IP_DATACENTER_PROXY",
+    "RC003_VELOCITY_1H_HIGH",
+    "RC041_SHIP_BILL_MISMATCH",
+    "RC031_FREIGHT_FORWARDER",
+    "RC022_DEVICE_IP_MISMATCH",
+    "RC010_HIGH_AMOUNT",
+)
+_MAX_REASONS = 5
+
+# Model input columns, in `_model_inputs` / training order (same columns as the heuristic).
+MODEL_INPUTS = HEURISTIC_INPUTS
+
 
 @dataclass(frozen=True)
 class ScoreResult:
@@ -58,49 +87,175 @@ def _heuristic(features: Dict[str, Any]) -> ScoreResult:
     if amt >= 5000:
         reasons.append("RC010_HIGH_AMOUNT")
 
-    return ScoreResult(risk_score=score, model_version=HEURISTIC_VERSION, top_reason_codes=reasons[:5])
+    return ScoreResult(risk_score=score, model_version=HEURISTIC_VERSION, top_reason_codes=reasons[:_MAX_REASONS])
 
 
-def _sklearn_if_available(features: Dict[str, Any]) -> ScoreResult:
+def heuristic_columnar(cols: Mapping[str, Any]) -> Tuple["np.ndarray", "np.ndarray"]:
     """
-    If `fraudshield[ml]` is installed and a joblib model exists, use it.
-    Otherwise raise and caller will fallback to heuristic.
+    Columnar `heuristic_baseline_v2` for backfills / batch scoring.
+
+    `cols` is a dict-of-arrays or a structured NumPy array with the HEURISTIC_INPUTS
+    fields (missing values must already be filled with 0). Returns (scores float64,
+    reason bitmask uint8); see HEURISTIC_REASON_CODES / decode_reason_mask.
+
+    Each term uses the same float64 operations in the same order as `_heuristic`, so
+    scores are bit-identical to the scalar path.
     """
-    ptr = get_latest()
-    if ptr is None:
-        raise FileNotFoundError("No registered model found.")
+    import numpy as np  # type: ignore
 
-    # joblib only available when installing `fraudshield[ml]`
-    import joblib  # type: ignore
+    amt = np.asarray(cols["amount"], dtype=np.float64)
+    is_proxy = np.asarray(cols["ip_is_proxy"]).astype(bool).astype(np.float64)
+    txn_1h = np.asarray(cols["txn_count_1h"], dtype=np.float64)
+    acct_age = np.asarray(cols["account_age_days"], dtype=np.float64)
+    ip_mismatch = np.asarray(cols["device_ip_mismatch"]).astype(bool).astype(np.float64)
+    ff = np.asarray(cols["shipping_is_freight_forwarder"]).astype(bool).astype(np.float64)
+    ship_bill_mismatch = np.asarray(cols["ship_bill_mismatch"]).astype(bool).astype(np.float64)
 
-    model = joblib.load(ptr.model_path)
+    amt_term = np.minimum(1.0, amt / 5000.0)
+    vel_term = np.minimum(1.0, txn_1h / 10.0)
+    age_term = 1.0 - np.minimum(1.0, acct_age / 365.0)
 
+    score = (
+        0.35 * amt_term
+        + 0.20 * is_proxy
+        + 0.15 * vel_term
+        + 0.10 * age_term
+        + 0.05 * ip_mismatch
+        + 0.05 * ff
+        + 0.10 * ship_bill_mismatch
+    )
+    score = np.maximum(0.0, np.minimum(1.0, score))
+
+    conds = (
+        is_proxy != 0.0,
+        txn_1h >= 5,
+        ship_bill_mismatch != 0.0,
+        ff != 0.0,
+        ip_mismatch != 0.0,
+        amt >= 5000,
+    )
+    mask = np.zeros(amt.shape, dtype=np.uint8)
+    kept = np.zeros(amt.shape, dtype=np.uint8)
+    for bit, cond in enumerate(conds):
+        take = cond & (kept < _MAX_REASONS)
+        mask |= take.astype(np.uint8) << np.uint8(bit)
+        kept += take
+
+    return score, mask
+
+
+def decode_reason_mask(mask: int) -> List[str]:
+    """Reason-code list for one row of `heuristic_columnar` output."""
+    m = int(mask)
+    return [code for bit, code in enumerate(HEURISTIC_REASON_CODES) if m >> bit & 1]
+
+
+def _model_inputs(features: Dict[str, Any]) -> List[float]:
     # Feature order must match training (train_supervised.py)
-    X = [
-        [
-            float(features.get("amount", 0.0) or 0.0),
-            1.0 if bool(features.get("ip_is_proxy", False)) else 0.0,
-            float(features.get("txn_count_1h", 0) or 0.0),
-            float(features.get("account_age_days", 0) or 0.0),
-            1.0 if bool(features.get("device_ip_mismatch", False)) else 0.0,
-            1.0 if bool(features.get("shipping_is_freight_forwarder", False)) else 0.0,
-            1.0 if bool(features.get("ship_bill_mismatch", False)) else 0.0,
-        ]
+    return [
+        float(features.get("amount", 0.0) or 0.0),
+        1.0 if bool(features.get("ip_is_proxy", False)) else 0.0,
+        float(features.get("txn_count_1h", 0) or 0.0),
+        float(features.get("account_age_days", 0) or 0.0),
+        1.0 if bool(features.get("device_ip_mismatch", False)) else 0.0,
+        1.0 if bool(features.get("shipping_is_freight_forwarder", False)) else 0.0,
+        1.0 if bool(features.get("ship_bill_mismatch", False)) else 0.0,
     ]
 
-    # Expect predict_proba for binary classifier
-    p = float(model.predict_proba(X)[0][1])
-    p = _clip01(p)
+
+def _sklearn_if_available(features: Dict[str, Any]) -> ScoreResult:
+    """
+    If a registered model exists (a `*.linear.json` artifact, or a joblib model when
+    `fraudshield[ml]` is installed), use it. Otherwise raise and caller will fallback
+    to heuristic.
+
+    The model is kept resident by the ModelHolder (modeling/holder.py); this is a pure
+    in-memory predict.
+    """
+    loaded = get_model_holder().get()
+    if loaded is None:
+        raise FileNotFoundError("No registered model found.")
+
+    model = loaded.model
+
+    if isinstance(model, LinearModel):
+        # *.linear.json artifact: a pure-Python dot product, no array or validation overhead.
+        p = _clip01(model.predict_one(_model_inputs(features)))
+    else:
+        X = [_model_inputs(features)]
+
+        # Expect predict_proba for binary classifier
+        p = float(model.predict_proba(X)[0][1])
+        p = _clip01(p)
 
     return ScoreResult(
         risk_score=p,
-        model_version=ptr.model_version,
+        model_version=loaded.model_version,
         top_reason_codes=["RC_ML_MODEL_SCORE_USED"],
     )
 
 
-def score_transaction(features: Dict[str, Any]) -> ScoreResult:
+def score_transaction(features: Dict[str, Any], record_metrics: bool = True) -> ScoreResult:
+    """`record_metrics=False` keeps synthetic calls (process warm-up) out of /metrics."""
     try:
         return _sklearn_if_available(features)
+    except FileNotFoundError:
+        if record_metrics:
+            SCORING_FALLBACKS.inc("no_model")
+        return _heuristic(features)
     except Exception:
+        if record_metrics:
+            SCORING_FALLBACKS.inc("model_error")
         return _heuristic(features)
+
+
+def _heuristic_batch(features_list: List[Dict[str, Any]]) -> List[ScoreResult]:
+    cols = {
+        name: [features.get(name, 0) or 0 for features in features_list]
+        for name in HEURISTIC_INPUTS
+    }
+    scores, masks = heuristic_columnar(cols)
+    return [
+        ScoreResult(
+            risk_score=float(sc),
+            model_version=HEURISTIC_VERSION,
+            top_reason_codes=decode_reason_mask(m),
+        )
+        for sc, m in zip(scores, masks)
+    ]
+
+
+def score_batch(features_list: List[Dict[str, Any]], record_metrics: bool = True) -> List[ScoreResult]:
+    """
+    Score many transactions at once: one (N x 7) matrix, one predict_proba call.
+    Falls back to the heuristic for the whole batch if no model is usable.
+    """
+    if not features_list:
+        return []
+
+    try:
+        loaded = get_model_holder().get()
+        if loaded is None:
+            raise FileNotFoundError("No registered model found.")
+
+        import numpy as np  # type: ignore
+
+        X = np.array([_model_inputs(f) for f in features_list], dtype=float)
+        p = np.clip(loaded.model.predict_proba(X)[:, 1], 0.0, 1.0)
+    except FileNotFoundError:
+        if record_metrics:
+            SCORING_FALLBACKS.inc("no_model", amount=len(features_list))
+        return _heuristic_batch(features_list)
+    except Exception:
+        if record_metrics:
+            SCORING_FALLBACKS.inc("model_error", amount=len(features_list))
+        return _heuristic_batch(features_list)
+
+    return [
+        ScoreResult(
+            risk_score=float(pi),
+            model_version=loaded.model_version,
+            top_reason_codes=["RC_ML_MODEL_SCORE_USED"],
+        )
+        for pi in p
+    ]
@@ -0,0 +1,388 @@
+"""Champion / challenger shadow scoring.
+
+The champion (registry `latest.json`) decides; challengers (`versions.json`
+"challengers", see modeling/registry.py) are scored on a deterministic sample of
+SHADOW_SAMPLE_RATE of decisions, off the request path:
+
+- `submit` only samples (crc32 of trans_id, so every challenger sees the same
+  transactions) and does a non-blocking put; a full queue drops the work
+  (drop-on-overload), the decision is never delayed
+- SHADOW_WORKERS threads drain the queue in batches, one predict_proba per
+  challenger per batch; they (and `start`) also watch versions.json and load
+  challenger artifacts, so a registry change never costs a request thread anything
+- work older than SHADOW_BUDGET_MS (from decision to shadow score) is dropped, both
+  before scoring and between challengers
+- scores land in `shadow_scores`, keyed by the champion's decision event, through a
+  batched background writer
+
+`compare_shadow` summarises challengers against the champion (score deltas, decision
+agreement, chargeback capture) for GET /shadow.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..core.settings import settings
+from ..data.pool import connection
+from ..monitoring.metrics import counter, histogram
+from ..util.batching import GroupCommitWorker
+from .holder import _load_artifact
+from .registry import get_challengers, get_model, versions_signature
+from .scoring import HEURISTIC_INPUTS, HEURISTIC_VERSION, _model_inputs, heuristic_columnar
+
+SHADOW_SCORES = counter(
+    "fraudshield_shadow_scores_total",
+    "Shadow (challenger) scoring outcomes: scored, dropped_overload, dropped_budget, error.",
+    ("model_version", "outcome"),
+)
+SHADOW_SECONDS = histogram(
+    "fraudshield_shadow_predict_seconds",
+    "Challenger predict time per shadow batch.",
+    ("model_version",),
+)
+
+_SQL_INSERT_SHADOW = (
+    "INSERT OR REPLACE INTO shadow_scores"
+    "(event_id, model_version, trans_id, risk_score, champion_version, champion_score, latency_ms) "
+    "VALUES(?,?,?,?,?,?,?)"
+)
+
+# (event_id, features, champion_version, champion_score)
+ShadowItem = Tuple[str, Dict[str, Any], str, float]
+
+_STOP = object()
+
+
+def sampled(trans_id: str, rate: float) -> bool:
+    """Deterministic per-transaction sampling decision."""
+    return zlib.crc32(trans_id.encode("utf-8")) % 10_000 < int(rate * 10_000)
+
+
+def _insert_shadow_rows(rows: Sequence[Tuple[Any, ...]]) -> None:
+    with connection() as conn:
+        conn.executemany(_SQL_INSERT_SHADOW, rows)
+
+
+class _Challengers:
+    """Challenger models, reloaded when versions.json changes (checked every few seconds).
+
+    Only `start()` and the worker threads call `refresh()` (a stat, plus artifact loads
+    on change); request threads read `models` / `active`, plain attribute reads.
+    """
+
+    def __init__(self, reload_interval_s: float) -> None:
+        self.reload_interval_s = reload_interval_s
+        self.models: List[Tuple[str, Any]] = []
+        self.active = False  # any challenger loaded; gates `submit`
+        self._signature: Any = object()
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.load_errors = 0
+        self.last_error: Optional[str] = None
+
+    def refresh(self) -> List[Tuple[str, Any]]:
+        if time.monotonic() >= self._next_check and self._lock.acquire(blocking=False):
+            try:
+                self._check()
+            finally:
+                self._lock.release()
+        return self.models
+
+    def _check(self) -> None:
+        self._next_check = time.monotonic() + self.reload_interval_s
+        sig = versions_signature()
+        if sig == self._signature:
+            return
+        self._signature = sig
+        loaded = {v: m for v, m in self.models}
+        models: List[Tuple[str, Any]] = []
+        for version in get_challengers():
+            if version == HEURISTIC_VERSION:
+                models.append((version, None))
+                continue
+            if version in loaded:
+                models.append((version, loaded[version]))
+                continue
+            ptr = get_model(version)
+            if ptr is None:
+                continue
+            try:
+                models.append((version, _load_artifact(ptr.model_path)))
+            except Exception as e:
+                self.load_errors += 1
+                self.last_error = f"{version}: {type(e).__name__}: {e}"
+        self.models = models
+        self.active = bool(models)
+
+
+class ShadowScorer:
+    def __init__(
+        self,
+        sample_rate: float,
+        workers: int = 2,
+        queue_max: int = 10_000,
+        budget_ms: float = 250.0,
+        batch_size: int = 256,
+        reload_interval_s: float = 2.0,
+    ) -> None:
+        self.sample_rate = float(sample_rate)
+        self.budget_s = float(budget_ms) / 1000.0
+        self.batch_size = max(1, int(batch_size))
+        self.challengers = _Challengers(reload_interval_s)
+        self._q: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, int(queue_max)))
+        self._workers = max(1, int(workers))
+        self._threads: List[threading.Thread] = []
+        self._writer: Optional[GroupCommitWorker] = None
+        self.running = False
+
+        self.submitted = 0
+        self.dropped_overload = 0
+        self.dropped_budget = 0
+        self.scored = 0
+        self.errors = 0
+
+    # ---------------------------------------------------------------- request path
+    def submit(self, items: Sequence[ShadowItem]) -> int:
+        """Queue the sampled share of `items`; never blocks or loads. Returns the number queued."""
+        if not self.running or not self.challengers.active:
+            return 0
+        picked = [it for it in items if sampled(str(it[1].get("trans_id", "")), self.sample_rate)]
+        if not picked:
+            return 0
+        try:
+            self._q.put_nowait((time.monotonic(), picked))
+        except queue.Full:
+            self.dropped_overload += len(picked)
+            SHADOW_SCORES.inc("*", "dropped_overload", amount=len(picked))
+            return 0
+        self.submitted += len(picked)
+        return len(picked)
+
+    # ---------------------------------------------------------------- workers
+    def start(self) -> "ShadowScorer":
+        if self.running:
+            return self
+        s = settings()
+        self._writer = GroupCommitWorker(
+            "fraudshield-shadow-writer",
+            flush_fn=_insert_shadow_rows,
+            batch_size=s.event_batch_size,
+            flush_interval_ms=s.event_flush_ms,
+            queue_max=s.event_queue_max,
+            put_timeout_s=0.0,
+        ).start()
+        self.challengers.refresh()  # initial load at startup, not on the first decision
+        self.running = True
+        for i in range(self._workers):
+            t = threading.Thread(target=self._run, name=f"fraudshield-shadow-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Score what is already queued (budget permitting), then stop."""
+        if not self.running:
+            return
+        self.running = False
+        for _ in self._threads:
+            self._q.put(_STOP)
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        if self._writer is not None:
+            self._writer.stop(timeout)
+            self._writer = None
+
+    def _run(self) -> None:
+        while True:
+            # Idle workers wake up to pick up registry changes (submit is gated on them).
+            self.challengers.refresh()
+            try:
+                item = self._q.get(timeout=self.challengers.reload_interval_s)
+            except queue.Empty:
+                continue
+            if item is _STOP:
+                return
+            batch = [item]
+            n = len(item[1])
+            while n < self.batch_size:
+                try:
+                    nxt = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    self._q.put(_STOP)  # leave it for this worker's next loop
+                    break
+                batch.append(nxt)
+                n += len(nxt[1])
+            self._score(batch)
+
+    def _score(self, batch: List[Tuple[float, List[ShadowItem]]]) -> None:
+        import numpy as np
+
+        now = time.monotonic()
+        fresh = [(t, it) for t, items in batch for it in items if now - t <= self.budget_s]
+        late = sum(len(items) for _, items in batch) - len(fresh)
+        if late:
+            self.dropped_budget += late
+            SHADOW_SCORES.inc("*", "dropped_budget", amount=late)
+        if not fresh:
+            return
+
+        features = [it[1] for _, it in fresh]
+        rows: List[Tuple[Any, ...]] = []
+        for version, model in self.challengers.models:
+            if time.monotonic() - fresh[0][0] > self.budget_s:
+                self.dropped_budget += len(fresh)
+                SHADOW_SCORES.inc(version, "dropped_budget", amount=len(fresh))
+                continue
+            t0 = time.perf_counter()
+            try:
+                if model is None:
+                    cols = {k: [f.get(k, 0) or 0 for f in features] for k in HEURISTIC_INPUTS}
+                    scores = heuristic_columnar(cols)[0]
+                else:
+                    X = np.array([_model_inputs(f) for f in features], dtype=float)
+                    scores = np.clip(model.predict_proba(X)[:, 1], 0.0, 1.0)
+            except Exception:
+                self.errors += len(fresh)
+                SHADOW_SCORES.inc(version, "error", amount=len(fresh))
+                continue
+            dt = time.perf_counter() - t0
+            SHADOW_SECONDS.observe(dt, version)
+            done = time.monotonic()
+            for (t, (event_id, f, champ_version, champ_score)), sc in zip(fresh, scores.tolist()):
+                rows.append(
+                    (event_id, version, f.get("trans_id"), float(sc), champ_version, float(champ_score),
+                     (done - t) * 1000.0)
+                )
+            self.scored += len(fresh)
+            SHADOW_SCORES.inc(version, "scored", amount=len(fresh))
+
+        writer = self._writer
+        pending = [r for r in rows if writer is None or not writer.submit(r)]
+        if pending:
+            _insert_shadow_rows(pending)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "sample_rate": self.sample_rate,
+            "budget_ms": self.budget_s * 1000.0,
+            "challengers": [v for v, _ in self.challengers.models],
+            "queue_depth": self._q.qsize(),
+            "submitted": self.submitted,
+            "scored": self.scored,
+            "dropped_overload": self.dropped_overload,
+            "dropped_budget": self.dropped_budget,
+            "errors": self.errors,
+            "load_errors": self.challengers.load_errors,
+            "last_error": self.challengers.last_error,
+        }
+
+
+_scorer: Optional[ShadowScorer] = None
+_scorer_lock = threading.Lock()
+
+
+def get_shadow_scorer() -> Optional[ShadowScorer]:
+    return _scorer
+
+
+def submit_shadow(features_list: Sequence[Dict[str, Any]], scores: Sequence[Any], event_ids: Sequence[str]) -> int:
+    """Hand decided transactions (+ champion ScoreResults) to the shadow scorer, if running."""
+    scorer = _scorer
+    if scorer is None:
+        return 0
+    return scorer.submit(
+        [(eid, f, sc.model_version, sc.risk_score) for f, sc, eid in zip(features_list, scores, event_ids)]
+    )
+
+
+def start_shadow() -> Optional[ShadowScorer]:
+    """API startup; disabled when SHADOW_SAMPLE_RATE is 0."""
+    global _scorer
+    s = settings()
+    if s.shadow_sample_rate <= 0:
+        return None
+    with _scorer_lock:
+        if _scorer is None or not _scorer.running:
+            _scorer = ShadowScorer(
+                sample_rate=s.shadow_sample_rate,
+                workers=s.shadow_workers,
+                queue_max=s.shadow_queue_max,
+                budget_ms=s.shadow_budget_ms,
+                reload_interval_s=s.model_reload_interval_s,
+            ).start()
+        return _scorer
+
+
+def stop_shadow(timeout: Optional[float] = 10.0) -> None:
+    global _scorer
+    with _scorer_lock:
+        scorer, _scorer = _scorer, None
+    if scorer is not None:
+        scorer.stop(timeout)
+
+
+def shadow_stats() -> Dict[str, Any]:
+    scorer = _scorer
+    return scorer.stats() if scorer is not None else {"running": False}
+
+
+def compare_shadow(window_hours: int = 24) -> Dict[str, Any]:
+    """Challenger vs champion over the shadowed decisions of the last `window_hours`."""
+    from ..decisioning.engine import DecisionEngine
+
+    engine = DecisionEngine()
+    deny, chal = engine.deny_threshold, engine.challenge_threshold
+    with connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT
+                model_version,
+                champion_version,
+                COUNT(*),
+                AVG(risk_score),
+                AVG(champion_score),
+                AVG(ABS(risk_score - champion_score)),
+                AVG(latency_ms),
+                SUM(risk_score >= ?1),
+                SUM(champion_score >= ?1),
+                SUM((risk_score >= ?1) = (champion_score >= ?1) AND (risk_score >= ?2) = (champion_score >= ?2)),
+                SUM(cb),
+                SUM(cb AND risk_score >= ?1),
+                SUM(cb AND champion_score >= ?1)
+            FROM (
+                SELECT s.*, EXISTS (SELECT 1 FROM chargebacks c WHERE c.trans_id = s.trans_id) AS cb
+                FROM shadow_scores s
+                WHERE s.created_at >= datetime('now', ?3)
+            )
+            GROUP BY model_version, champion_version
+            """,
+            (deny, chal, f"-{int(window_hours)} hour"),
+        ).fetchall()
+
+    out: List[Dict[str, Any]] = []
+    for mv, champ, n, avg_s, avg_c, mad, lat, deny_s, deny_c, agree, cbs, cb_s, cb_c in rows:
+        out.append({
+            "model_version": mv,
+            "champion_version": champ,
+            "shadowed": n,
+            "avg_score": avg_s,
+            "champion_avg_score": avg_c,
+            "mean_abs_delta": mad,
+            "avg_latency_ms": lat,
+            "deny_rate": deny_s / n,
+            "champion_deny_rate": deny_c / n,
+            "band_agreement": agree / n,  # same ALLOW / CHALLENGE / DENY score band
+            "chargebacks": cbs,
+            "chargebacks_denied": cb_s,
+            "champion_chargebacks_denied": cb_c,
+        })
+    return {"window_hours": int(window_hours), "thresholds": {"deny": deny, "challenge": chal}, "challengers": out}
@@ -3,7 +3,9 @@
 """
 Minimal credible ML lifecycle demo (requires `fraudshield[ml]`).
 
-Trains a LogisticRegression on a tiny synthetic dataset and registers it via joblib.
+Trains a LogisticRegression on a tiny synthetic dataset, saves it via joblib and
+exports it as a compact `*.linear.json` artifact (modeling/linear.py). The linear
+artifact is what gets registered, so serving never imports sklearn.
 
 In a real system:
 - Offline dataset creation via feature store
@@ -17,6 +19,7 @@ import os
 from datetime import datetime, timezone
 
 from ..core.settings import settings
+from .linear import export_linear, linear_path_for
 from .registry import set_latest
 
 
@@ -25,7 +28,8 @@ def train_and_register() -> str:
     Train a minimal sklearn LogisticRegression model and register it as the latest model.
 
     Returns:
-        model_path: Path to the saved joblib artifact.
+        model_path: Path to the registered `*.linear.json` artifact (the joblib file
+        is kept next to it for offline use).
     """
     # Imports only available when installing `fraudshield[ml]`
     import joblib  # type: ignore
@@ -60,10 +64,12 @@ def train_and_register() -> str:
     model_path = os.path.join(s.model_registry_path, f"{version}.joblib")
 
     joblib.dump(model, model_path)
-    set_latest(model_path=model_path, model_version=version)
+    linear_path = linear_path_for(model_path)
+    export_linear(model, linear_path)
+    set_latest(model_path=linear_path, model_version=version)
 
-    print(f"✅ Registered sklearn model: {model_path} (version={version})")
-    return model_path
+    print(f"✅ Registered sklearn model: {linear_path} (version={version}, joblib={model_path})")
+    return linear_path
 
 
 if __name__ == "__main__":
@@ -1,14 +1,382 @@
-"""Drift monitoring stub (enterprise hook).
+"""Input / score drift monitoring (PSI and KS per feature).
 
-Production implementations typically compute PSI/KS (and/or embedding drift),
-compare against thresholds, and emit alerts + dashboards.
+Every decision increments fixed-bin histograms of the model inputs and of
+`risk_score` (`DRIFT_BINS`); raw values are never kept. The current window is a ring of
+DRIFT_SLICES time slices covering DRIFT_WINDOW_S, so memory is
+O(slices x features x bins) regardless of traffic, and expired slices simply drop off.
+
+The reference is a frozen histogram set (`reference.json` under DRIFT_PATH), either
+frozen from a current window (`freeze`) or built once from stored transactions
+(`baseline`). PSI and KS are then computed from bin counts in O(bins); KS is evaluated
+at bin edges, i.e. a lower bound of the exact two-sample statistic.
+
+Lifecycle mirrors tools/velocity.py: state is loaded at API startup, snapshotted
+periodically and at shutdown (`state.json`), which is what the CLI reads:
+
+    python -m fraudshield.monitoring.drift report     # exit 1 when drift is detected
+    python -m fraudshield.monitoring.drift freeze     # current window -> reference
+    python -m fraudshield.monitoring.drift baseline   # reference from the transactions table
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from ..core.settings import settings
+
+# Upper bin edges per monitored value (a value v falls in bin bisect_right(edges, v)).
+DRIFT_BINS: Dict[str, Tuple[float, ...]] = {
+    "amount": (10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0, 10000.0),
+    "account_age_days": (7.0, 30.0, 90.0, 180.0, 365.0, 730.0, 1825.0),
+    "txn_count_1h": (1.0, 2.0, 3.0, 5.0, 10.0),
+    "ip_reputation_score": (10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0, 80.0, 90.0),
+    "ip_is_proxy": (0.5,),
+    "device_ip_mismatch": (0.5,),
+    "shipping_is_freight_forwarder": (0.5,),
+    "ship_bill_mismatch": (0.5,),
+    "risk_score": tuple(i / 20.0 for i in range(1, 20)),
+}
+DRIFT_SLICES = 24
+_STATE_FORMAT = 1
+_PSI_WARN = 0.1
+_PSI_EPS = 1e-4  # smoothing for empty bins
+
+Histograms = Dict[str, List[int]]
+_BINS_AS_STORED = {k: list(v) for k, v in DRIFT_BINS.items()}  # JSON round trip of DRIFT_BINS
+
+
+def _empty() -> Histograms:
+    return {name: [0] * (len(edges) + 1) for name, edges in DRIFT_BINS.items()}
+
+
+def _value(features: Mapping[str, Any], name: str) -> float:
+    v = features.get(name)
+    if isinstance(v, bool):
+        return 1.0 if v else 0.0
+    return float(v or 0.0)
+
+
+def psi(reference: Sequence[int], current: Sequence[int]) -> float:
+    """Population stability index between two binned distributions."""
+    nr, nc = float(sum(reference)), float(sum(current))
+    if nr == 0 or nc == 0:
+        return 0.0
+    out = 0.0
+    for r, c in zip(reference, current):
+        pr = max(r / nr, _PSI_EPS)
+        pc = max(c / nc, _PSI_EPS)
+        out += (pc - pr) * math.log(pc / pr)
+    return out
+
+
+def ks(reference: Sequence[int], current: Sequence[int]) -> float:
+    """Max CDF difference at bin edges (Kolmogorov-Smirnov on binned data)."""
+    nr, nc = float(sum(reference)), float(sum(current))
+    if nr == 0 or nc == 0:
+        return 0.0
+    cr = cc = 0.0
+    out = 0.0
+    for r, c in zip(reference, current):
+        cr += r / nr
+        cc += c / nc
+        out = max(out, abs(cc - cr))
+    return out
+
+
+def check_drift(reference: Mapping[str, Sequence[int]], current: Mapping[str, Sequence[int]]) -> Dict[str, Any]:
+    """Per-feature PSI / KS between two histogram sets ({name: bin counts})."""
+    s = settings()
+    features: Dict[str, Any] = {}
+    for name in DRIFT_BINS:
+        ref, cur = reference.get(name), current.get(name)
+        n_ref, n_cur = (sum(ref) if ref else 0), (sum(cur) if cur else 0)
+        row: Dict[str, Any] = {"n_reference": n_ref, "n_current": n_cur}
+        if ref is None or len(ref) != len(DRIFT_BINS[name]) + 1:
+            row["status"] = "no_reference"
+        elif min(n_ref, n_cur) < s.drift_min_samples:
+            row["status"] = "insufficient_data"
+        else:
+            p, k = psi(ref, cur), ks(ref, cur)
+            row.update(psi=round(p, 4), ks=round(k, 4))
+            if p >= s.drift_psi_threshold or k >= s.drift_ks_threshold:
+                row["status"] = "drift"
+            elif p >= _PSI_WARN:
+                row["status"] = "warn"
+            else:
+                row["status"] = "ok"
+        features[name] = row
+    drifted = sorted(n for n, r in features.items() if r["status"] == "drift")
+    return {
+        "drift_detected": bool(drifted),
+        "drifted_features": drifted,
+        "thresholds": {"psi": s.drift_psi_threshold, "ks": s.drift_ks_threshold, "min_samples": s.drift_min_samples},
+        "features": features,
+    }
+
+
+class DriftMonitor:
+    def __init__(self, window_s: Optional[float] = None) -> None:
+        self.window_s = float(window_s or settings().drift_window_s)
+        self._slice_s = self.window_s / DRIFT_SLICES
+        self._slices: Dict[int, Histograms] = {}
+        self._head = -1
+        self._lock = threading.Lock()
+        self.reference: Optional[Dict[str, Any]] = None  # {"histograms", "frozen_at", "source"}
+        self.observed = 0
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_snapshot_at: Optional[float] = None
+        self._reference_mtime: Optional[float] = None
+
+    # ---------------------------------------------------------------- recording
+    def _slice(self, now: float) -> Histograms:
+        idx = int(now // self._slice_s)
+        if idx > self._head:
+            self._head = idx
+            for old in [k for k in self._slices if k <= idx - DRIFT_SLICES]:
+                del self._slices[old]
+        hist = self._slices.get(idx)
+        if hist is None:
+            hist = self._slices[idx] = _empty()
+        return hist
+
+    def observe(self, features: Mapping[str, Any], risk_score: float, now: Optional[float] = None) -> None:
+        self.observe_many([features], [risk_score], now)
+
+    def observe_many(
+        self, features_list: Sequence[Mapping[str, Any]], risk_scores: Sequence[float], now: Optional[float] = None
+    ) -> None:
+        bins = [(name, edges) for name, edges in DRIFT_BINS.items() if name != "risk_score"]
+        score_edges = DRIFT_BINS["risk_score"]
+        rows = [
+            [bisect_right(edges, _value(f, name)) for name, edges in bins] + [bisect_right(score_edges, float(r))]
+            for f, r in zip(features_list, risk_scores)
+        ]
+        names = [name for name, _ in bins] + ["risk_score"]
+        with self._lock:
+            hist = self._slice(time.time() if now is None else now)
+            for row in rows:
+                for name, b in zip(names, row):
+                    hist[name][b] += 1
+            self.observed += len(rows)
+
+    # ---------------------------------------------------------------- reading
+    def current(self, now: Optional[float] = None) -> Histograms:
+        """Histograms summed over the live slices of the window."""
+        now = time.time() if now is None else now
+        oldest = int(now // self._slice_s) - DRIFT_SLICES + 1
+        out = _empty()
+        with self._lock:
+            for idx, hist in self._slices.items():
+                if idx < oldest:
+                    continue
+                for name, counts in hist.items():
+                    acc = out[name]
+                    for i, c in enumerate(counts):
+                        acc[i] += c
+        return out
+
+    def report(self, now: Optional[float] = None) -> Dict[str, Any]:
+        out = check_drift(self.reference["histograms"] if self.reference else {}, self.current(now))
+        out["window_s"] = self.window_s
+        out["reference"] = (
+            {k: v for k, v in self.reference.items() if k != "histograms"} if self.reference else None
+        )
+        return out
+
+    def set_reference(self, histograms: Histograms, source: str) -> Dict[str, Any]:
+        self.reference = {"histograms": histograms, "frozen_at": time.time(), "source": source}
+        return self.reference
+
+    def freeze(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Use the current window as the reference from now on."""
+        return self.set_reference(self.current(now), "window")
+
+    # ---------------------------------------------------------------- persistence
+    def snapshot(self, directory: str) -> None:
+        """Write the window state (the reference is saved separately, when it changes)."""
+        with self._lock:
+            state = {
+                "format": _STATE_FORMAT,
+                "saved_at": time.time(),
+                "window_s": self.window_s,
+                "bins": DRIFT_BINS,
+                "slices": {str(k): v for k, v in self._slices.items()},
+            }
+        _write_json(os.path.join(directory, "state.json"), state)
+        self.last_snapshot_at = state["saved_at"]
+
+    def save_reference(self, directory: str) -> None:
+        if self.reference is not None:
+            path = os.path.join(directory, "reference.json")
+            _write_json(path, {"bins": DRIFT_BINS, **self.reference})
+            self._reference_mtime = os.path.getmtime(path)
+
+    def load_reference(self, directory: str) -> bool:
+        """(Re)load reference.json if it changed on disk (e.g. rebuilt by the CLI)."""
+        path = os.path.join(directory, "reference.json")
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return False
+        if mtime == self._reference_mtime:
+            return False
+        ref = _read_json(path)
+        self._reference_mtime = mtime
+        if ref is None or ref.pop("bins", None) != _BINS_AS_STORED:
+            return False
+        self.reference = ref
+        return True
+
+    def load(self, directory: str) -> bool:
+        """Load reference and window state; files written with other bins are ignored."""
+        self.load_reference(directory)
+        state = _read_json(os.path.join(directory, "state.json"))
+        if state is None or state.get("format") != _STATE_FORMAT or state.get("bins") != _BINS_AS_STORED:
+            return False
+        if float(state["window_s"]) != self.window_s:
+            return False
+        with self._lock:
+            self._slices = {int(k): v for k, v in state["slices"].items()}
+            self._head = max(self._slices, default=-1)
+        return True
+
+    def start_snapshots(self, directory: str, interval_s: float) -> None:
+        if self._snapshot_thread is not None:
+            return
+        self._stop.clear()
+
+        def _loop() -> None:
+            while not self._stop.wait(interval_s):
+                self.snapshot(directory)
+
+        self._snapshot_thread = threading.Thread(target=_loop, name="fraudshield-drift-snapshot", daemon=True)
+        self._snapshot_thread.start()
+
+    def stop_snapshots(self, directory: Optional[str] = None) -> None:
+        self._stop.set()
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+        if directory:
+            self.snapshot(directory)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "observed": self.observed,
+            "window_s": self.window_s,
+            "slices": len(self._slices),
+            "reference_frozen_at": self.reference["frozen_at"] if self.reference else None,
+            "last_snapshot_at": self.last_snapshot_at,
+        }
+
+
+def _write_json(path: str, payload: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def reference_from_db(batch_size: int = 10_000, limit: Optional[int] = None) -> Histograms:
+    """Histograms of every stored transaction, scored with the current model.
+
+    Velocity is not reconstructed for historical rows, so `txn_count_1h` is left out
+    (reported as "no_reference") rather than compared against all-zero counts.
+    """
+    from ..core.features import scan_features
+    from ..modeling.scoring import score_batch
+
+    monitor = DriftMonitor()
+    seen = 0
+    for batch in scan_features(batch_size):
+        if limit is not None:
+            batch = batch[: max(0, limit - seen)]
+        if not batch:
+            break
+        monitor.observe_many(batch, [sc.risk_score for sc in score_batch(batch)], now=0.0)
+        seen += len(batch)
+    hist = monitor.current(now=0.0)
+    hist.pop("txn_count_1h")
+    return hist
+
+
+# ---------------------------------------------------------------- process-wide monitor
+_monitor: Optional[DriftMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_drift_monitor() -> DriftMonitor:
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = DriftMonitor()
+    return _monitor
+
+
+def observe_decisions(features_list: Sequence[Mapping[str, Any]], risk_scores: Iterable[float]) -> None:
+    get_drift_monitor().observe_many(features_list, list(risk_scores))
+
+
+def start_drift() -> None:
+    """API startup: restore window + reference and start periodic snapshots."""
+    s = settings()
+    monitor = get_drift_monitor()
+    monitor.load(s.drift_path)
+    monitor.start_snapshots(s.drift_path, s.drift_snapshot_interval_s)
+
+
+def stop_drift() -> None:
+    if _monitor is not None:
+        _monitor.stop_snapshots(settings().drift_path)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="FraudShield drift monitor (reads the API's DRIFT_PATH state)")
+    sub = ap.add_subparsers(dest="command", required=True)
+    sub.add_parser("report", help="PSI / KS per feature; exit code 1 when drift is detected")
+    sub.add_parser("freeze", help="freeze the current window as the reference")
+    bp = sub.add_parser("baseline", help="build the reference from stored transactions")
+    bp.add_argument("--limit", type=int, default=None, help="max transactions to scan")
+    args = ap.parse_args()
+
+    path = settings().drift_path
+    monitor = DriftMonitor()
+    monitor.load(path)
+
+    if args.command == "report":
+        out = monitor.report()
+        print(json.dumps(out, indent=2))
+        sys.exit(1 if out["drift_detected"] else 0)
+
+    if args.command == "freeze":
+        ref = monitor.freeze()
+    else:
+        from ..data.db import init_db
 
+        init_db()
+        ref = monitor.set_reference(reference_from_db(limit=args.limit), "transactions")
+    monitor.save_reference(path)
+    n = sum(ref["histograms"]["risk_score"])
+    print(f"✅ Reference frozen from {ref['source']} ({n} decisions) -> {path}")
 
-def check_drift(reference_df: Any, current_df: Any) -> Dict[str, Any]:
-    # Placeholder: wire in Evidently or custom PSI/KS.
-    return {"drift_detected": False, "psi": 0.02, "note": "stub"}
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Cached, coalesced KPI reads for polling consoles (GET /kpis).
+
+Keyed by `window_days`; entries live KPI_CACHE_TTL_S seconds and are treated as stale
+once new decision events are committed and the entry is at least KPI_CACHE_MIN_FRESH_S
+old (under traffic the event sink commits every few milliseconds). Stale values are
+served for up to KPI_CACHE_STALE_S more seconds while a single background refresh
+recomputes them.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Optional
+
+from ..core.settings import settings
+from ..governance.events import events_generation
+from ..util.cache import SingleFlightCache
+from .kpis import compute_kpis
+
+_cache: Optional[SingleFlightCache[int, dict]] = None
+_cache_lock = threading.Lock()
+
+
+def get_kpi_cache() -> SingleFlightCache[int, dict]:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                s = settings()
+                _cache = SingleFlightCache(
+                    lambda window_days: compute_kpis(window_days=window_days),
+                    ttl_s=s.kpi_cache_ttl_s,
+                    stale_s=s.kpi_cache_stale_s,
+                    generation=events_generation,
+                    name="fraudshield-kpi-cache",
+                    min_fresh_s=s.kpi_cache_min_fresh_s,
+                )
+    return _cache
+
+
+def cached_kpis(window_days: int = 30) -> dict:
+    return get_kpi_cache().get(int(window_days))
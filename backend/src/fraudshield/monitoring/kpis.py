@@ -1,81 +1,116 @@
 from __future__ import annotations
 
-import sqlite3
+import argparse
+import json
 
-import pandas as pd
-
-from ..core.settings import settings
 from ..data.db import init_db
+from ..data.pool import connection
 
 
 def compute_kpis(window_days: int = 30) -> dict:
     """Compute high-level portfolio KPIs from recent decision events.
 
-    Note: `loss_rate_proxy` uses chargeback_amount/total_volume and is only as good as labels.
+    Answered from the hourly rollups (monitoring/rollups.py), so the cost depends on the
+    window length in hours, not on the number of events. The window starts at the top of
+    the hour `window_days` ago.
+
+    Notes:
+    - `total_volume` is the amount of the transactions in the window (by transaction
+      time, each counted once however often it was decided).
+    - `loss_rate_proxy` uses chargeback_amount/total_volume and is only as good as labels;
+      chargebacks are counted by `chargeback_date` inside the same window.
     """
 
-    # Ensure schema exists (demo-friendly; production would use migrations).
+    # Ensure schema is migrated (memoised per process, so this is cheap after the first call).
     init_db()
 
-    s = settings()
-    conn = sqlite3.connect(s.db_path)
-
-    ev = pd.read_sql(
-        f"""
-        SELECT decision, risk_score, model_version, timestamp
-        FROM decision_events
-        WHERE timestamp >= datetime('now', '-{int(window_days)} day')
-        """,
-        conn,
-    )
-
-    vol = pd.read_sql(
-        f"""
-        SELECT SUM(amount) AS total_volume
-        FROM transactions
-        WHERE timestamp >= datetime('now', '-{int(window_days)} day')
-        """,
-        conn,
-    )
-    total_volume = float(vol.iloc[0]["total_volume"] or 0.0) if not vol.empty else 0.0
-
-    cb = pd.read_sql(
-        """
-        SELECT SUM(chargeback_amount) AS cb_amount
-        FROM chargebacks
-        WHERE chargeback_date IS NOT NULL
-        """,
-        conn,
-    )
-    cb_amount = float(cb.iloc[0]["cb_amount"] or 0.0) if not cb.empty else 0.0
-
-    conn.close()
-
-    total = int(len(ev))
+    days = int(window_days)
+    with connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT decision, model_version, SUM(event_count), SUM(score_sum)
+            FROM kpi_rollup_hourly
+            WHERE bucket_hour >= strftime('%Y-%m-%d %H:00:00', 'now', ?)
+            GROUP BY decision, model_version
+            """,
+            (f"-{days} day",),
+        ).fetchall()
+
+        vol = conn.execute(
+            """
+            SELECT SUM(volume) FROM txn_volume_hourly
+            WHERE bucket_hour >= strftime('%Y-%m-%d %H:00:00', 'now', ?)
+            """,
+            (f"-{days} day",),
+        ).fetchone()
+
+        cb = conn.execute(
+            """
+            SELECT SUM(chargeback_amount)
+            FROM chargebacks
+            WHERE chargeback_date IS NOT NULL AND chargeback_date >= date('now', ?)
+            """,
+            (f"-{days} day",),
+        ).fetchone()
+    cb_amount = float(cb[0] or 0.0) if cb else 0.0
+    total_volume = float(vol[0] or 0.0) if vol else 0.0
+
+    counts: dict = {}
+    by_model: dict = {}
+    score_sum = 0.0
+    for decision, model_version, n, ssum in rows:
+        counts[decision] = counts.get(decision, 0) + int(n)
+        by_model[model_version] = by_model.get(model_version, 0) + int(n)
+        score_sum += float(ssum or 0.0)
+
+    total = sum(counts.values())
     if total == 0:
         return {
-            "window_days": int(window_days),
+            "window_days": days,
             "total_events": 0,
             "decline_rate": 0.0,
             "challenge_rate": 0.0,
             "allow_rate": 0.0,
+            "avg_risk_score": 0.0,
+            "events_by_model_version": {},
             "total_volume": total_volume,
             "chargeback_amount": cb_amount,
             "loss_rate_proxy": (cb_amount / total_volume) if total_volume else 0.0,
         }
 
-    counts = ev["decision"].value_counts().to_dict()
     deny = float(counts.get("DENY", 0))
     chal = float(counts.get("CHALLENGE", 0))
     allow = float(counts.get("ALLOW", 0))
 
     return {
-        "window_days": int(window_days),
+        "window_days": days,
         "total_events": total,
         "decline_rate": deny / total,
         "challenge_rate": chal / total,
         "allow_rate": allow / total,
+        "avg_risk_score": score_sum / total,
+        "events_by_model_version": by_model,
         "total_volume": total_volume,
         "chargeback_amount": cb_amount,
         "loss_rate_proxy": (cb_amount / total_volume) if total_volume else 0.0,
     }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="FraudShield KPIs")
+    sub = ap.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="Print KPIs for a window")
+    show.add_argument("--window-days", type=int, default=30)
+    sub.add_parser("rebuild-rollups", help="Recompute the KPI rollups from decision_events / transactions")
+    args = ap.parse_args()
+
+    if args.command == "rebuild-rollups":
+        from .rollups import rebuild_rollups
+
+        print(json.dumps(rebuild_rollups(), indent=2))
+    else:
+        print(json.dumps(compute_kpis(window_days=args.window_days), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""In-process metrics with Prometheus text exposition (served at GET /metrics).
+
+Deliberately tiny instead of a client library dependency: fixed-bucket histograms,
+counters and callback gauges, keyed by label-value tuples. Recording is a thread-local
+dict lookup, a bisect and two list updates, with no lock (per-thread shards are merged
+at scrape time), so the decision path can be instrumented stage by stage; `tests/unit/test_metrics.py`
+keeps the per-request overhead within budget.
+
+Callers time stages with `time.perf_counter()` pairs and `observe(seconds, *labels)`
+rather than context managers, which cost more than the recording itself.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Seconds; spans sub-100µs SQLite point reads up to multi-second model loads.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+def _escape(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    def _samples(self) -> List[str]:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+
+class _Sharded(_Metric):
+    """Per-thread shards: the recording path takes no lock (each thread only writes its
+    own dict); scrapes merge all shards. Reads during a scrape may be a few updates stale.
+
+    Shards of threads that have exited (short-lived refresh / reload threads) are folded
+    into one `_retired` total whenever a shard is added or the metric is read, so the
+    shard list stays bounded by the number of live threads."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._local = threading.local()
+        self._shards: List[Tuple[weakref.ref[threading.Thread], Dict[Tuple[Any, ...], list]]] = []
+        self._retired: Dict[Tuple[Any, ...], list] = {}
+
+    def _shard(self) -> Dict[Tuple[Any, ...], list]:
+        try:
+            return self._local.series
+        except AttributeError:
+            series: Dict[Tuple[Any, ...], list] = {}
+            with self._lock:
+                self._reap()
+                self._shards.append((weakref.ref(threading.current_thread()), series))
+            self._local.series = series
+            return series
+
+    def _reap(self) -> None:
+        # Caller holds self._lock. A dead thread can no longer write its shard.
+        live = []
+        for ref, series in self._shards:
+            t = ref()
+            if t is not None and t.is_alive():
+                live.append((ref, series))
+                continue
+            for key, vals in series.items():
+                acc = self._retired.get(key)
+                if acc is None:
+                    self._retired[key] = list(vals)
+                else:
+                    for j in range(len(vals)):
+                        acc[j] += vals[j]
+        self._shards = live
+
+    def _merged(self, width: int) -> List[Tuple[Tuple[Any, ...], list]]:
+        with self._lock:
+            self._reap()
+            shards = [series for _, series in self._shards]
+            merged: Dict[Tuple[Any, ...], list] = {k: list(v) for k, v in self._retired.items()}
+        for shard in shards:
+            for key, vals in list(shard.items()):
+                acc = merged.setdefault(key, [0] * width)
+                for j in range(width):
+                    acc[j] += vals[j]
+        return sorted(merged.items(), key=lambda kv: tuple(map(str, kv[0])))
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, *labels: Any, amount: float = 1.0) -> None:
+        try:
+            s = self._local.series[labels]
+        except (AttributeError, KeyError):
+            s = self._shard().setdefault(labels, [0.0])
+        s[0] += amount
+
+    def value(self, *labels: Any) -> float:
+        return dict(self._merged(1)).get(labels, [0.0])[0]
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v[0])}" for k, v in self._merged(1)]
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per series: [count per bucket..., count for +Inf, sum]
+        self._width = len(self.buckets) + 2
+
+    def observe(self, value: float, *labels: Any) -> None:
+        try:
+            s = self._local.series[labels]
+        except (AttributeError, KeyError):
+            s = self._shard().setdefault(labels, [0] * (self._width - 1) + [0.0])
+        s[bisect_left(self.buckets, value)] += 1
+        s[-1] += value
+
+    def count(self, *labels: Any) -> int:
+        vals = dict(self._merged(self._width)).get(labels)
+        return int(sum(vals[:-1])) if vals is not None else 0
+
+    def time(self, *labels: Any) -> Callable[[F], F]:
+        """Decorator: observe the wrapped call's duration."""
+
+        def deco(fn: F) -> F:
+            @wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - t0, *labels)
+
+            return wrapper  # type: ignore[return-value]
+
+        return deco
+
+    def _samples(self) -> List[str]:
+        out: List[str] = []
+        for key, vals in self._merged(self._width):
+            acc = 0
+            for bound, c in zip(self.buckets, vals):
+                acc += c
+                le = _labels(self.labelnames, key, 'le="%s"' % _num(bound))
+                out.append(f"{self.name}_bucket{le} {acc}")
+            n = acc + vals[-2]
+            le = _labels(self.labelnames, key, 'le="+Inf"')
+            out.append(f"{self.name}_bucket{le} {n}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(vals[-1])}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, key)} {n}")
+        return out
+
+
+class GaugeFunc(_Metric):
+    """Gauge read at scrape time: `fn()` returns {label-values tuple: value}."""
+
+    kind = "gauge"
+
+    def __init__(
+        self, name: str, help: str, fn: Callable[[], Dict[Tuple[Any, ...], float]], labelnames: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self._fn = fn
+
+    def _samples(self) -> List[str]:
+        try:
+            values = self._fn()
+        except Exception:
+            return []
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in sorted(values.items())]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            # Re-registering a name (module reload, app factory called twice) keeps one series.
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for m in metrics for line in m.render()) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+
+def histogram(
+    name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+
+def gauge_func(
+    name: str, help: str, fn: Callable[[], Dict[Tuple[Any, ...], float]], labelnames: Sequence[str] = ()
+) -> GaugeFunc:
+    return REGISTRY.register(GaugeFunc(name, help, fn, labelnames))  # type: ignore[return-value]
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render()
+
+
+# ---------------------------------------------------------------- decision path
+STAGE_SECONDS = histogram(
+    "fraudshield_stage_seconds",
+    "Time spent per decision pipeline stage.",
+    ("path", "stage"),
+)
+ENRICHMENT_SECONDS = histogram(
+    "fraudshield_enrichment_seconds",
+    "Latency of case enrichment lookups.",
+    ("lookup",),
+)
+MODEL_LOAD_SECONDS = histogram(
+    "fraudshield_model_load_seconds",
+    "Time to load a model artifact into the ModelHolder.",
+)
+WRITER_FLUSH_SECONDS = histogram(
+    "fraudshield_writer_flush_seconds",
+    "Background writer batch flush time (SQLite commit / audit append).",
+    ("writer",),
+)
+DECISIONS = counter(
+    "fraudshield_decisions_total",
+    "Decisions made, by outcome and model version.",
+    ("api", "decision", "model_version"),
+)
+SCORING_FALLBACKS = counter(
+    "fraudshield_scoring_fallback_total",
+    "Scores that fell back to the heuristic (no registered model, or model error).",
+    ("reason",),
+)
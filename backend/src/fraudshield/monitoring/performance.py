@@ -1,13 +1,247 @@
-"""Performance monitoring stub (enterprise hook).
+"""Model performance against delayed labels (chargebacks), per model_version.
 
-Production implementations join decisions with *delayed labels* (chargebacks, disputes, confirmed fraud)
-and compute precision/recall, capture rate, false positive rate, threshold tuning, etc.
+Each decision event is one prediction; it is labelled fraudulent when its transaction
+has a chargeback (indexed lookups on `idx_chargebacks_trans`, no full join). Events are
+read in rowid chunks, so tens of millions of rows are processed with bounded memory:
+every chunk is reduced to per-score aggregates (count, positives, charged-back amount)
+and merged into a running table keyed by score. With the default `decimals` (4) that
+table has at most 10,001 rows per model; `decimals=None` keeps exact scores.
+
+Curves come from one sort of the distinct scores plus cumulative sums, i.e. precision,
+recall / capture rate, FPR and dollar-weighted loss capture for *every* threshold
+(`score >= threshold` counts as flagged) in O(n log n).
+
+    python -m fraudshield.monitoring.performance --window-days 90 --label-lag-days 60
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from ..core.settings import settings
+from ..data.db import init_db
+from ..data.pool import connection
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
+
+_SQL_ROWID_RANGE = """
+    SELECT MIN(rowid), MAX(rowid) FROM decision_events
+    WHERE timestamp >= ? AND timestamp < ?
+"""
+
+# One chunk of events reduced in SQLite to (model, decision, score) aggregates; the
+# label lookups are index probes on idx_chargebacks_trans.
+_SQL_CHUNK = """
+    SELECT model_version, decision, score, COUNT(*), SUM(label), TOTAL(loss)
+    FROM (
+        SELECT
+            COALESCE(e.model_version, 'unknown') AS model_version,
+            COALESCE(e.decision, 'UNKNOWN') AS decision,
+            CASE WHEN ?1 IS NULL THEN e.risk_score ELSE ROUND(e.risk_score, ?1) END AS score,
+            EXISTS (SELECT 1 FROM chargebacks c WHERE c.trans_id = e.trans_id) AS label,
+            (SELECT TOTAL(c.chargeback_amount) FROM chargebacks c WHERE c.trans_id = e.trans_id) AS loss
+        FROM decision_events e
+        WHERE e.rowid > ?2 AND e.rowid <= ?3
+          AND e.timestamp >= ?4 AND e.timestamp < ?5
+          AND e.risk_score IS NOT NULL
+    )
+    GROUP BY 1, 2, 3
+"""
+
+# Operating points reported from the recorded decisions (not from score thresholds).
+OPERATING_POINTS: Dict[str, Tuple[str, ...]] = {
+    "deny": ("DENY",),
+    "deny_or_challenge": ("DENY", "CHALLENGE"),
+}
+
+
+class _ScoreTable:
+    """Per-score aggregates: sorted distinct scores with count / positives / loss."""
+
+    def __init__(self) -> None:
+        import numpy as np
+
+        self.scores = np.empty(0, dtype=np.float64)
+        self.n = np.empty(0, dtype=np.int64)
+        self.pos = np.empty(0, dtype=np.int64)
+        self.loss = np.empty(0, dtype=np.float64)
+        self.by_decision: Dict[str, List[float]] = {}  # decision -> [n, positives, loss]
+
+    def add(self, decision: str, scores: "np.ndarray", n: "np.ndarray", pos: "np.ndarray", loss: "np.ndarray") -> None:
+        import numpy as np
+
+        uniq, inv = np.unique(np.concatenate([self.scores, scores]), return_inverse=True)
+        self.n = np.bincount(inv, np.concatenate([self.n, n]), minlength=uniq.size).astype(np.int64)
+        self.pos = np.bincount(inv, np.concatenate([self.pos, pos]), minlength=uniq.size).astype(np.int64)
+        self.loss = np.bincount(inv, np.concatenate([self.loss, loss]), minlength=uniq.size)
+        self.scores = uniq
+
+        acc = self.by_decision.setdefault(decision, [0, 0, 0.0])
+        acc[0] += int(n.sum())
+        acc[1] += int(pos.sum())
+        acc[2] += float(loss.sum())
+
+    def summary(self, max_curve_points: Optional[int]) -> Dict[str, Any]:
+        import numpy as np
+
+        total, positives = int(self.n.sum()), int(self.pos.sum())
+        negatives, total_loss = total - positives, float(self.loss.sum())
+
+        # Descending thresholds: flagged = score >= threshold.
+        order = slice(None, None, -1)
+        thr = self.scores[order]
+        tp = np.cumsum(self.pos[order])
+        flagged = np.cumsum(self.n[order])
+        fp = flagged - tp
+        captured = np.cumsum(self.loss[order])
+
+        precision = tp / np.maximum(flagged, 1)
+        recall = tp / positives if positives else np.zeros_like(thr)
+        fpr = fp / negatives if negatives else np.zeros_like(thr)
+        loss_capture = captured / total_loss if total_loss else np.zeros_like(thr)
+
+        auc = ap = None
+        if positives and negatives:
+            x, y = np.concatenate([[0.0], fpr]), np.concatenate([[0.0], recall])
+            auc = float(np.sum(np.diff(x) * (y[1:] + y[:-1]) / 2.0))  # trapezoid ROC AUC
+        if positives:
+            ap = float(np.sum(np.diff(np.concatenate([[0.0], recall])) * precision))
+
+        curves = {
+            "threshold": thr,
+            "precision": precision,
+            "recall": recall,
+            "fpr": fpr,
+            "loss_capture": loss_capture,
+            "flag_rate": flagged / total if total else np.zeros_like(thr),
+        }
+        if max_curve_points and thr.size > max_curve_points:
+            keep = np.unique(np.linspace(0, thr.size - 1, max_curve_points).round().astype(np.int64))
+            curves = {k: v[keep] for k, v in curves.items()}
+
+        return {
+            "events": total,
+            "positives": positives,
+            "base_rate": positives / total if total else 0.0,
+            "chargeback_amount": total_loss,
+            "auc_roc": auc,
+            "average_precision": ap,
+            "operating_points": {
+                name: _operating_point(self.by_decision, decisions, positives, negatives, total_loss)
+                for name, decisions in OPERATING_POINTS.items()
+            },
+            "by_decision": {
+                d: {"events": int(v[0]), "positives": int(v[1]), "chargeback_amount": float(v[2])}
+                for d, v in sorted(self.by_decision.items())
+            },
+            "curves": {k: [round(float(x), 6) for x in v] for k, v in curves.items()},
+        }
+
+
+def _operating_point(
+    by_decision: Dict[str, List[float]], decisions: Tuple[str, ...], positives: int, negatives: int, total_loss: float
+) -> Dict[str, Any]:
+    flagged = sum(by_decision.get(d, [0, 0, 0.0])[0] for d in decisions)
+    tp = sum(by_decision.get(d, [0, 0, 0.0])[1] for d in decisions)
+    loss = sum(by_decision.get(d, [0, 0, 0.0])[2] for d in decisions)
+    return {
+        "flagged": int(flagged),
+        "precision": tp / flagged if flagged else None,
+        "recall": tp / positives if positives else None,  # == capture rate
+        "fpr": (flagged - tp) / negatives if negatives else None,
+        "loss_capture": loss / total_loss if total_loss else None,
+    }
+
+
+def _ts(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def compute_performance(
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    chunk_rows: int = 500_000,
+    decimals: Optional[int] = 4,
+    max_curve_points: Optional[int] = 201,
+) -> Dict[str, Any]:
+    """Label-joined metrics and PR / ROC / loss-capture curves per model_version.
+
+    `since` / `until` bound `decision_events.timestamp` (UTC, "YYYY-MM-DD HH:MM:SS");
+    leave a label lag before `until` so chargebacks have had time to arrive.
+    Curves are decimated to `max_curve_points` (None = every distinct threshold).
+    """
+    import numpy as np
+
+    init_db()
+    t0 = time.perf_counter()
+    since = since or "0000-01-01 00:00:00"
+    until = until or "9999-12-31 23:59:59"
+    tables: Dict[str, _ScoreTable] = {}
+    rows_read = 0
+
+    with connection() as conn:
+        lo, hi = conn.execute(_SQL_ROWID_RANGE, (since, until)).fetchone()
+        start = (lo or 1) - 1
+        while lo is not None and start < hi:
+            end = min(start + chunk_rows, hi)
+            groups: Dict[Tuple[str, str], List[Tuple[float, int, int, float]]] = {}
+            for mv, decision, score, n, pos, loss in conn.execute(
+                _SQL_CHUNK, (decimals, start, end, since, until)
+            ):
+                groups.setdefault((mv, decision), []).append((score, n, pos, loss))
+            start = end
+            for (mv, decision), agg in groups.items():
+                scores, n, pos, loss = (np.asarray(c) for c in zip(*agg))
+                rows_read += int(n.sum())
+                table = tables.get(mv)
+                if table is None:
+                    table = tables[mv] = _ScoreTable()
+                table.add(decision, scores.astype(np.float64), n, pos, loss.astype(np.float64))
+
+    return {
+        "window": {"since": since, "until": until},
+        "events": rows_read,
+        "decimals": decimals,
+        "models": {mv: t.summary(max_curve_points) for mv, t in sorted(tables.items())},
+        "elapsed_s": round(time.perf_counter() - t0, 3),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="FraudShield model performance vs chargeback labels")
+    ap.add_argument("--window-days", type=int, default=90, help="decisions made in the last N days ...")
+    ap.add_argument("--label-lag-days", type=int, default=0, help="... excluding the most recent N days")
+    ap.add_argument("--decimals", type=int, default=4, help="score rounding for curves (-1 = exact)")
+    ap.add_argument("--curve-points", type=int, default=201, help="max points per curve (0 = all)")
+    ap.add_argument("--out", help="write the JSON report here (default: REPORTS_PATH/performance.json)")
+    args = ap.parse_args()
+
+    now = datetime.now(timezone.utc)
+    report = compute_performance(
+        since=_ts(now - timedelta(days=args.window_days)),
+        until=_ts(now - timedelta(days=args.label_lag_days)),
+        decimals=None if args.decimals < 0 else args.decimals,
+        max_curve_points=args.curve_points or None,
+    )
+    out = args.out or os.path.join(settings().reports_path, "performance.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for mv, m in report["models"].items():
+        op = m["operating_points"]["deny_or_challenge"]
+        print(
+            f"{mv}: events={m['events']} positives={m['positives']} auc={m['auc_roc']} ap={m['average_precision']} "
+            f"| flagged precision={op['precision']} recall={op['recall']} loss_capture={op['loss_capture']}"
+        )
+    print(f"✅ {report['events']} events in {report['elapsed_s']}s -> {out}")
 
 
-def compute_performance(decisions_df: Any, labels_df: Any) -> Dict[str, Any]:
-    return {"precision": None, "recall": None, "note": "stub - requires labels"}
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Hourly KPI rollups over decision_events and transactions.
+
+`kpi_rollup_hourly` holds, per (UTC hour, decision, model_version), the event count
+and the sum of risk scores. It is updated in the same transaction as every
+decision_events insert (governance/events.py), so `compute_kpis` reads at most
+24 * window_days * (#decisions x #model_versions) rows instead of the raw events.
+
+`txn_volume_hourly` holds the transaction count and amount per UTC hour of the
+transaction timestamp, kept by triggers on `transactions` (migration 5). Volume is
+per transaction, not per decision: re-deciding a transaction does not add to it.
+
+`rebuild_rollups()` recomputes both tables from the raw rows (reconciliation after bulk
+loads, manual edits or restores).
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Dict, Sequence
+
+from ..data.db import init_db
+from ..data.pool import connection
+
+# One row per decision event; params: (timestamp, decision, model_version, risk_score).
+# `WHERE true` is required by SQLite to disambiguate INSERT ... SELECT ... ON CONFLICT.
+# `volume` is no longer maintained here (see txn_volume_hourly).
+ROLLUP_UPSERT_SQL = """
+    INSERT INTO kpi_rollup_hourly(bucket_hour, decision, model_version, event_count, score_sum, volume)
+    SELECT strftime('%Y-%m-%d %H:00:00', ?), ?, COALESCE(?, 'unknown'), 1, ?, 0
+    WHERE true
+    ON CONFLICT(bucket_hour, decision, model_version) DO UPDATE SET
+        event_count = event_count + excluded.event_count,
+        score_sum = score_sum + excluded.score_sum
+"""
+
+_REBUILD_SQL = """
+    INSERT INTO kpi_rollup_hourly(bucket_hour, decision, model_version, event_count, score_sum, volume)
+    SELECT
+        strftime('%Y-%m-%d %H:00:00', e.timestamp),
+        e.decision,
+        COALESCE(e.model_version, 'unknown'),
+        COUNT(*),
+        COALESCE(SUM(e.risk_score), 0),
+        0
+    FROM decision_events e
+    WHERE e.timestamp IS NOT NULL AND e.decision IS NOT NULL
+    GROUP BY 1, 2, 3
+"""
+
+_REBUILD_VOLUME_SQL = """
+    INSERT INTO txn_volume_hourly(bucket_hour, txn_count, volume)
+    SELECT strftime('%Y-%m-%d %H:00:00', timestamp), COUNT(*), COALESCE(SUM(amount), 0)
+    FROM transactions
+    WHERE strftime('%Y-%m-%d %H:00:00', timestamp) IS NOT NULL
+    GROUP BY 1
+"""
+
+
+def apply_rollups(conn: sqlite3.Connection, events: Sequence[Sequence[Any]]) -> None:
+    """Fold freshly inserted events into the rollups (call inside the insert transaction).
+
+    `events` rows are (event_id, trans_id, decision, risk_score, model_version, timestamp).
+    """
+    conn.executemany(
+        ROLLUP_UPSERT_SQL,
+        [(ts, decision, model_version, float(score))
+         for _eid, _trans_id, decision, score, model_version, ts in events],
+    )
+
+
+def rebuild_volume_rollups(conn: sqlite3.Connection) -> int:
+    """Recompute txn_volume_hourly from transactions (call inside a transaction)."""
+    conn.execute("DELETE FROM txn_volume_hourly")
+    conn.execute(_REBUILD_VOLUME_SQL)
+    return int(conn.execute("SELECT COALESCE(SUM(txn_count), 0) FROM txn_volume_hourly").fetchone()[0])
+
+
+def rebuild_rollups() -> Dict[str, Any]:
+    """Recompute kpi_rollup_hourly and txn_volume_hourly in one transaction."""
+    init_db()
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM kpi_rollup_hourly")
+        conn.execute(_REBUILD_SQL)
+        rows, events = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(event_count), 0) FROM kpi_rollup_hourly"
+        ).fetchone()
+        transactions = rebuild_volume_rollups(conn)
+    return {"rollup_rows": int(rows), "events": int(events), "transactions": transactions}
@@ -73,7 +73,7 @@ def run_investigation(trans_id: str, base_packet: Dict[str, Any]) -> Dict[str, A
     ip_intel = E.lookup_ip_intel(t.get("device_ip", ""))
     kyc = E.lookup_kyc(user_id)
     disputes = E.lookup_disputes(user_id)
-    similar = E.find_similar_cases_stub(trans_id)
+    similar = E.find_similar_cases(trans_id)
 
     evidence_blob = json.dumps({"transaction": txn, "user_history": user_hist, "similar_cases": similar}, indent=2, default=str)
     intel_blob = json.dumps({"ip_intel": ip_intel}, indent=2, default=str)
@@ -0,0 +1,142 @@
+"""Lazy record sources for the streaming CLI (JSONL / CSV files or stdin).
+
+Everything here is a generator: one line is parsed at a time and nothing is
+materialised beyond the current micro-batch, so memory stays flat regardless of
+input size.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import sys
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# Columns of the `transactions` table, in insert order.
+TRANSACTION_COLUMNS: Tuple[str, ...] = (
+    "trans_id",
+    "user_id",
+    "amount",
+    "merchant",
+    "device_ip",
+    "shipping_addr",
+    "billing_addr",
+    "timestamp",
+)
+
+Record = Tuple[int, Dict[str, Any]]  # (0-based offset in the source, raw record)
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    if fmt:
+        return fmt.lower()
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _open(path: str) -> TextIO:
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _parse_jsonl(fh: TextIO) -> Iterator[Dict[str, Any]]:
+    for line in fh:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            obj = {"_error": "invalid_json", "_raw": line[:200]}
+        yield obj if isinstance(obj, dict) else {"_error": "not_an_object", "_raw": line[:200]}
+
+
+def read_records(path: str, fmt: Optional[str] = None, skip: int = 0) -> Iterator[Record]:
+    """Yield (offset, record) pairs from `path` ("-" = stdin), skipping the first `skip`."""
+    parse = csv.DictReader if detect_format(path, fmt) == "csv" else _parse_jsonl
+    with _open(path) as fh:
+        for offset, rec in enumerate(parse(fh)):
+            if offset >= skip:
+                yield offset, rec
+
+
+def micro_batches(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    it = iter(records)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S"  # SQLite CURRENT_TIMESTAMP (UTC)
+
+
+def _utc_now() -> str:
+    # Same format as SQLite CURRENT_TIMESTAMP so window queries keep working.
+    return datetime.now(timezone.utc).strftime(_TS_FORMAT)
+
+
+def _utc_timestamp(value: Any) -> Optional[str]:
+    """Normalise a feed timestamp to UTC "YYYY-MM-DD HH:MM:SS"; None if it cannot be parsed.
+
+    Stored timestamps are compared as text with `datetime('now', ...)`, so an ISO value
+    such as "2026-10-17T12:00:00Z" kept verbatim would sort after every same-day row
+    ('T' > ' ') and escape the velocity / KPI windows. Accepts ISO 8601 (with "T" or a
+    space, "Z" or an offset; naive values are taken as UTC) and epoch seconds.
+    """
+    if isinstance(value, bool):
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            dt = datetime.fromtimestamp(value, timezone.utc)
+        else:
+            text = str(value).strip()
+            try:
+                dt = datetime.fromtimestamp(float(text), timezone.utc)
+            except ValueError:
+                dt = datetime.fromisoformat(text)
+    except (OverflowError, OSError, ValueError):
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime(_TS_FORMAT)
+
+
+def to_transaction_row(rec: Dict[str, Any]) -> Tuple[Optional[Tuple[Any, ...]], Optional[str]]:
+    """Validate/coerce a raw record into a `transactions` row. Returns (row, error)."""
+    if rec.get("_error"):
+        return None, str(rec["_error"])
+    trans_id = str(rec.get("trans_id") or "").strip()
+    if not trans_id:
+        return None, "missing_trans_id"
+    try:
+        amount = float(rec.get("amount") or 0.0)
+    except (TypeError, ValueError):
+        return None, "invalid_amount"
+
+    def _text(key: str) -> Optional[str]:
+        v = rec.get(key)
+        return None if v is None or v == "" else str(v)
+
+    raw_ts = rec.get("timestamp")
+    if raw_ts is None or raw_ts == "":
+        timestamp = _utc_now()
+    else:
+        timestamp = _utc_timestamp(raw_ts)
+        if timestamp is None:
+            return None, "invalid_timestamp"
+
+    return (
+        trans_id,
+        _text("user_id"),
+        amount,
+        _text("merchant"),
+        _text("device_ip"),
+        _text("shipping_addr"),
+        _text("billing_addr"),
+        timestamp,
+    ), None
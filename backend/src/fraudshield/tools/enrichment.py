@@ -1,15 +1,63 @@
 from __future__ import annotations
 
-import sqlite3
 from typing import Any, Dict
 
-import pandas as pd
-
 from ..core.settings import settings
-
-
-def _connect() -> sqlite3.Connection:
-    return sqlite3.connect(settings().db_path)
+from ..data.rows import fetch_all, fetch_one
+from ..monitoring.metrics import ENRICHMENT_SECONDS
+
+# SQL kept as constants so pooled connections reuse the prepared statements.
+_SQL_TRANSACTION = """
+    SELECT
+        t.trans_id,
+        t.user_id,
+        t.amount,
+        t.merchant,
+        t.device_ip,
+        t.shipping_addr,
+        t.billing_addr,
+        t.timestamp,
+        u.name,
+        u.email,
+        u.home_ip,
+        u.account_age_days,
+        u.vip_status,
+        u.country
+    FROM transactions t
+    JOIN users u ON t.user_id = u.user_id
+    WHERE t.trans_id = ?
+"""
+
+_SQL_LAST_TRANSACTIONS = """
+    SELECT trans_id, amount, merchant, device_ip, timestamp
+    FROM transactions
+    WHERE user_id = ?
+    ORDER BY timestamp DESC
+    LIMIT 20
+"""
+
+_SQL_VELOCITY = """
+    SELECT
+        SUM(CASE WHEN timestamp >= datetime('now','-1 hour') THEN 1 ELSE 0 END) AS txn_count_1h,
+        SUM(CASE WHEN timestamp >= datetime('now','-24 hour') THEN 1 ELSE 0 END) AS txn_count_24h
+    FROM transactions
+    WHERE user_id = ?
+"""
+
+_SQL_IP_INTEL = "SELECT ip_address, reputation_score, isp, is_proxy FROM ip_intel WHERE ip_address = ?"
+
+_SQL_KYC = """
+    SELECT user_id, kyc_status, kyc_level, event_ts
+    FROM kyc_events
+    WHERE user_id = ?
+    ORDER BY event_ts DESC
+    LIMIT 1
+"""
+
+_SQL_DISPUTES = (
+    "SELECT user_id, dispute_count_90d, loss_amount_90d, last_dispute_date "
+    "FROM disputes WHERE user_id = ? LIMIT 1"
+)
 
 
 def _mask_email(email: str) -> str:
@@ -37,120 +85,85 @@ def _redact_user(row: Dict[str, Any]) -> Dict[str, Any]:
     return out
 
 
+@ENRICHMENT_SECONDS.time("transaction")
 def lookup_transaction(trans_id: str) -> Dict[str, Any]:
     """Return a joined transaction + user record."""
-    conn = _connect()
-    query = """
-        SELECT
-            t.trans_id,
-            t.user_id,
-            t.amount,
-            t.merchant,
-            t.device_ip,
-            t.shipping_addr,
-            t.billing_addr,
-            t.timestamp,
-            u.name,
-            u.email,
-            u.home_ip,
-            u.account_age_days,
-            u.vip_status,
-            u.country
-        FROM transactions t
-        JOIN users u ON t.user_id = u.user_id
-        WHERE t.trans_id = ?
-    """
-    df = pd.read_sql(query, conn, params=(trans_id,))
-    conn.close()
-
-    if df.empty:
+    row = fetch_one(_SQL_TRANSACTION, (trans_id,))
+    if row is None:
         return {"found": False, "trans_id": trans_id}
-
-    row = _redact_user(df.iloc[0].to_dict())
-    return {"found": True, "transaction": row}
+    return {"found": True, "transaction": _redact_user(row)}
 
 
+@ENRICHMENT_SECONDS.time("user_history")
 def lookup_user_history(user_id: str) -> Dict[str, Any]:
     """Return recent transactions + velocity counts."""
-    conn = _connect()
-    q_last = """
-        SELECT trans_id, amount, merchant, device_ip, timestamp
-        FROM transactions
-        WHERE user_id = ?
-        ORDER BY timestamp DESC
-        LIMIT 20
-    """
-    last_df = pd.read_sql(q_last, conn, params=(user_id,))
-
-    q_vel = """
-        SELECT
-            SUM(CASE WHEN timestamp >= datetime('now','-1 hour') THEN 1 ELSE 0 END) AS txn_count_1h,
-            SUM(CASE WHEN timestamp >= datetime('now','-24 hour') THEN 1 ELSE 0 END) AS txn_count_24h
-        FROM transactions
-        WHERE user_id = ?
-    """
-    vel_df = pd.read_sql(q_vel, conn, params=(user_id,))
-    conn.close()
-
-    velocity = vel_df.iloc[0].to_dict() if not vel_df.empty else {"txn_count_1h": 0, "txn_count_24h": 0}
+    last = fetch_all(_SQL_LAST_TRANSACTIONS, (user_id,))
+    vel = fetch_one(_SQL_VELOCITY, (user_id,)) or {}
+    velocity = {
+        "txn_count_1h": int(vel.get("txn_count_1h") or 0),
+        "txn_count_24h": int(vel.get("txn_count_24h") or 0),
+    }
     return {
         "user_id": user_id,
         "velocity": velocity,
-        "last_transactions": last_df.to_dict(orient="records"),
+        "last_transactions": last,
     }
 
 
+@ENRICHMENT_SECONDS.time("ip_intel")
 def lookup_ip_intel(ip: str) -> Dict[str, Any]:
-    conn = _connect()
-    df = pd.read_sql(
-        "SELECT ip_address, reputation_score, isp, is_proxy FROM ip_intel WHERE ip_address = ?",
-        conn,
-        params=(ip,),
-    )
-    conn.close()
-
-    if df.empty:
+    row = fetch_one(_SQL_IP_INTEL, (ip,))
+    if row is None:
         return {"found": False, "ip_address": ip}
-    return {"found": True, "intel": df.iloc[0].to_dict()}
+    return {"found": True, "intel": row}
 
 
+@ENRICHMENT_SECONDS.time("kyc")
 def lookup_kyc(user_id: str) -> Dict[str, Any]:
-    conn = _connect()
-    q = """
-        SELECT user_id, kyc_status, kyc_level, event_ts
-        FROM kyc_events
-        WHERE user_id = ?
-        ORDER BY event_ts DESC
-        LIMIT 1
-    """
-    df = pd.read_sql(q, conn, params=(user_id,))
-    conn.close()
-
-    if df.empty:
+    row = fetch_one(_SQL_KYC, (user_id,))
+    if row is None:
         return {"found": False, "user_id": user_id}
-    return {"found": True, "kyc": df.iloc[0].to_dict()}
+    return {"found": True, "kyc": row}
 
 
+@ENRICHMENT_SECONDS.time("disputes")
 def lookup_disputes(user_id: str) -> Dict[str, Any]:
-    conn = _connect()
-    df = pd.read_sql(
-        "SELECT user_id, dispute_count_90d, loss_amount_90d, last_dispute_date FROM disputes WHERE user_id = ? LIMIT 1",
-        conn,
-        params=(user_id,),
-    )
-    conn.close()
-
-    if df.empty:
+    row = fetch_one(_SQL_DISPUTES, (user_id,))
+    if row is None:
         return {"found": False, "user_id": user_id}
-    return {"found": True, "disputes": df.iloc[0].to_dict()}
+    return {"found": True, "disputes": row}
+
+
+_SQL_CHARGEBACK_FLAGS = "SELECT trans_id FROM chargebacks WHERE trans_id IN ({})"
+
+
+@ENRICHMENT_SECONDS.time("similar_cases")
+def find_similar_cases(trans_id: str, k: int = 5) -> Dict[str, Any]:
+    """Nearest stored transactions by feature vector (see `tools/similarity.py`)."""
+    from ..core.features import assemble_features
+    from .similarity import feature_vector, get_similarity_index
+
+    out: Dict[str, Any] = {"query_trans_id": trans_id, "similar_cases": []}
+    index = get_similarity_index()
+    if index is None:
+        out["note"] = "similarity index not built (python -m fraudshield.tools.similarity build)"
+        return out
+    features = assemble_features(trans_id)
+    if features is None:
+        out["note"] = "transaction_not_found"
+        return out
+
+    hits = index.search(feature_vector(features), k=k, exclude=trans_id)
+    ids = [tid for tid, _ in hits]
+    charged = {
+        r["trans_id"] for r in fetch_all(_SQL_CHARGEBACK_FLAGS.format(",".join("?" * len(ids))), ids)
+    } if ids else set()
+    out["similar_cases"] = [
+        {"trans_id": tid, "distance": round(dist, 4), "charged_back": tid in charged} for tid, dist in hits
+    ]
+    out["index"] = {"mode": index.stats()["mode"], "size": index.count}
+    return out
 
 
-def find_similar_cases_stub(trans_id: str) -> Dict[str, Any]:
-    """Placeholder for a kNN / ANN based similarity search."""
-    return {
-        "query_trans_id": trans_id,
-        "similar_cases": [
-            {"trans_id": "TX-888", "distance": 0.24, "reason": "Device reuse + velocity spike"},
-            {"trans_id": "TX-777", "distance": 0.31, "reason": "Proxy IP + high amount"},
-        ],
-    }
+# Former name, kept for existing callers.
+find_similar_cases_stub = find_similar_cases
@@ -0,0 +1,693 @@
+"""Nearest-neighbour search over transaction feature vectors ("similar cases").
+
+Each transaction is embedded as a small, fixed-scale float32 vector derived from its
+`build_features` output (see `feature_vector`). Velocity counts are left out on
+purpose: they are relative to "now" and would make historical and fresh rows
+incomparable.
+
+Index layout (a directory, default `artifacts/similarity/`):
+- CURRENT       name of the live generation directory
+- gen-<id>/     one complete index:
+  - vectors.f32   memory-mapped (capacity x DIM) float32 matrix, grown in place
+  - ids.txt       one trans_id per row
+  - assign.i32    IVF list per row (approximate mode only)
+  - centroids.npy IVF centroids (approximate mode only)
+  - meta.json     row count, generation id etc.; written last, so a crash never
+                  exposes torn rows
+  - write.lock    single-writer lock (flock), held by the one handle that may append
+
+`build` writes a new generation next to the live one and publishes it by replacing
+CURRENT, so a running API is never written under: it notices the new pointer within
+`_RECHECK_S`, opens the new generation in the background and swaps it in. An index
+only saves while it is still the current generation (and meta.json is its own).
+
+Search is squared-L2 via one matrix-vector product per block of rows (exact), or over
+the rows of the `nprobe` closest IVF lists (approximate, for millions of rows).
+Decisions made while the API runs are appended incrementally (`index_decisions`), on
+a background writer thread when the API runs it (`start_similarity_writer`). Only one
+process appends to a generation: the first handle to take its `write.lock` is the
+writer, handles opened later (other uvicorn workers, the query CLI) are read-only and
+skip their adds. Their decisions are picked up by the next `build`.
+
+    python -m fraudshield.tools.similarity build [--ivf 1024]
+    python -m fraudshield.tools.similarity query T000000123 -k 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from ..core.settings import settings
+from ..util.batching import GroupCommitWorker
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: no advisory locks, run a single API worker
+    fcntl = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
+
+SIMILARITY_FEATURES: Tuple[str, ...] = (
+    "amount",
+    "account_age_days",
+    "ip_reputation_score",
+    "ip_is_proxy",
+    "device_ip_mismatch",
+    "shipping_is_freight_forwarder",
+    "ship_bill_mismatch",
+)
+DIM = len(SIMILARITY_FEATURES)
+
+_FORMAT = 1
+_BLOCK_ROWS = 262_144  # exact search: rows per matrix-vector block
+_INITIAL_CAPACITY = 1024
+_AUTOSAVE_EVERY = 1000  # incremental adds between meta.json writes
+_RECHECK_S = 5.0  # how often the process-wide index looks for a rebuilt generation
+_CURRENT = "CURRENT"
+_WRITE_LOCK = "write.lock"
+_FILES = ("vectors.f32", "ids.txt", "assign.i32", "centroids.npy", "meta.json", _WRITE_LOCK)
+
+
+def feature_vector(features: Dict[str, Any]) -> List[float]:
+    """Normalised vector for one `build_features` dict (all components roughly in [0, 1])."""
+    return [
+        math.log1p(max(float(features.get("amount") or 0.0), 0.0)) / 10.0,
+        math.log1p(max(float(features.get("account_age_days") or 0), 0.0)) / 8.0,
+        float(features.get("ip_reputation_score") or 0) / 100.0,
+        1.0 if features.get("ip_is_proxy") else 0.0,
+        1.0 if features.get("device_ip_mismatch") else 0.0,
+        1.0 if features.get("shipping_is_freight_forwarder") else 0.0,
+        1.0 if features.get("ship_bill_mismatch") else 0.0,
+    ]
+
+
+def feature_matrix(features_list: Sequence[Dict[str, Any]]) -> "np.ndarray":
+    import numpy as np
+
+    return np.asarray([feature_vector(f) for f in features_list], dtype=np.float32).reshape(-1, DIM)
+
+
+def _resolve(root: str) -> Optional[str]:
+    """Directory of the live index under `root` (CURRENT pointer, or a flat legacy index)."""
+    try:
+        with open(os.path.join(root, _CURRENT), "r", encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return root if os.path.exists(os.path.join(root, "meta.json")) else None
+    return os.path.join(root, name) if name else None
+
+
+def _signature(root: str) -> Optional[Tuple[int, int]]:
+    for name in (_CURRENT, "meta.json"):
+        try:
+            st = os.stat(os.path.join(root, name))
+        except FileNotFoundError:
+            continue
+        return (st.st_mtime_ns, st.st_ino)
+    return None
+
+
+def _read_meta(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+class SimilarityIndex:
+    def __init__(self, path: str, root: Optional[str] = None) -> None:
+        import numpy as np
+
+        self.path = path
+        self.root = root or path
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stale = False
+        self.nprobe = settings().similarity_nprobe
+
+        with open(self._file("meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != _FORMAT or meta.get("dim") != DIM:
+            raise ValueError(f"incompatible similarity index at {path}")
+
+        self.generation: Optional[str] = meta.get("generation")
+        self.count = int(meta["count"])
+        self.capacity = int(meta["capacity"])
+        self._lock_fh: Optional[Any] = None
+        self.writable = self._lock_writer()
+        mode = "r+" if self.writable else "r"
+        self._vecs = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode=mode, shape=(self.capacity, DIM))
+        self._norms = np.zeros(self.capacity, dtype=np.float32)
+        self._norms[: self.count] = np.einsum("ij,ij->i", self._vecs[: self.count], self._vecs[: self.count])
+
+        with open(self._file("ids.txt"), "r", encoding="utf-8") as f:
+            self.ids: List[str] = [line.rstrip("\n") for _, line in zip(range(self.count), f)]
+        self._row_of: Dict[str, int] = {t: i for i, t in enumerate(self.ids)}
+        self._ids_out: Optional[Any] = None
+        if self.writable:
+            self._rewrite_ids_if_longer()
+            self._ids_out = open(self._file("ids.txt"), "a", encoding="utf-8")
+
+        self.centroids: Optional["np.ndarray"] = None
+        self._assign: Optional["np.ndarray"] = None
+        self._lists: List["np.ndarray"] = []
+        self._tails: List[List[int]] = []
+        if meta.get("nlist"):
+            self.centroids = np.load(self._file("centroids.npy"))
+            self._assign = np.memmap(self._file("assign.i32"), dtype=np.int32, mode=mode, shape=(self.capacity,))
+            self._build_lists()
+
+        self._unsaved = 0
+        self.queries = 0
+        self.adds = 0
+        self.last_query_ms: Optional[float] = None
+
+    # ------------------------------------------------------------ files
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _lock_writer(self) -> bool:
+        """Take this generation's write.lock without waiting; False if another handle holds it.
+
+        Each process keeps its own row count, so two appenders would interleave ids.txt
+        lines and overwrite each other's rows. The lock lives as long as the handle
+        (flock is released when the file is closed, also when the process dies).
+        """
+        if fcntl is None:
+            return True
+        fh = open(self._file(_WRITE_LOCK), "a")
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            return False
+        self._lock_fh = fh
+        return True
+
+    @classmethod
+    def create(cls, path: str, capacity: int = _INITIAL_CAPACITY) -> "SimilarityIndex":
+        """Create an empty (exact) index in `path`, which must not hold an index already.
+
+        Never rebuild in place: a running process may have the files mapped. `build_index`
+        creates a new generation directory and publishes it instead.
+        """
+        os.makedirs(path, exist_ok=True)
+        if any(os.path.exists(os.path.join(path, name)) for name in _FILES):
+            raise FileExistsError(f"similarity index already exists at {path}")
+        capacity = max(int(capacity), _INITIAL_CAPACITY)
+        with open(os.path.join(path, "vectors.f32"), "wb") as f:
+            f.truncate(capacity * DIM * 4)
+        open(os.path.join(path, "ids.txt"), "w", encoding="utf-8").close()
+        _write_meta(path, {
+            "format": _FORMAT,
+            "dim": DIM,
+            "count": 0,
+            "capacity": capacity,
+            "nlist": 0,
+            "generation": uuid.uuid4().hex,
+        })
+        return cls(path)
+
+    @classmethod
+    def open(cls, root: str) -> Optional["SimilarityIndex"]:
+        """Open the live index under `root` (see `_resolve`); None if there is none."""
+        path = _resolve(root)
+        if path is None or not os.path.exists(os.path.join(path, "meta.json")):
+            return None
+        return cls(path, root=root)
+
+    def _is_current(self) -> bool:
+        # Our directory is still the published one, and nobody replaced its meta.json.
+        meta = _read_meta(self.path)
+        return (
+            meta is not None
+            and meta.get("generation") == self.generation
+            and os.path.abspath(_resolve(self.root) or "") == os.path.abspath(self.path)
+        )
+
+    def _rewrite_ids_if_longer(self) -> None:
+        # Rows appended after the last meta.json write (crash) are dropped.
+        if os.path.getsize(self._file("ids.txt")) > sum(len(t.encode("utf-8")) + 1 for t in self.ids):
+            tmp = self._file("ids.txt.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(t + "\n" for t in self.ids)
+            os.replace(tmp, self._file("ids.txt"))
+
+    def save(self) -> bool:
+        """Flush vectors/ids and publish the row count (meta.json).
+
+        Refuses (returns False, marks the index stale) once this index is no longer the
+        live generation, so a superseded handle can never clobber a rebuilt index.
+        """
+        with self._lock:
+            if self.stale or not self._is_current():
+                self.stale = True
+                return False
+            if not self.writable or self._ids_out is None or self._ids_out.closed:
+                return False
+            self._vecs.flush()
+            if self._assign is not None:
+                self._assign.flush()
+            self._ids_out.flush()
+            os.fsync(self._ids_out.fileno())
+            _write_meta(self.path, {
+                "format": _FORMAT,
+                "dim": DIM,
+                "count": self.count,
+                "capacity": self.capacity,
+                "nlist": 0 if self.centroids is None else int(self.centroids.shape[0]),
+                "features": list(SIMILARITY_FEATURES),
+                "generation": self.generation,
+                "saved_at": time.time(),
+            })
+            self._unsaved = 0
+            return True
+
+    def close(self) -> None:
+        if self._unsaved:
+            self.save()
+        with self._lock:
+            self._closed = True
+            if self._ids_out is not None:
+                self._ids_out.close()
+            if self._lock_fh is not None:
+                self._lock_fh.close()
+                self._lock_fh = None
+
+    def _grow(self, needed: int) -> None:
+        import numpy as np
+
+        cap = self.capacity
+        while cap < needed:
+            cap *= 2
+        self._vecs.flush()
+        with open(self._file("vectors.f32"), "r+b") as f:
+            f.truncate(cap * DIM * 4)
+        # Searches holding the old mapping keep a valid (shorter) view.
+        self._vecs = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r+", shape=(cap, DIM))
+        norms = np.zeros(cap, dtype=np.float32)
+        norms[: self.count] = self._norms[: self.count]
+        self._norms = norms
+        if self._assign is not None:
+            self._assign.flush()
+            with open(self._file("assign.i32"), "r+b") as f:
+                f.truncate(cap * 4)
+            self._assign = np.memmap(self._file("assign.i32"), dtype=np.int32, mode="r+", shape=(cap,))
+        self.capacity = cap
+
+    # ------------------------------------------------------------ writes
+    def add(self, trans_ids: Sequence[str], vectors: "np.ndarray") -> int:
+        """Insert (or overwrite, for known IDs) rows. Returns the number of new rows."""
+        import numpy as np
+
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, DIM)
+        lists = self._nearest_centroids(vectors) if self.centroids is not None else None
+        added = 0
+        with self._lock:
+            if self._closed or self.stale or not self.writable:
+                return 0
+            new = [t for t in dict.fromkeys(trans_ids) if t not in self._row_of]
+            if self.count + len(new) > self.capacity:
+                self._grow(self.count + len(new))
+            rows = np.empty(len(trans_ids), dtype=np.int64)
+            for j, tid in enumerate(trans_ids):
+                row = self._row_of.get(tid)
+                if row is None:
+                    row = self.count
+                    self._row_of[tid] = row
+                    self.ids.append(tid)
+                    self._ids_out.write(tid + "\n")
+                    self.count += 1
+                    added += 1
+                rows[j] = row
+            self._vecs[rows] = vectors
+            self._norms[rows] = np.einsum("ij,ij->i", vectors, vectors)
+            if lists is not None:
+                self._assign[rows] = lists
+                for row, c in zip(rows.tolist(), lists.tolist()):
+                    self._tails[c].append(row)
+            self.adds += len(trans_ids)
+            self._unsaved += len(trans_ids)
+            autosave = self._unsaved >= _AUTOSAVE_EVERY
+        if autosave:
+            self.save()
+        return added
+
+    # ------------------------------------------------------------ IVF
+    def _nearest_centroids(self, vectors: "np.ndarray") -> "np.ndarray":
+        c = self.centroids
+        d = (c * c).sum(1)[None, :] - 2.0 * vectors @ c.T
+        return d.argmin(1).astype("int32")
+
+    def _build_lists(self) -> None:
+        import numpy as np
+
+        nlist = self.centroids.shape[0]
+        assign = np.asarray(self._assign[: self.count])
+        order = np.argsort(assign, kind="stable").astype(np.int64)
+        bounds = np.searchsorted(assign[order], np.arange(nlist + 1))
+        self._lists = [order[bounds[i] : bounds[i + 1]] for i in range(nlist)]
+        self._tails = [[] for _ in range(nlist)]
+
+    def train_ivf(self, nlist: int, iterations: int = 10, sample: int = 100_000, seed: int = 0) -> None:
+        """Cluster the stored vectors into `nlist` lists (k-means) for approximate search."""
+        import numpy as np
+
+        with self._lock:
+            if not self.writable:
+                raise RuntimeError(f"similarity index at {self.path} is read-only (write.lock is held elsewhere)")
+            n = self.count
+            if n == 0:
+                raise ValueError("cannot train IVF on an empty index")
+            nlist = max(1, min(int(nlist), n))
+            rng = np.random.default_rng(seed)
+            pick = rng.choice(n, min(n, max(sample, nlist)), replace=False)
+            X = np.asarray(self._vecs[np.sort(pick)])
+            cent = X[rng.choice(X.shape[0], nlist, replace=False)].copy()
+            for _ in range(iterations):
+                lab = ((cent * cent).sum(1)[None, :] - 2.0 * X @ cent.T).argmin(1)
+                sums = np.zeros_like(cent)
+                np.add.at(sums, lab, X)
+                cnt = np.bincount(lab, minlength=nlist)
+                nonempty = cnt > 0
+                cent[nonempty] = sums[nonempty] / cnt[nonempty, None]
+
+            self.centroids = cent.astype(np.float32)
+            np.save(self._file("centroids.npy"), self.centroids)
+            with open(self._file("assign.i32"), "wb") as f:
+                f.truncate(self.capacity * 4)
+            self._assign = np.memmap(self._file("assign.i32"), dtype=np.int32, mode="r+", shape=(self.capacity,))
+            for lo in range(0, n, _BLOCK_ROWS):
+                hi = min(lo + _BLOCK_ROWS, n)
+                self._assign[lo:hi] = self._nearest_centroids(np.asarray(self._vecs[lo:hi]))
+            self._build_lists()
+        self.save()
+
+    # ------------------------------------------------------------ reads
+    def search(
+        self, vector: Sequence[float], k: int = 5, exclude: Optional[str] = None, exact: bool = False
+    ) -> List[Tuple[str, float]]:
+        """Top-k (trans_id, L2 distance), nearest first."""
+        import numpy as np
+
+        t0 = time.perf_counter()
+        q = np.asarray(vector, dtype=np.float32).reshape(DIM)
+        qn = float(q @ q)
+        want = k + (1 if exclude is not None else 0)
+
+        with self._lock:
+            n, vecs, norms = self.count, self._vecs, self._norms
+            if self.centroids is not None and not exact:
+                probe = np.argsort((self.centroids * self.centroids).sum(1) - 2.0 * self.centroids @ q)[: self.nprobe]
+                parts = [self._lists[c] for c in probe] + [np.asarray(self._tails[c], dtype=np.int64) for c in probe]
+                candidates: Optional["np.ndarray"] = np.unique(np.concatenate(parts)) if parts else None
+            else:
+                candidates = None
+
+        best_rows: List["np.ndarray"] = []
+        best_d: List["np.ndarray"] = []
+
+        def consider(rows: "np.ndarray", d: "np.ndarray") -> None:
+            if d.size > want:
+                part = np.argpartition(d, want - 1)[:want]
+                rows, d = rows[part], d[part]
+            best_rows.append(rows)
+            best_d.append(d)
+
+        if candidates is not None:
+            if candidates.size:
+                consider(candidates, norms[candidates] - 2.0 * (vecs[candidates] @ q) + qn)
+        else:
+            for lo in range(0, n, _BLOCK_ROWS):
+                hi = min(lo + _BLOCK_ROWS, n)
+                consider(np.arange(lo, hi), norms[lo:hi] - 2.0 * (vecs[lo:hi] @ q) + qn)
+
+        out: List[Tuple[str, float]] = []
+        if best_d:
+            rows, d = np.concatenate(best_rows), np.concatenate(best_d)
+            for i in np.argsort(d, kind="stable"):
+                tid = self.ids[int(rows[i])]
+                if tid == exclude:
+                    continue
+                out.append((tid, math.sqrt(max(float(d[i]), 0.0))))
+                if len(out) == k:
+                    break
+
+        self.queries += 1
+        self.last_query_ms = (time.perf_counter() - t0) * 1000.0
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "mode": "exact" if self.centroids is None else "ivf",
+            "generation": self.generation,
+            "stale": self.stale,
+            "writable": self.writable,
+            "size": self.count,
+            "capacity": self.capacity,
+            "nlist": 0 if self.centroids is None else int(self.centroids.shape[0]),
+            "nprobe": self.nprobe,
+            "queries": self.queries,
+            "adds": self.adds,
+            "last_query_ms": round(self.last_query_ms, 3) if self.last_query_ms is not None else None,
+        }
+
+
+def _write_meta(path: str, meta: Dict[str, Any]) -> None:
+    tmp = os.path.join(path, "meta.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, os.path.join(path, "meta.json"))
+
+
+# ---------------------------------------------------------------- process-wide index
+_index: Optional[SimilarityIndex] = None
+_index_sig: Any = object()  # sentinel: forces the first check
+_index_next_check = 0.0
+_index_lock = threading.Lock()
+_reloading = False
+
+
+def _open_current(root: str, sig: Any) -> None:
+    """Open the published generation and swap it in; the superseded handle is closed."""
+    global _index, _index_sig, _reloading
+    try:
+        new = SimilarityIndex.open(root)
+    except Exception:
+        # Incompatible / unreadable: keep serving the old index, retry at the next check.
+        with _index_lock:
+            _reloading = False
+        return
+    with _index_lock:
+        old, _index, _index_sig, _reloading = _index, new, sig, False
+    if old is not None and old is not new:
+        old.close()  # save() refuses: it is no longer the current generation
+
+
+def get_similarity_index() -> Optional[SimilarityIndex]:
+    """The live index at SIMILARITY_INDEX_PATH; None if not built (yet).
+
+    The CURRENT pointer is stat'ed at most every `_RECHECK_S`, also while no index
+    exists. A rebuilt (or newly built) index is opened on a background thread and
+    swapped in, so request threads never pay for loading it; only the first check in
+    a process opens synchronously.
+    """
+    global _index_next_check, _reloading
+    now = time.monotonic()
+    if now < _index_next_check:
+        return _index
+
+    root = settings().similarity_index_path
+    with _index_lock:
+        if now < _index_next_check or _reloading:
+            return _index
+        _index_next_check = now + _RECHECK_S
+        sig = _signature(root)
+        if sig == _index_sig:
+            return _index
+        first = not isinstance(_index_sig, tuple) and _index_sig is not None
+        _reloading = True
+    if first:
+        _open_current(root, sig)
+    else:
+        threading.Thread(
+            target=_open_current, args=(root, sig), name="fraudshield-similarity-reload", daemon=True
+        ).start()
+    return _index
+
+
+def close_similarity_index() -> None:
+    """Persist pending incremental adds (API lifespan shutdown) and forget the handle."""
+    global _index, _index_sig, _index_next_check
+    with _index_lock:
+        idx, _index, _index_sig, _index_next_check = _index, None, object(), 0.0
+    if idx is not None:
+        idx.close()
+
+
+def _add_decisions(features_list: Sequence[Dict[str, Any]]) -> None:
+    idx = get_similarity_index()
+    if idx is not None and features_list:
+        idx.add([f["trans_id"] for f in features_list], feature_matrix(features_list))
+
+
+def index_decisions(features_list: Sequence[Dict[str, Any]]) -> None:
+    """Append freshly decided transactions to the index (no-op when no index is built).
+
+    While the writer runs (see `start_similarity_writer`) the features are only queued:
+    vectors, growing the memmap and the periodic save happen on its thread. A full queue
+    drops rows (counted as `rejected`) rather than stalling the request; `build`
+    re-indexes every stored transaction.
+    """
+    if not features_list:
+        return
+    writer = _writer
+    if writer is not None and writer.running:
+        for f in features_list:
+            writer.submit(f)
+        return
+    _add_decisions(features_list)
+
+
+_writer: Optional[GroupCommitWorker] = None
+_writer_lock = threading.Lock()
+
+
+def start_similarity_writer() -> GroupCommitWorker:
+    """Start the background index appender (API lifespan startup)."""
+    global _writer
+    s = settings()
+    with _writer_lock:
+        if _writer is None or not _writer.running:
+            _writer = GroupCommitWorker(
+                "fraudshield-similarity-writer",
+                flush_fn=_add_decisions,
+                batch_size=s.event_batch_size,
+                flush_interval_ms=s.event_flush_ms,
+                queue_max=s.event_queue_max,
+                put_timeout_s=0.0,
+            ).start()
+        return _writer
+
+
+def flush_similarity_writer(timeout: Optional[float] = 10.0) -> bool:
+    """Wait until every decision queued so far has been added to the index."""
+    writer = _writer
+    return writer.wait_flushed(timeout) if writer is not None else True
+
+
+def stop_similarity_writer(timeout: Optional[float] = 10.0) -> None:
+    """Add the queued decisions and stop the appender (API lifespan shutdown)."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop(timeout)
+
+
+def similarity_writer_stats() -> Dict[str, Any]:
+    writer = _writer
+    return writer.stats() if writer is not None else {"running": False}
+
+
+def publish(root: str, path: str) -> None:
+    """Point CURRENT at generation `path` (atomic), then prune older generations.
+
+    The generation that was live until now is kept, so a process still mapping it keeps
+    valid files until it has swapped to the new one.
+    """
+    previous = _resolve(root)
+    tmp = os.path.join(root, _CURRENT + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(os.path.basename(path) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(root, _CURRENT))
+
+    keep = {os.path.basename(path), os.path.basename(previous or "")}
+    for name in os.listdir(root):
+        if name.startswith("gen-") and name not in keep:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    if previous is not None and os.path.abspath(previous) == os.path.abspath(root):
+        # Flat legacy index: its holders see CURRENT and stop saving; drop the files.
+        for name in _FILES:
+            try:
+                os.remove(os.path.join(root, name))
+            except FileNotFoundError:
+                pass
+
+
+def build_index(path: Optional[str] = None, nlist: int = 0, batch_size: int = 10_000) -> SimilarityIndex:
+    """Build a new generation from every stored transaction (IVF-trained if `nlist` > 0) and publish it.
+
+    The returned handle is closed (stats / path only); the API opens the new generation
+    as its writer.
+    """
+    global _index_next_check
+    from ..core.features import scan_features
+    from ..data.db import init_db
+
+    init_db()
+    root = path or settings().similarity_index_path
+    gen = os.path.join(root, "gen-" + time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8])
+    idx = SimilarityIndex.create(gen)
+    for batch in scan_features(batch_size):
+        idx.add([f["trans_id"] for f in batch], feature_matrix(batch))
+    if nlist:
+        idx.train_ivf(nlist)
+    idx.save()
+    idx.close()  # release write.lock before the API can open the new generation as its writer
+    publish(root, gen)
+    idx.root = root
+    _index_next_check = 0.0  # same process (tests, notebooks): pick the new generation up now
+    return idx
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="FraudShield similar-case index")
+    sub = ap.add_subparsers(dest="command", required=True)
+    bp = sub.add_parser("build", help="(re)build the index from the transactions table")
+    bp.add_argument("--ivf", type=int, default=0, metavar="NLIST", help="train NLIST IVF lists (approximate mode)")
+    qp = sub.add_parser("query", help="top-k similar transactions")
+    qp.add_argument("trans_id")
+    qp.add_argument("-k", type=int, default=5)
+    qp.add_argument("--exact", action="store_true", help="ignore IVF lists (brute force)")
+    sub.add_parser("stats")
+    args = ap.parse_args()
+
+    if args.command == "build":
+        t0 = time.perf_counter()
+        idx = build_index(nlist=args.ivf)
+        print(f"✅ Indexed {idx.count} transactions in {time.perf_counter() - t0:.1f}s -> {idx.path}")
+        return
+
+    idx = get_similarity_index()
+    if idx is None:
+        raise SystemExit("No similarity index; run `python -m fraudshield.tools.similarity build` first.")
+    if args.command == "stats":
+        print(json.dumps(idx.stats(), indent=2))
+        return
+
+    from ..core.features import assemble_features
+
+    features = assemble_features(args.trans_id)
+    if features is None:
+        raise SystemExit(f"transaction not found: {args.trans_id}")
+    for tid, dist in idx.search(feature_vector(features), k=args.k, exclude=args.trans_id, exact=args.exact):
+        print(f"{tid}\t{dist:.4f}")
+    print(f"({idx.last_query_ms:.2f} ms, {idx.stats()['mode']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+"""Incremental in-memory velocity counters per user.
+
+Each user keeps one ring buffer per window (5m, 1h, 24h, 7d by default). A ring has
+VELOCITY_BUCKETS time buckets of `window / VELOCITY_BUCKETS` seconds and running
+totals (count + amount sum), so reading a window is O(1) regardless of how much
+history the user has; expired buckets are subtracted as the ring advances.
+
+Windows are bucket-aligned: a "1h" count covers the current 1-minute bucket plus the
+59 before it, i.e. it may include up to one bucket (window/60) of extra history
+compared with the exact `timestamp >= now - 1 hour` SQL predicate.
+
+Memory stays proportional to the users active within the longest window: a ring is
+one flat `array("d")` (counts, then sums), and a periodic sweep drops users whose
+rings have all expired along with the dedup entries older than the longest window.
+
+Lifecycle (VELOCITY_MODE=memory):
+- warmed at startup from the last snapshot, topped up from the DB
+- fed by tailing `transactions` by rowid (`catch_up`), so rows written by any process
+  (API seeding, streaming CLI, bulk loader) are counted once: a background thread
+  polls every VELOCITY_TAIL_INTERVAL_S, and feature assembly catches up
+  synchronously when the transaction being decided is newer than the watermark.
+  Rows are deduplicated by trans_id (a bulk `INSERT OR REPLACE` re-inserts with a
+  new rowid); the dedup set keeps a hash per id, bucketed by transaction time
+- snapshotted to disk periodically and at shutdown for fast restart; the snapshot
+  records the rowid watermark it covers, and a restart tails the rows after it.
+  Users are copied a chunk at a time (a user about to change mid-snapshot is copied
+  first), and JSON encoding happens outside the lock
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from ..core.settings import settings
+from ..data.pool import connection
+
+DEFAULT_WINDOWS: Dict[str, int] = {"5m": 300, "1h": 3600, "24h": 86400, "7d": 7 * 86400}
+VELOCITY_BUCKETS = 60
+_SNAPSHOT_FORMAT = 2
+_TAIL_CHUNK = 10_000
+_SNAPSHOT_CHUNK = 1_000  # users copied per lock acquisition
+
+# data[i] = count of bucket i, data[VELOCITY_BUCKETS + i] = amount sum of bucket i.
+_EMPTY = array("d", bytes(2 * VELOCITY_BUCKETS * 8))
+
+_SQL_TAIL = """
+    SELECT rowid, trans_id, user_id, CAST(strftime('%s', timestamp) AS INTEGER), amount
+    FROM transactions WHERE rowid > ? ORDER BY rowid LIMIT ?
+"""
+
+
+class _Ring:
+    __slots__ = ("width", "data", "head", "total_count", "total_sum")
+
+    def __init__(self, width: float) -> None:
+        self.width = width
+        self.data = _EMPTY[:]
+        self.head = -1  # absolute index of the newest bucket
+        self.total_count = 0
+        self.total_sum = 0.0
+
+    def _advance(self, bucket: int) -> None:
+        if bucket <= self.head:
+            return
+        if self.head < 0 or bucket - self.head >= VELOCITY_BUCKETS:
+            if self.total_count:
+                self.data = _EMPTY[:]
+            self.total_count = 0
+            self.total_sum = 0.0
+        else:
+            data = self.data
+            for b in range(self.head + 1, bucket + 1):
+                i = b % VELOCITY_BUCKETS
+                self.total_count -= int(data[i])
+                self.total_sum -= data[VELOCITY_BUCKETS + i]
+                data[i] = 0.0
+                data[VELOCITY_BUCKETS + i] = 0.0
+        self.head = bucket
+
+    def add(self, ts: float, amount: float) -> None:
+        bucket = int(ts // self.width)
+        self._advance(bucket)
+        if bucket <= self.head - VELOCITY_BUCKETS:
+            return  # older than the window
+        i = bucket % VELOCITY_BUCKETS
+        self.data[i] += 1
+        self.data[VELOCITY_BUCKETS + i] += amount
+        self.total_count += 1
+        self.total_sum += amount
+
+    def read(self, now: float) -> Tuple[int, float]:
+        self._advance(int(now // self.width))
+        return self.total_count, self.total_sum
+
+    def copy_state(self) -> Tuple[int, "array[float]"]:
+        return self.head, self.data[:]
+
+    @staticmethod
+    def encode(state: Tuple[int, "array[float]"]) -> list:
+        """[head, bucket indexes, counts, sums], non-empty buckets only."""
+        head, data = state
+        idx = [i for i, c in enumerate(data[:VELOCITY_BUCKETS]) if c]
+        return [head, idx, [int(data[i]) for i in idx], [data[VELOCITY_BUCKETS + i] for i in idx]]
+
+    @classmethod
+    def load(cls, width: float, state: list) -> "_Ring":
+        r = cls(width)
+        head, idx, counts, sums = state
+        r.head = int(head)
+        for i, c, v in zip(idx, counts, sums):
+            r.data[i] = float(c)
+            r.data[VELOCITY_BUCKETS + i] = float(v)
+        r.total_count = int(sum(counts))
+        r.total_sum = float(sum(sums))
+        return r
+
+
+class VelocityService:
+    def __init__(self, windows: Optional[Dict[str, int]] = None) -> None:
+        self.windows = dict(windows or DEFAULT_WINDOWS)
+        self._widths = tuple(secs / VELOCITY_BUCKETS for secs in self.windows.values())
+        self._longest = max(self.windows.values())
+        # user_id -> one ring per window, in `windows` order.
+        self._users: Dict[str, Tuple[_Ring, ...]] = {}
+        self._lock = threading.Lock()
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._tail_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # In-progress snapshot: user_id -> copied ring states, None until copied.
+        self._pending_snapshot: Optional[Dict[str, Optional[list]]] = None
+
+        # Dedup by trans_id: bucket of the transaction time -> hash(trans_id). A re-insert
+        # keeps its timestamp, so only that bucket is checked; buckets past the longest
+        # window are dropped by `sweep`.
+        self._seen_width = self._longest / VELOCITY_BUCKETS
+        self._seen: Dict[int, Set[int]] = {}
+        self._tail_lock = threading.Lock()
+        self.watermark = 0  # highest transactions.rowid counted
+        self._next_sweep = 0.0
+
+        self.records = 0
+        self.duplicates = 0
+        self.evicted_users = 0
+        self.warmed_rows = 0
+        self.last_snapshot_at: Optional[float] = None
+        self.last_snapshot_ms: Optional[float] = None
+
+    # ---------------------------------------------------------------- counters
+    def record(self, user_id: str, ts: float, amount: float = 0.0, trans_id: Optional[str] = None) -> bool:
+        """Count one transaction (epoch seconds, UTC) for `user_id`.
+
+        With `trans_id`, a transaction already counted is ignored (returns False).
+        """
+        with self._lock:
+            if trans_id is not None:
+                seen = self._seen.setdefault(int(ts // self._seen_width), set())
+                key = hash(trans_id)
+                if key in seen:
+                    self.duplicates += 1
+                    return False
+                seen.add(key)
+            rings = self._users.get(user_id)
+            if rings is None:
+                rings = tuple(_Ring(width) for width in self._widths)
+                self._users[user_id] = rings
+            elif self._pending_snapshot is not None and user_id in self._pending_snapshot:
+                # Copy-on-write: the snapshot keeps this user's state as of its start.
+                if self._pending_snapshot[user_id] is None:
+                    self._pending_snapshot[user_id] = [r.copy_state() for r in rings]
+            for ring in rings:
+                ring.add(ts, float(amount or 0.0))
+            self.records += 1
+            return True
+
+    def record_many(self, rows: Iterable[Tuple[Any, ...]]) -> int:
+        """Rows of (user_id, ts, amount) or (user_id, ts, amount, trans_id)."""
+        n = 0
+        for row in rows:
+            user_id, ts = row[0], row[1]
+            if user_id is not None and ts is not None:
+                n += self.record(user_id, ts, row[2], row[3] if len(row) > 3 else None)
+        return n
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop users with no activity inside the longest window and expired dedup
+        buckets; returns the users dropped. Runs a chunk of users per lock hold."""
+        now = time.time() if now is None else now
+        floor = int((now - self._longest) // self._seen_width)
+        with self._lock:
+            for bucket in [b for b in self._seen if b < floor]:
+                del self._seen[bucket]
+            users = list(self._users)
+        longest = max(range(len(self._widths)), key=self._widths.__getitem__)
+        dropped = 0
+        for lo in range(0, len(users), _SNAPSHOT_CHUNK):
+            with self._lock:
+                for user_id in users[lo : lo + _SNAPSHOT_CHUNK]:
+                    rings = self._users.get(user_id)
+                    # Shorter windows are covered by the longest one.
+                    if rings is not None and rings[longest].read(now)[0] == 0:
+                        del self._users[user_id]
+                        dropped += 1
+        self.evicted_users += dropped
+        return dropped
+
+    def _maybe_sweep(self) -> None:
+        now = time.time()
+        if now >= self._next_sweep:
+            self._next_sweep = now + self._seen_width
+            self.sweep(now)
+
+    # ---------------------------------------------------------------- tailing
+    def catch_up(self, upto_rowid: Optional[int] = None) -> int:
+        """Count transactions inserted since the watermark. Returns the rows counted.
+
+        With `upto_rowid`, returns immediately when that row is already covered (the
+        feature path calls this for the transaction it is about to decide).
+        """
+        if upto_rowid is not None and upto_rowid <= self.watermark:
+            return 0
+        n = 0
+        with self._tail_lock:
+            with connection() as conn:
+                while True:
+                    rows = conn.execute(_SQL_TAIL, (self.watermark, _TAIL_CHUNK)).fetchall()
+                    if not rows:
+                        break
+                    n += self.record_many((r[2], r[3], r[4], r[1]) for r in rows)
+                    self.watermark = rows[-1][0]
+                    if len(rows) < _TAIL_CHUNK:
+                        break
+        return n
+
+    def start_tail(self, interval_s: float) -> None:
+        if self._tail_thread is not None or interval_s <= 0:
+            return
+        self._stop.clear()
+
+        def _loop() -> None:
+            while not self._stop.wait(interval_s):
+                try:
+                    self.catch_up()
+                    self._maybe_sweep()
+                except Exception:
+                    pass  # e.g. DB busy; the feature path catches up on demand anyway
+
+        self._tail_thread = threading.Thread(target=_loop, name="fraudshield-velocity-tail", daemon=True)
+        self._tail_thread.start()
+
+    def counts(self, user_id: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """{txn_count_<w>: int, amount_sum_<w>: float} for every window."""
+        now = time.time() if now is None else now
+        out: Dict[str, Any] = {}
+        with self._lock:
+            rings = self._users.get(user_id)
+            for i, w in enumerate(self.windows):
+                c, s = rings[i].read(now) if rings is not None else (0, 0.0)
+                out[f"txn_count_{w}"] = c
+                out[f"amount_sum_{w}"] = round(s, 2)
+        return out
+
+    # ---------------------------------------------------------------- warm-up
+    def warm_from_db(self, since_epoch: Optional[float] = None) -> int:
+        """Load transactions inside the longest window (or newer than `since_epoch`)."""
+        floor = time.time() - self._longest
+        if since_epoch is not None:
+            floor = max(floor, since_epoch)
+        with self._tail_lock, connection() as conn:
+            # Everything up to `hi` is covered by this pass; later rows by `catch_up`.
+            hi = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM transactions").fetchone()[0]
+            cur = conn.execute(
+                "SELECT user_id, CAST(strftime('%s', timestamp) AS INTEGER), amount, trans_id "
+                "FROM transactions WHERE timestamp > datetime(?, 'unixepoch') AND rowid <= ?",
+                (int(floor), hi),
+            )
+            n = 0
+            while True:
+                rows = cur.fetchmany(_TAIL_CHUNK)
+                if not rows:
+                    break
+                n += self.record_many(rows)
+            self.watermark = max(self.watermark, hi)
+        self.warmed_rows += n
+        return n
+
+    def warm(self, snapshot_path: Optional[str] = None) -> Dict[str, Any]:
+        """Restore the last snapshot (if any) and tail the rows after it; without one,
+        load the longest window from the DB."""
+        saved_at = self.load_snapshot(snapshot_path) if snapshot_path else None
+        if saved_at is not None:
+            with connection() as conn:
+                hi = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM transactions").fetchone()[0]
+            if hi < self.watermark:  # snapshot of a different (or rebuilt) database
+                with self._tail_lock, self._lock:
+                    self._users, self.watermark = {}, 0
+                saved_at = None
+        if saved_at is not None:
+            rows = self.catch_up()
+            self.warmed_rows += rows
+        else:
+            rows = self.warm_from_db()
+        self.sweep()
+        return {"snapshot_saved_at": saved_at, "db_rows": rows, "users": len(self._users)}
+
+    # ---------------------------------------------------------------- snapshots
+    def snapshot(self, path: str) -> None:
+        t0 = time.perf_counter()
+        # The tail lock pins the watermark to exactly the rows recorded so far.
+        with self._tail_lock, self._lock:
+            saved_at = time.time()
+            watermark = self.watermark
+            users = list(self._users.items())
+            copied: Dict[str, Optional[list]] = dict.fromkeys(self._users)
+            self._pending_snapshot = copied
+        try:
+            for lo in range(0, len(users), _SNAPSHOT_CHUNK):
+                with self._lock:
+                    for user_id, rings in users[lo : lo + _SNAPSHOT_CHUNK]:
+                        if copied[user_id] is None:
+                            copied[user_id] = [r.copy_state() for r in rings]
+        finally:
+            with self._lock:
+                self._pending_snapshot = None
+
+        payload = {
+            "format": _SNAPSHOT_FORMAT,
+            "saved_at": saved_at,
+            "watermark": watermark,
+            "windows": self.windows,
+            "buckets": VELOCITY_BUCKETS,
+            "users": {u: [_Ring.encode(st) for st in states or ()] for u, states in copied.items()},
+        }
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        tmp = path + ".tmp"
+        # dumps (C encoder) + one write: json.dump to a file encodes in pure Python.
+        text = json.dumps(payload, separators=(",", ":"))
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        self.last_snapshot_at = saved_at
+        self.last_snapshot_ms = (time.perf_counter() - t0) * 1000.0
+
+    def load_snapshot(self, path: str) -> Optional[float]:
+        """Returns the snapshot's `saved_at`, or None if missing/incompatible."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if (
+            payload.get("format") != _SNAPSHOT_FORMAT
+            or list(payload.get("windows", {}).items()) != list(self.windows.items())
+            or payload.get("buckets") != VELOCITY_BUCKETS
+        ):
+            return None
+        users: Dict[str, Tuple[_Ring, ...]] = {
+            u: tuple(_Ring.load(width, st) for width, st in zip(self._widths, states))
+            for u, states in payload["users"].items()
+        }
+        with self._tail_lock, self._lock:
+            self._users = users
+            self.watermark = int(payload.get("watermark") or 0)
+        return float(payload["saved_at"])
+
+    def start_snapshots(self, path: str, interval_s: float) -> None:
+        if self._snapshot_thread is not None:
+            return
+        self._stop.clear()
+
+        def _loop() -> None:
+            while not self._stop.wait(interval_s):
+                self.snapshot(path)
+
+        self._snapshot_thread = threading.Thread(target=_loop, name="fraudshield-velocity-snapshot", daemon=True)
+        self._snapshot_thread.start()
+
+    def stop_snapshots(self, path: Optional[str] = None) -> None:
+        """Stop the periodic snapshots (and the tail); write a final one if `path` is given."""
+        self._stop.set()
+        for t in (self._snapshot_thread, self._tail_thread):
+            if t is not None:
+                t.join()
+        self._snapshot_thread = self._tail_thread = None
+        if path:
+            self.snapshot(path)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self._users),
+            "records": self.records,
+            "duplicates": self.duplicates,
+            "evicted_users": self.evicted_users,
+            "watermark": self.watermark,
+            "warmed_rows": self.warmed_rows,
+            "windows": list(self.windows),
+            "last_snapshot_at": self.last_snapshot_at,
+            "last_snapshot_ms": round(self.last_snapshot_ms, 3) if self.last_snapshot_ms else None,
+        }
+
+
+_service: Optional[VelocityService] = None
+_service_lock = threading.Lock()
+
+
+def get_velocity_service() -> Optional[VelocityService]:
+    """The process-wide service when VELOCITY_MODE=memory, else None (SQL velocity)."""
+    global _service
+    if settings().velocity_mode != "memory":
+        return None
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = VelocityService()
+    return _service
+
+
+def start_velocity(snapshot_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Startup: warm counters, start tailing and periodic snapshots (memory mode only).
+
+    `snapshot_path` defaults to VELOCITY_SNAPSHOT_PATH (the API's); other processes
+    (streaming CLI) pass their own so they never overwrite the API's snapshot.
+    """
+    svc = get_velocity_service()
+    if svc is None:
+        return None
+    s = settings()
+    path = snapshot_path or s.velocity_snapshot_path
+    info = svc.warm(path)
+    svc.start_tail(s.velocity_tail_interval_s)
+    svc.start_snapshots(path, s.velocity_snapshot_interval_s)
+    return info
+
+
+def stop_velocity(snapshot_path: Optional[str] = None) -> None:
+    """Shutdown: final snapshot (to the same path given to `start_velocity`)."""
+    svc = _service
+    if svc is not None:
+        svc.stop_snapshots(snapshot_path or settings().velocity_snapshot_path)
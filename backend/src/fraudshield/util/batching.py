@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ..monitoring.metrics import WRITER_FLUSH_SECONDS
+
+log = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class GroupCommitWorker:
+    """Background writer that coalesces submitted items into batches.
+
+    A batch is handed to `flush_fn` once it holds `batch_size` items or
+    `flush_interval_ms` has passed since its first item, whichever comes first.
+
+    - The queue is bounded: `submit` blocks up to `put_timeout_s` when it is full
+      (back-pressure) and returns False if the item was not accepted, so the caller
+      can fall back to writing synchronously.
+    - A failing flush is retried with exponential backoff (10ms doubling, capped at
+      `max_backoff_s`). After `max_retries` retries the batch goes to `on_failure`
+      (e.g. a spill file; counted as `spilled`), and is only counted as dropped if
+      there is no such hook or it fails too. `max_retries=None` retries until the
+      flush succeeds: the worker stalls, the queue fills and producers fall back to
+      their synchronous path, which surfaces the error to the caller.
+    - `stop()` drains everything already queued before the thread exits.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush_fn: Callable[[List[Any]], None],
+        batch_size: int = 256,
+        flush_interval_ms: float = 50.0,
+        queue_max: int = 10_000,
+        put_timeout_s: float = 0.1,
+        max_retries: Optional[int] = 2,
+        on_close: Optional[Callable[[], None]] = None,
+        on_failure: Optional[Callable[[List[Any]], None]] = None,
+        max_backoff_s: float = 1.0,
+    ) -> None:
+        self.name = name
+        self._flush_fn = flush_fn
+        self._on_close = on_close
+        self._on_failure = on_failure
+        self.max_backoff_s = float(max_backoff_s)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_s = max(0.0, float(flush_interval_ms) / 1000.0)
+        self.put_timeout_s = float(put_timeout_s)
+        self.max_retries = None if max_retries is None else int(max_retries)
+
+        self._q: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, int(queue_max)))
+        self._thread: Optional[threading.Thread] = None
+        self._cond = threading.Condition()
+        self._closed = False
+        self._inflight = 0
+
+        self.submitted = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.rejected = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._flush_ms_total = 0.0
+
+    # ---------------------------------------------------------------- lifecycle
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "GroupCommitWorker":
+        if not self.running:
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Drain the queue, flush the last batch and stop the thread."""
+        if not self.running:
+            return
+        # Refuse new items and wait for in-progress submits, so nothing lands after the drain.
+        with self._cond:
+            self._closed = True
+            while self._inflight:
+                self._cond.wait()
+        self._q.put(_STOP)
+        assert self._thread is not None
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ---------------------------------------------------------------- producers
+    def submit(self, item: Any) -> bool:
+        with self._cond:
+            if self._closed or not self.running:
+                return False
+            self._inflight += 1
+        try:
+            self._q.put(item, timeout=self.put_timeout_s)
+            accepted = True
+        except queue.Full:
+            accepted = False
+        with self._cond:
+            self._inflight -= 1
+            if accepted:
+                self.submitted += 1
+            else:
+                self.rejected += 1
+            self._cond.notify_all()
+        return accepted
+
+    def wait_flushed(self, timeout: Optional[float] = None) -> bool:
+        """Block until every item submitted so far has been flushed (or spilled / dropped)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self.submitted
+            while self.flushed + self.spilled + self.dropped < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # ---------------------------------------------------------------- consumer
+    def _run(self) -> None:
+        stopping = False
+        try:
+            while not stopping:
+                first = self._q.get()
+                if first is _STOP:
+                    break
+
+                batch = [first]
+                deadline = time.monotonic() + self.flush_interval_s
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        item = self._q.get(timeout=remaining) if remaining > 0 else self._q.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                self._flush(batch)
+
+            # Flush whatever is still queued behind the stop marker.
+            rest: List[Any] = []
+            while True:
+                try:
+                    item = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    rest.append(item)
+            for i in range(0, len(rest), self.batch_size):
+                self._flush(rest[i : i + self.batch_size])
+        finally:
+            if self._on_close is not None:
+                try:
+                    self._on_close()
+                except Exception:
+                    log.exception("%s: close hook failed", self.name)
+
+    def _flush(self, batch: List[Any]) -> None:
+        t0 = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                self._flush_fn(batch)
+                outcome = "flushed"
+                break
+            except Exception as e:
+                with self._cond:
+                    self.errors += 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+                if self.max_retries is not None and attempt >= self.max_retries:
+                    outcome = self._give_up(batch, attempt + 1)
+                    break
+                if attempt == 0 or (self.max_retries is None and attempt % 10 == 0):
+                    log.warning("%s: flush of %d failed (attempt %d): %s", self.name, len(batch), attempt + 1, e)
+                time.sleep(min(self.max_backoff_s, 0.01 * 2 ** min(attempt, 20)))
+                attempt += 1
+        ms = (time.perf_counter() - t0) * 1000.0
+        WRITER_FLUSH_SECONDS.observe(ms / 1000.0, self.name)
+
+        with self._cond:
+            if outcome == "flushed":
+                self.flushed += len(batch)
+            elif outcome == "spilled":
+                self.spilled += len(batch)
+            else:
+                self.dropped += len(batch)
+            self.batches += 1
+            self.last_flush_ms = ms
+            self.max_flush_ms = max(self.max_flush_ms, ms)
+            self._flush_ms_total += ms
+            self._cond.notify_all()
+
+    def _give_up(self, batch: List[Any], attempts: int) -> str:
+        if self._on_failure is not None:
+            try:
+                self._on_failure(batch)
+                log.error("%s: spilled batch of %d after %d attempts", self.name, len(batch), attempts)
+                return "spilled"
+            except Exception:
+                log.exception("%s: failure hook failed", self.name)
+        log.error("%s: dropped batch of %d after %d attempts", self.name, len(batch), attempts)
+        return "dropped"
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "running": self.running,
+                "queue_depth": self._q.qsize(),
+                "queue_max": self._q.maxsize,
+                "submitted": self.submitted,
+                "flushed": self.flushed,
+                "dropped": self.dropped,
+                "spilled": self.spilled,
+                "rejected": self.rejected,
+                "batches": self.batches,
+                "avg_batch_size": round(self.flushed / self.batches, 2) if self.batches else 0.0,
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "last_flush_ms": round(self.last_flush_ms, 3),
+                "max_flush_ms": round(self.max_flush_ms, 3),
+                "avg_flush_ms": round(self._flush_ms_total / self.batches, 3) if self.batches else 0.0,
+            }
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Background refreshes of every cache share these few threads.
+_REFRESH_WORKERS = 2
+_refresh_executor: Optional[ThreadPoolExecutor] = None
+_refresh_lock = threading.Lock()
+
+
+def _get_refresh_executor() -> ThreadPoolExecutor:
+    global _refresh_executor
+    if _refresh_executor is None:
+        with _refresh_lock:
+            if _refresh_executor is None:
+                _refresh_executor = ThreadPoolExecutor(
+                    max_workers=_REFRESH_WORKERS, thread_name_prefix="fraudshield-cache-refresh"
+                )
+    return _refresh_executor
+
+
+@dataclass
+class _Entry(Generic[V]):
+    value: V
+    computed_at: float
+    generation: int
+
+
+class SingleFlightCache(Generic[K, V]):
+    """Small TTL cache for expensive, read-mostly computations.
+
+    - fresh (age < min_fresh_s, or age < ttl_s and generation unchanged): served from cache
+    - stale (expired, or `generation()` moved on) but age < ttl_s + stale_s: the old value
+      is served immediately while one background refresh recomputes it
+    - missing / too old: computed inline; concurrent callers for the same key share that
+      single computation instead of each running it
+
+    `generation` is an optional callable returning a counter that changes whenever the
+    underlying data changes (used for invalidation). A busy writer can move it on every
+    few milliseconds, so a change only ends freshness once the entry is `min_fresh_s`
+    old: it shortens the TTL, it never turns the cache off.
+    """
+
+    def __init__(
+        self,
+        compute: Callable[[K], V],
+        ttl_s: float,
+        stale_s: float = 0.0,
+        generation: Optional[Callable[[], int]] = None,
+        name: str = "cache",
+        min_fresh_s: float = 0.0,
+    ) -> None:
+        self._compute = compute
+        self.ttl_s = float(ttl_s)
+        self.stale_s = float(stale_s)
+        self.min_fresh_s = min(float(min_fresh_s), self.ttl_s)
+        self._generation = generation or (lambda: 0)
+        self.name = name
+
+        self._entries: Dict[K, _Entry[V]] = {}
+        self._inflight: Dict[K, "Future[V]"] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def get(self, key: K) -> V:
+        now = time.monotonic()
+        gen = self._generation()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.computed_at
+                if age < self.min_fresh_s or (age < self.ttl_s and entry.generation == gen):
+                    self.hits += 1
+                    return entry.value
+                if age < self.ttl_s + self.stale_s:
+                    self.stale_hits += 1
+                    if key not in self._inflight:
+                        self._inflight[key] = Future()
+                        self.refreshes += 1
+                        _get_refresh_executor().submit(self._run, key, gen)
+                    return entry.value
+
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                fut = Future()
+                self._inflight[key] = fut
+                self.misses += 1
+                owner = True
+
+        if owner:
+            self._run(key, gen)
+        return fut.result()
+
+    def _run(self, key: K, gen: int) -> None:
+        with self._lock:
+            fut = self._inflight[key]
+        try:
+            value = self._compute(key)
+        except BaseException as e:
+            with self._lock:
+                self.errors += 1
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            return
+
+        with self._lock:
+            self._entries[key] = _Entry(value=value, computed_at=time.monotonic(), generation=gen)
+            self._inflight.pop(key, None)
+        fut.set_result(value)
+
+    def invalidate(self, key: Optional[K] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "ttl_s": self.ttl_s,
+                "min_fresh_s": self.min_fresh_s,
+                "stale_s": self.stale_s,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+                "hit_ratio": round((self.hits + self.stale_hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            }
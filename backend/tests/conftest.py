@@ -0,0 +1,12 @@
+import os
+import tempfile
+
+# Keep test runs away from the developer's working DB, logs and model registry.
+# Must run before `fraudshield.core.settings` is imported (settings are cached).
+_TMP = tempfile.mkdtemp(prefix="fraudshield-tests-")
+os.environ.setdefault("FRAUDSHIELD_DB_PATH", os.path.join(_TMP, "fraudshield_core.db"))
+os.environ.setdefault("LOGS_PATH", os.path.join(_TMP, "logs"))
+os.environ.setdefault("MODEL_REGISTRY_PATH", os.path.join(_TMP, "models"))
+os.environ.setdefault("REPORTS_PATH", os.path.join(_TMP, "reports"))
+os.environ.setdefault("SIMILARITY_INDEX_PATH", os.path.join(_TMP, "similarity"))
+os.environ.setdefault("DRIFT_PATH", os.path.join(_TMP, "drift"))
@@ -0,0 +1,27 @@
+import asyncio
+
+from fraudshield.core import async_workflow as A
+from fraudshield.core.workflow import decision_only
+from fraudshield.data.db import seed_demo
+
+
+def test_async_decision_matches_sync_and_respects_limit(monkeypatch):
+    seed_demo()
+    monkeypatch.setattr(A.settings(), "decision_max_concurrency", 2)
+    monkeypatch.setattr(A, "_limiter", None)
+    monkeypatch.setattr(A, "_max_in_flight", 0)
+
+    async def run():
+        return await asyncio.gather(*(A.decision_only_async("TX-999") for _ in range(8)),
+                                    A.decision_only_async("TX-NOPE"),
+                                    A.case_context_async("TX-999"))
+
+    *outs, missing, case = asyncio.run(run())
+    single = decision_only("TX-999")
+    for out in outs:
+        for key in ("decision", "risk_score", "model_version", "reason_codes", "rule_hits"):
+            assert out[key] == single[key]
+    assert len({o["decision_event_id"] for o in outs}) == 8
+    assert missing == {"transaction_id": "TX-NOPE", "error": "transaction_not_found"}
+    assert case["transaction"]["trans_id"] == "TX-999" and "kyc" in case
+    assert A.async_runtime_stats()["max_in_flight"] <= 2
@@ -0,0 +1,81 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from fraudshield.util.batching import GroupCommitWorker
+
+from fraudshield.governance import audit
+from fraudshield.governance.audit import (
+    append_audit_jsonl,
+    audit_writer_stats,
+    start_audit_writer,
+    stop_audit_writer,
+)
+
+
+def test_async_audit_writer_group_commits_and_drains_on_stop():
+    start_audit_writer()
+
+    def _write(i):
+        return append_audit_jsonl(f"TX-AW-{i}", "ALLOW", 0.1, "test", [], [])
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        paths = set(ex.map(_write, range(500)))
+    stats = audit_writer_stats()
+    stop_audit_writer()
+
+    (path,) = paths
+    with open(path, encoding="utf-8") as f:
+        ids = {json.loads(line)["transaction_id"] for line in f}
+    assert {f"TX-AW-{i}" for i in range(500)} <= ids
+    assert stats["running"] and stats["submitted"] == 500
+    assert not audit_writer_stats()["running"]
+
+
+def test_inline_fallback_shares_the_writer_handle(tmp_path, monkeypatch):
+    path = str(tmp_path / "decisions.jsonl")
+    sink = audit._AuditFileSink(path, "none")
+    monkeypatch.setattr(audit, "_sink", sink)
+    monkeypatch.setattr(audit, "_writer", None)
+    monkeypatch.setattr(audit, "_audit_path", lambda: path)
+
+    # Buffered handle (durability "none"): these records are still in its buffer.
+    for i in range(5):
+        sink.write([audit.build_audit_record(f"TX-BUF-{i}", "ALLOW", 0.1, "t", [], [])])
+    append_audit_jsonl("TX-INLINE", "DENY", 0.9, "t", [], [])  # fallback while the writer holds the handle
+    sink.close()
+
+    with open(path, encoding="utf-8") as f:
+        ids = [json.loads(line)["transaction_id"] for line in f]
+    assert ids == [f"TX-BUF-{i}" for i in range(5)] + ["TX-INLINE"]
+
+
+def test_inline_appends_create_the_log_dir_once_not_per_decision(tmp_path, monkeypatch):
+    logs = tmp_path / "logs"
+    monkeypatch.setattr(audit, "settings", lambda: SimpleNamespace(logs_path=str(logs)))
+    monkeypatch.setattr(audit, "_path", None)
+    monkeypatch.setattr(audit, "_sink", None)
+    monkeypatch.setattr(audit, "_writer", None)
+    calls, makedirs = [], audit.os.makedirs
+    monkeypatch.setattr(audit.os, "makedirs", lambda *a, **k: (calls.append(a), makedirs(*a, **k)))
+
+    for i in range(3):
+        path = append_audit_jsonl(f"TX-DIR-{i}", "ALLOW", 0.1, "t", [], [])
+    with open(path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+    assert len(calls) == 1  # the first open found the directory missing
+
+
+def test_failing_audit_flushes_are_retried_never_dropped():
+    written, failures = [], iter(range(3))
+
+    def flaky(batch):
+        if next(failures, None) is not None:
+            raise OSError("disk hiccup")
+        written.extend(batch)
+
+    w = GroupCommitWorker("test-audit", flush_fn=flaky, flush_interval_ms=1, max_retries=None).start()
+    for i in range(20):
+        assert w.submit(i)
+    w.stop()
+    assert sorted(written) == list(range(20)) and w.dropped == 0 and w.errors == 3
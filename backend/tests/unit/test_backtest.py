@@ -0,0 +1,35 @@
+import numpy as np
+
+from fraudshield.decisioning.backtest import BacktestData, backtest, rule_sets
+from fraudshield.decisioning.engine import RULE_CODES, DecisionEngine
+
+
+def test_grid_matches_decision_engine_at_every_point():
+    rng = np.random.default_rng(3)
+    n = 4000
+    data = BacktestData(
+        score=rng.random(n).round(2),  # lands exactly on grid thresholds too
+        rule_mask=rng.integers(0, 8, n).astype(np.uint8),
+        chargeback=rng.random(n) < 0.1,
+        chargeback_amount=rng.random(n) * 100,
+        amount=rng.random(n) * 500,
+    )
+    data = BacktestData(data.score, data.rule_mask, data.chargeback, data.chargeback_amount * data.chargeback, data.amount)
+    deny, challenge = [0.5, 0.8, 0.9], [0.3, 0.7, 0.95]
+    res = backtest(data, deny, challenge, rule_sets())
+
+    names = ("ip_is_proxy", "shipping_is_freight_forwarder", "ship_bill_mismatch")
+    codes = ("RULE_PROXY_SIGNAL", "RULE_FREIGHT_FORWARDER_SIGNAL", "RULE_SHIP_BILL_MISMATCH")
+    cols = {f: (data.rule_mask & (1 << RULE_CODES.index(c))) != 0 for f, c in zip(names, codes)}
+    for i, d in enumerate(deny):
+        for j, c in enumerate(challenge):
+            for k, rules in enumerate(res.rule_sets):
+                dec = DecisionEngine(d, c, rules).decide_batch(cols, data.score).decision
+                for code, arr in ((2, res.deny), (1, res.challenge), (0, res.allow)):
+                    sel = dec == code
+                    assert arr[i, j, k, 0] == sel.sum()
+                    assert np.isclose(arr[i, j, k, 2], data.chargeback_amount[sel].sum())
+
+    top = res.top(3, max_decline_rate=0.2)
+    assert top and all(p["decline_rate"] <= 0.2 for p in top)
+    assert top[0]["expected_loss"] <= top[-1]["expected_loss"]
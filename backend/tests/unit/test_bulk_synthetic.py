@@ -0,0 +1,51 @@
+from fraudshield.data.bulk import load_synthetic
+from fraudshield.data.pool import connection
+from fraudshield.data.synthetic import SyntheticConfig, generate
+
+
+def test_generator_is_deterministic_and_skewed():
+    cfg = SyntheticConfig(users=500, transactions=5000, seed=3, chunk_size=1000)
+    first, second = list(generate(cfg)), list(generate(cfg))
+    assert first == second
+    assert list(generate(SyntheticConfig(users=500, transactions=5000, seed=4, chunk_size=1000))) != first
+
+    txns = [r for table, rows in first if table == "transactions" for r in rows]
+    assert len(txns) == 5000
+    per_user = {}
+    for r in txns:
+        per_user[r[1]] = per_user.get(r[1], 0) + 1
+    assert max(per_user.values()) > 20 * (5000 / 500)  # heavy users
+
+
+def test_bulk_load_counts_and_restores_indexes():
+    with connection() as conn:
+        before = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND sql IS NOT NULL")}
+
+    report = load_synthetic(SyntheticConfig(users=200, transactions=2000, seed=1), truncate=True, commit_rows=700)
+    assert report["rows"]["transactions"] == 2000 and report["rows"]["users"] == 200
+    assert report["indexes_rebuilt"] >= 3
+
+    with connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 2000
+        after = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND sql IS NOT NULL")}
+    assert before <= after
+
+
+def test_reloading_without_truncate_does_not_duplicate_keyless_rows():
+    cfg = SyntheticConfig(users=200, transactions=2000, seed=5, fraud_rate=0.05)
+    tables = ("transactions", "chargebacks", "kyc_events", "disputes")
+
+    def counts():
+        with connection() as conn:
+            return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tables}
+
+    load_synthetic(cfg, truncate=True)
+    first = counts()
+    assert first["chargebacks"] > 0
+    report = load_synthetic(cfg)
+    assert counts() == first
+    assert report["synthetic"]["start"] == cfg.window_start
+
+    with connection() as conn:
+        latest = conn.execute("SELECT MAX(timestamp) FROM transactions").fetchone()[0]
+    assert latest >= cfg.window_start.replace("T", " ")
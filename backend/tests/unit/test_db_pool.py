@@ -0,0 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from fraudshield.data.pool import ConnectionPool
+
+
+def test_pool_reuses_connections_across_threads(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=2)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def _insert(i):
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO t VALUES (?)", (i,))
+
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        list(ex.map(_insert, range(50)))
+
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 50
+
+    st = pool.stats()
+    assert st["open_connections"] <= 2
+    assert st["checkouts"] == 52
+    assert st["in_use"] == 0
+    pool.close()
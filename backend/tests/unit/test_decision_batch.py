@@ -0,0 +1,16 @@
+from fraudshield.core.workflow import decision_batch, decision_only
+from fraudshield.data.db import seed_demo
+
+
+def test_batch_matches_single_and_reports_unknown_ids():
+    seed_demo()
+    out = decision_batch(["TX-999", "TX-NOPE", "TX-999"])
+    assert out["count"] == 3 and out["errors"] == 1
+
+    single = decision_only("TX-999")
+    first, missing, again = out["results"]
+    assert missing == {"transaction_id": "TX-NOPE", "error": "transaction_not_found"}
+    for item in (first, again):
+        for key in ("decision", "risk_score", "model_version", "reason_codes", "rule_hits"):
+            assert item[key] == single[key]
+    assert first["decision_event_id"] != again["decision_event_id"]
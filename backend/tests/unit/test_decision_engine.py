@@ -6,3 +6,22 @@ def test_rule_bias_to_challenge():
     out = engine.decide(features, risk_score=0.2)
     assert out["decision"] == "CHALLENGE"
     assert "RULE_PROXY_SIGNAL" in out["rule_hits"]
+
+
+def test_decide_batch_matches_decide_row_for_row():
+    import numpy as np
+
+    rng = np.random.default_rng(42)
+    n = 5000
+    cols = {
+        "ip_is_proxy": rng.random(n) < 0.3,
+        "shipping_is_freight_forwarder": rng.random(n) < 0.3,
+        "ship_bill_mismatch": rng.random(n) < 0.3,
+    }
+    scores = np.concatenate([rng.random(n - 4), [0.70, 0.90, np.nextafter(0.70, 0), 0.0]])
+
+    engine = DecisionEngine()
+    batch = engine.decide_batch(cols, scores)
+    for i in range(n):
+        row = {k: bool(v[i]) for k, v in cols.items()}
+        assert batch.row(i) == engine.decide(row, float(scores[i]))
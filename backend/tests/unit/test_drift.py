@@ -0,0 +1,36 @@
+import random
+
+from fraudshield.monitoring.drift import DRIFT_SLICES, DriftMonitor, ks, psi
+
+
+def _features(rng, amount_mu):
+    return {"amount": rng.lognormvariate(amount_mu, 1.0), "account_age_days": rng.randrange(3650),
+            "ip_reputation_score": rng.randrange(100), "ip_is_proxy": rng.random() < 0.1}
+
+
+def test_psi_ks_flag_shifted_amounts_and_window_expires(tmp_path):
+    rng = random.Random(0)
+    m = DriftMonitor(window_s=2400.0)
+    m.observe_many([_features(rng, 3.6) for _ in range(2000)], [rng.random() for _ in range(2000)], now=0.0)
+    m.freeze(now=0.0)
+    m.save_reference(str(tmp_path))
+
+    # Same population -> stable; amounts x e^1.5 -> drift on amount only.
+    m.observe_many([_features(rng, 3.6) for _ in range(2000)], [rng.random() for _ in range(2000)], now=5000.0)
+    assert m.report(now=5000.0)["features"]["amount"]["status"] == "ok"
+    m.observe_many([_features(rng, 5.1) for _ in range(2000)], [rng.random() for _ in range(2000)], now=5000.0)
+    report = m.report(now=5000.0)
+    assert report["drift_detected"] and report["drifted_features"] == ["amount"]
+
+    m.snapshot(str(tmp_path))
+    restored = DriftMonitor(window_s=2400.0)
+    assert restored.load(str(tmp_path))
+    assert restored.current(now=5000.0) == m.current(now=5000.0)
+    assert restored.reference["histograms"] == m.reference["histograms"]
+    # All slices older than the window -> empty current histograms.
+    assert sum(restored.current(now=5000.0 + 2400.0 * (1 + 1 / DRIFT_SLICES))["amount"]) == 0
+
+
+def test_psi_and_ks_are_zero_for_identical_distributions():
+    assert psi([10, 20, 30], [1, 2, 3]) == 0.0 and ks([10, 20, 30], [1, 2, 3]) == 0.0
+    assert ks([10, 0], [0, 10]) == 1.0
@@ -0,0 +1,52 @@
+from fraudshield.data.db import init_db
+from fraudshield.util.batching import GroupCommitWorker
+from fraudshield.data.pool import connection
+from fraudshield.governance import events
+from fraudshield.governance.events import (
+    event_sink_stats,
+    flush_events,
+    record_decision_event,
+    replay_spilled_events,
+    start_event_sink,
+    stop_event_sink,
+)
+
+
+def _count(ids):
+    with connection() as conn:
+        q = f"SELECT COUNT(*) FROM decision_events WHERE event_id IN ({','.join('?' * len(ids))})"
+        return conn.execute(q, ids).fetchone()[0]
+
+
+def test_batched_sink_returns_ids_immediately_and_flushes_on_stop():
+    init_db()
+    start_event_sink()
+    ids = [record_decision_event(f"TX-ES-{i}", "ALLOW", 0.1, "test") for i in range(300)]
+    assert len(set(ids)) == 300
+
+    assert flush_events(timeout=10)
+    assert _count(ids[:150]) == 150
+
+    more = [record_decision_event(f"TX-ES2-{i}", "DENY", 0.95, "test") for i in range(50)]
+    stop_event_sink()
+    assert _count(more) == 50
+    assert not event_sink_stats()["running"]
+
+
+def test_failed_batches_are_spilled_and_replayed_not_dropped(monkeypatch):
+    init_db()
+
+    def locked(rows):
+        raise RuntimeError("database is locked")
+
+    sink = GroupCommitWorker(
+        "test-events", flush_fn=locked, flush_interval_ms=1, max_retries=1, on_failure=events._spill_events
+    ).start()
+    monkeypatch.setattr(events, "_sink", sink)
+    ids = [record_decision_event(f"TX-SP-{i}", "ALLOW", 0.1, "test") for i in range(20)]
+    sink.stop()
+    assert sink.spilled == 20 and sink.dropped == 0 and _count(ids) == 0
+
+    assert replay_spilled_events() == 20
+    assert _count(ids) == 20
+    assert replay_spilled_events() == 0
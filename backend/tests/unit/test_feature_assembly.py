@@ -0,0 +1,27 @@
+from fraudshield.core.workflow import build_features
+from fraudshield.data.db import seed_demo
+from fraudshield.data.pool import connection
+from fraudshield.tools import enrichment as E
+
+
+def test_fused_features_match_enrichment_lookups():
+    seed_demo()
+    with connection() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO transactions VALUES (?,?,?,?,?,?,?,datetime('now', ?))",
+            [
+                ("TX-FA-1", "U105", 10.0, "Shop", "45.22.19.11", "A", "A", "-10 minutes"),
+                ("TX-FA-2", "U105", 20.0, "Shop", "45.22.19.11", "A", "A", "-5 hours"),
+            ],
+        )
+
+    f = build_features("TX-999")
+    hist = E.lookup_user_history("U105")["velocity"]
+    ip = E.lookup_ip_intel("45.22.19.11")["intel"]
+
+    assert f["txn_count_1h"] == hist["txn_count_1h"] >= 1
+    assert f["txn_count_24h"] == hist["txn_count_24h"] >= 2
+    assert f["ip_is_proxy"] is bool(ip["is_proxy"])
+    assert f["ip_reputation_score"] == ip["reputation_score"]
+    assert f["shipping_is_freight_forwarder"] and f["ship_bill_mismatch"] and f["device_ip_mismatch"]
+    assert build_features("TX-DOES-NOT-EXIST")["_error"] == "transaction_not_found"
@@ -0,0 +1,41 @@
+import numpy as np
+
+from fraudshield.modeling.scoring import (
+    HEURISTIC_INPUTS,
+    _heuristic,
+    decode_reason_mask,
+    heuristic_columnar,
+)
+
+
+def _random_columns(rng, n):
+    # Mix continuous draws with the exact threshold/edge values used by the heuristic.
+    return {
+        "amount": np.where(rng.random(n) < 0.2, rng.choice([0.0, 4999.99, 5000.0, 12000.0], n), rng.uniform(0, 9000, n)),
+        "ip_is_proxy": rng.random(n) < 0.3,
+        "txn_count_1h": rng.integers(0, 15, n),
+        "account_age_days": np.where(rng.random(n) < 0.2, rng.choice([0, 364, 365, 366], n), rng.integers(0, 3000, n)),
+        "device_ip_mismatch": rng.random(n) < 0.5,
+        "shipping_is_freight_forwarder": rng.random(n) < 0.5,
+        "ship_bill_mismatch": rng.random(n) < 0.5,
+    }
+
+
+def test_columnar_heuristic_is_bit_identical_to_scalar():
+    for seed in range(5):
+        rng = np.random.default_rng(seed)
+        cols = _random_columns(rng, 4000)
+        # Force the "all six reasons" case so the top-5 truncation is exercised.
+        for name in HEURISTIC_INPUTS:
+            cols[name][0] = True if cols[name].dtype == bool else cols[name][0]
+        cols["amount"][0], cols["txn_count_1h"][0] = 6000.0, 9
+
+        scores, masks = heuristic_columnar(cols)
+        structured = np.rec.fromarrays([cols[k] for k in HEURISTIC_INPUTS], names=HEURISTIC_INPUTS)
+        s2, m2 = heuristic_columnar(structured)
+        assert np.array_equal(scores, s2) and np.array_equal(masks, m2)
+
+        for i in range(len(scores)):
+            ref = _heuristic({k: cols[k][i].item() for k in HEURISTIC_INPUTS})
+            assert scores[i].item() == ref.risk_score  # exact, not approx
+            assert decode_reason_mask(masks[i]) == ref.top_reason_codes
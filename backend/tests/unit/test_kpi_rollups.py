@@ -0,0 +1,31 @@
+import pytest
+
+from fraudshield.data.db import seed_demo
+from fraudshield.data.pool import connection
+from fraudshield.governance.events import record_decision_events
+from fraudshield.monitoring.kpis import compute_kpis
+from fraudshield.monitoring.rollups import rebuild_rollups
+
+
+def test_rollups_track_events_and_reconcile():
+    seed_demo()
+    with connection() as conn:
+        conn.execute("DELETE FROM transactions WHERE trans_id = 'KPI-1'")
+    before = compute_kpis(window_days=1)
+    record_decision_events([("TX-999", "DENY", 0.95, "kpi_test")] * 3 + [("TX-999", "ALLOW", 0.05, "kpi_test")])
+
+    after = compute_kpis(window_days=1)
+    assert after["total_events"] == before["total_events"] + 4
+    assert after["events_by_model_version"]["kpi_test"] == 4
+    # Re-deciding a transaction does not add its amount again; a new transaction does.
+    assert after["total_volume"] == before["total_volume"]
+    with connection() as conn:
+        conn.execute("INSERT INTO transactions(trans_id, user_id, amount) VALUES ('KPI-1', 'U105', 125.0)")
+    after = compute_kpis(window_days=1)
+    assert after["total_volume"] == pytest.approx(before["total_volume"] + 125.0)
+
+    rebuild_rollups()
+    rebuilt = compute_kpis(window_days=1)
+    for key in ("total_volume", "loss_rate_proxy"):
+        assert rebuilt.pop(key) == pytest.approx(after.pop(key))
+    assert rebuilt == after
@@ -0,0 +1,75 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from fraudshield.modeling.linear import export_linear, load_linear
+from fraudshield.modeling.scoring import MODEL_INPUTS
+
+
+def _data(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack(
+        [
+            rng.gamma(2.0, 400.0, n),
+            rng.integers(0, 2, n),
+            rng.poisson(2.0, n),
+            rng.integers(0, 1500, n),
+            rng.integers(0, 2, n),
+            rng.integers(0, 2, n),
+            rng.integers(0, 2, n),
+        ]
+    ).astype(float)
+    z = X[:, 0] / 1500 + 1.5 * X[:, 1] + 0.3 * X[:, 2] - X[:, 3] / 500 + rng.normal(0, 1, n)
+    return X, (z > 1.0).astype(int)
+
+
+def test_linear_artifact_matches_predict_proba(tmp_path):
+    pytest.importorskip("sklearn")
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = _data()
+    models = {
+        "lr": LogisticRegression(max_iter=1000),
+        "scaled": make_pipeline(StandardScaler(), LogisticRegression()),
+        "scaled_no_mean": make_pipeline(StandardScaler(with_mean=False), LogisticRegression()),
+        "scaled_no_std": make_pipeline(StandardScaler(with_std=False), LogisticRegression(max_iter=1000)),
+        "calibrated": CalibratedClassifierCV(
+            make_pipeline(StandardScaler(), LogisticRegression()), method="sigmoid", cv=3, ensemble=False
+        ),
+    }
+    for name, model in models.items():
+        model.fit(X, y)
+        path = str(tmp_path / f"{name}.linear.json")
+        export_linear(model, path)
+        linear = load_linear(path, expected_features=MODEL_INPUTS)
+
+        expected = model.predict_proba(X)
+        np.testing.assert_allclose(linear.predict_proba(X), expected, rtol=0, atol=1e-12)
+        single = [linear.predict_one(row) for row in X[:50].tolist()]
+        np.testing.assert_allclose(single, expected[:50, 1], rtol=0, atol=1e-12)
+
+
+def test_linear_artifact_loads_without_sklearn(tmp_path):
+    pytest.importorskip("sklearn")
+    from sklearn.linear_model import LogisticRegression
+
+    X, y = _data()
+    path = str(tmp_path / "m.linear.json")
+    export_linear(LogisticRegression(max_iter=1000).fit(X, y), path)
+
+    code = (
+        "import sys\n"
+        "from fraudshield.modeling.holder import _load_artifact\n"
+        f"m = _load_artifact({path!r})\n"
+        "m.predict_one([100, 0, 1, 30, 0, 0, 0])\n"
+        "assert 'sklearn' not in sys.modules and 'joblib' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    with pytest.raises(ValueError):
+        load_linear(path, expected_features=list(reversed(MODEL_INPUTS)))
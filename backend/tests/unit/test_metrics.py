@@ -0,0 +1,69 @@
+import os
+import threading
+import time
+
+from fraudshield.monitoring.metrics import Counter, Histogram, Registry
+
+# Instrumentation done per /decision: 6 timed stages (2 perf_counter calls + 1 observe
+# each) + 1 decision counter, typically ~5µs. The default budget is deliberately loose so
+# slow or shared runners do not flake; tighten it locally with the env var.
+_OVERHEAD_BUDGET_US = float(os.getenv("FRAUDSHIELD_METRICS_OVERHEAD_BUDGET_US", "100"))
+
+
+def test_histogram_and_counter_render_prometheus_text():
+    reg = Registry()
+    h = reg.register(Histogram("t_seconds", "Test.", ("stage",), buckets=(0.001, 0.01)))
+    c = reg.register(Counter("t_total", "Test.", ("decision",)))
+    for v in (0.0005, 0.001, 0.005, 0.5):
+        h.observe(v, "score")
+    c.inc("ALLOW")
+    c.inc("ALLOW", amount=2)
+
+    text = reg.render()
+    assert 't_seconds_bucket{stage="score",le="0.001"} 2' in text
+    assert 't_seconds_bucket{stage="score",le="0.01"} 3' in text
+    assert 't_seconds_bucket{stage="score",le="+Inf"} 4' in text
+    assert 't_seconds_count{stage="score"} 4' in text
+    assert 't_total{decision="ALLOW"} 3' in text
+    assert "# TYPE t_seconds histogram" in text
+
+
+def test_per_request_instrumentation_overhead_within_budget():
+    h = Histogram("o_seconds", "Overhead.", ("path", "stage"))
+    c = Counter("o_total", "Overhead.", ("api", "decision", "model_version"))
+    stages = ("features", "score", "rules", "event", "audit", "total")
+    n = 20_000
+
+    best = float("inf")
+    for _ in range(3):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            for st in stages:
+                t = time.perf_counter()
+                h.observe(time.perf_counter() - t, "decision", st)
+            c.inc("decision", "ALLOW", "heuristic_baseline_v2")
+        best = min(best, (time.perf_counter() - t0) / n * 1e6)
+    assert best < _OVERHEAD_BUDGET_US, f"{best:.2f}µs per request"
+
+
+def test_shards_of_exited_threads_are_folded_not_kept():
+    c = Counter("s_total", "Shards.", ("k",))
+    h = Histogram("s_seconds", "Shards.", buckets=(0.01,))
+
+    def work() -> None:
+        c.inc("a")
+        h.observe(0.005)
+
+    for _ in range(50):
+        batch = [threading.Thread(target=work) for _ in range(4)]
+        for t in batch:
+            t.start()
+        for t in batch:
+            t.join()
+
+    assert c.value("a") == 200
+    assert h.count() == 200
+    # Every recording thread has exited; only shards of live threads survive a read.
+    assert len(c._shards) <= 1 and len(h._shards) <= 1
+    c.inc("a")
+    assert c.value("a") == 201
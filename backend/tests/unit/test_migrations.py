@@ -0,0 +1,23 @@
+import sqlite3
+
+from fraudshield.data.migrations import LATEST_VERSION, current_version, migrate
+
+
+def test_migrations_upgrade_legacy_db_and_are_idempotent(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "legacy.db"))
+    # A DB created by the old init_db: tables, no schema_version, no indexes.
+    conn.execute("CREATE TABLE transactions (trans_id TEXT PRIMARY KEY, user_id TEXT, amount REAL, "
+                 "merchant TEXT, device_ip TEXT, shipping_addr TEXT, billing_addr TEXT, timestamp DATETIME)")
+    conn.execute("INSERT INTO transactions VALUES ('T1','U1',1.0,'m','ip','a','b','2024-01-01 00:00:00')")
+    conn.commit()
+
+    assert migrate(conn) == list(range(1, LATEST_VERSION + 1))
+    assert migrate(conn) == []
+    assert current_version(conn) == LATEST_VERSION
+    assert conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 1
+
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM transactions WHERE user_id = ? AND timestamp >= ?",
+        ("U1", "2024-01-01"),
+    ).fetchall()
+    assert "idx_transactions_user_ts" in " ".join(str(r) for r in plan)
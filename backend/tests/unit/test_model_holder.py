@@ -0,0 +1,67 @@
+import os
+import time
+
+import pytest
+
+from fraudshield.core.settings import settings
+from fraudshield.modeling.holder import ModelHolder
+from fraudshield.modeling.registry import set_latest
+
+
+def test_holder_loads_once_and_hot_swaps(tmp_path):
+    joblib = pytest.importorskip("joblib")
+    pytest.importorskip("sklearn")
+    from sklearn.dummy import DummyClassifier
+
+    holder = ModelHolder(reload_interval_s=3600)
+    try:
+        for version in ("v1", "v2"):
+            model = DummyClassifier(strategy="prior").fit([[0], [1]], [0, 1])
+            path = str(tmp_path / f"{version}.joblib")
+            joblib.dump(model, path)
+            set_latest(path, version)
+            if version == "v1":
+                first = holder.get()
+                assert first.model_version == "v1"
+                assert holder.get() is first  # resident, no reload within the interval
+            else:
+                assert holder.get() is first  # pointer not re-checked yet
+                assert holder.reload().model_version == "v2"
+
+        assert holder.stats()["loads"] == 2
+    finally:
+        os.remove(os.path.join(settings().model_registry_path, "latest.json"))
+
+
+def test_hot_reload_happens_off_the_calling_thread(tmp_path, monkeypatch):
+    joblib = pytest.importorskip("joblib")
+    pytest.importorskip("sklearn")
+    from sklearn.dummy import DummyClassifier
+
+    from fraudshield.modeling import holder as holder_mod
+
+    holder = ModelHolder(reload_interval_s=0.0)
+    try:
+        for version in ("v1", "v2"):
+            path = str(tmp_path / f"{version}.joblib")
+            joblib.dump(DummyClassifier(strategy="prior").fit([[0], [1]], [0, 1]), path)
+            set_latest(path, version)
+            if version == "v1":
+                assert holder.get().model_version == "v1"  # first load: inline
+
+        real_load = holder_mod._load_artifact
+
+        def slow_load(path):
+            time.sleep(0.3)
+            return real_load(path)
+
+        monkeypatch.setattr(holder_mod, "_load_artifact", slow_load)
+        t0 = time.perf_counter()
+        assert holder.get().model_version == "v1"  # keeps serving while v2 loads
+        assert time.perf_counter() - t0 < 0.1
+        deadline = time.monotonic() + 5
+        while holder.get().model_version != "v2" and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert holder.get().model_version == "v2"
+    finally:
+        os.remove(os.path.join(settings().model_registry_path, "latest.json"))
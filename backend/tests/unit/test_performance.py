@@ -0,0 +1,37 @@
+import random
+
+from fraudshield.data.db import init_db
+from fraudshield.data.pool import connection
+from fraudshield.monitoring.performance import compute_performance
+
+
+def test_label_join_metrics_and_curves_match_brute_force():
+    init_db()
+    rng = random.Random(1)
+    events, cbs = [], []
+    for i in range(3000):
+        fraud = rng.random() < 0.1
+        score = round(min(1.0, max(0.0, rng.gauss(0.7 if fraud else 0.3, 0.15))), 4)
+        events.append((f"PERF-E{i}", f"PERF-T{i}", "DENY" if score >= 0.6 else "ALLOW", score, "perf_v1", "2030-01-01 00:00:00"))
+        if fraud:
+            cbs.append((f"PERF-T{i}", 100.0 + i, "10.4", "2030-02-01"))
+    with connection() as conn:
+        conn.executemany("INSERT INTO decision_events VALUES (?, ?, ?, ?, ?, ?)", events)
+        conn.executemany("INSERT INTO chargebacks VALUES (?, ?, ?, ?)", cbs)
+        conn.commit()
+
+    out = compute_performance(since="2030-01-01 00:00:00", chunk_rows=700, max_curve_points=None)
+    m = out["models"]["perf_v1"]
+    assert m["events"] == 3000 and m["positives"] == len(cbs)
+
+    fraud = {t for t, *_ in cbs}
+    flagged = [e for e in events if e[3] >= 0.6]
+    tp = sum(e[1] in fraud for e in flagged)
+    op = m["operating_points"]["deny"]
+    assert op["flagged"] == len(flagged) and abs(op["precision"] - tp / len(flagged)) < 1e-9
+
+    c = m["curves"]
+    i = max(j for j, t in enumerate(c["threshold"]) if t >= 0.6)  # lowest threshold still >= 0.6
+    assert abs(c["recall"][i] - tp / len(cbs)) < 1e-6
+    assert c["recall"][-1] == 1.0 and c["fpr"][-1] == 1.0 and c["loss_capture"][-1] == 1.0
+    assert 0.9 < m["auc_roc"] <= 1.0
@@ -0,0 +1,54 @@
+import pytest
+
+from fraudshield.data.db import init_db
+from fraudshield.data.pool import connection
+from fraudshield.modeling.registry import get_challengers, load_versions, register_model, set_challengers
+from fraudshield.modeling.scoring import HEURISTIC_VERSION
+from fraudshield.modeling.shadow import ShadowScorer, compare_shadow
+
+
+def _items(n):
+    return [(f"SH-E{i}", {"trans_id": f"SH-T{i}", "amount": 10.0 * i, "ip_is_proxy": i % 2}, "champ_v1", 0.5)
+            for i in range(n)]
+
+
+def test_challengers_are_scored_off_path_and_saved_next_to_events(tmp_path):
+    joblib = pytest.importorskip("joblib")
+    pytest.importorskip("sklearn")
+    from sklearn.dummy import DummyClassifier
+
+    init_db()
+    path = str(tmp_path / "dummy.joblib")
+    joblib.dump(DummyClassifier(strategy="prior").fit([[0] * 7, [1] * 7], [0, 1]), path)
+    register_model(path, "dummy_v1")
+    assert "dummy_v1" in load_versions()["versions"]
+    set_challengers(["dummy_v1", HEURISTIC_VERSION])
+    try:
+        scorer = ShadowScorer(sample_rate=1.0, workers=2, budget_ms=10_000).start()
+        assert scorer.submit(_items(50)) == 50
+        scorer.stop()
+        assert scorer.scored == 100 and scorer.dropped_budget == 0
+
+        with connection() as conn:
+            rows = conn.execute(
+                "SELECT model_version, COUNT(*) FROM shadow_scores WHERE event_id LIKE 'SH-E%' GROUP BY 1"
+            ).fetchall()
+        assert dict(rows) == {"dummy_v1": 50, HEURISTIC_VERSION: 50}
+        compared = {c["model_version"]: c for c in compare_shadow(24)["challengers"]}
+        assert compared["dummy_v1"]["shadowed"] >= 50 and compared["dummy_v1"]["mean_abs_delta"] == 0.0
+
+        # Overload and budget: work is dropped, never waited for.
+        busy = ShadowScorer(sample_rate=1.0, queue_max=1)
+        busy.challengers.refresh()
+        busy.running = True  # accept submits without workers draining the queue
+        # The request path only samples and enqueues; registry checks / loads stay in workers.
+        busy.challengers.refresh = lambda: pytest.fail("submit must not refresh challengers")
+        busy.submit(_items(3))
+        assert busy.submit(_items(3)) == 0 and busy.dropped_overload == 3
+        late = ShadowScorer(sample_rate=1.0, budget_ms=0.0).start()
+        late.submit(_items(5))
+        late.stop()
+        assert late.scored == 0 and late.dropped_budget == 5
+    finally:
+        set_challengers([])
+    assert get_challengers() == []
@@ -0,0 +1,102 @@
+import shutil
+
+import numpy as np
+
+from fraudshield.core.settings import settings
+from fraudshield.tools.similarity import (
+    DIM,
+    SimilarityIndex,
+    close_similarity_index,
+    feature_vector,
+    flush_similarity_writer,
+    get_similarity_index,
+    index_decisions,
+    publish,
+    similarity_writer_stats,
+    start_similarity_writer,
+    stop_similarity_writer,
+)
+
+
+def test_exact_and_ivf_search_match_brute_force_and_survive_reopen(tmp_path):
+    rng = np.random.default_rng(0)
+    vecs = rng.random((5000, DIM), dtype=np.float32)
+    ids = [f"T{i}" for i in range(len(vecs))]
+
+    idx = SimilarityIndex.create(str(tmp_path))
+    idx.add(ids[:3000], vecs[:3000])
+    idx.add(ids[3000:], vecs[3000:])  # grows the memmap
+    q = vecs[42]
+    brute = np.argsort(((vecs - q) ** 2).sum(1))[1:6]
+    assert [t for t, _ in idx.search(q, k=5, exclude="T42")] == [ids[i] for i in brute]
+
+    idx.train_ivf(nlist=16)
+    idx.nprobe = 16  # all lists -> exact
+    assert [t for t, _ in idx.search(q, k=5, exclude="T42")] == [ids[i] for i in brute]
+
+    # Incremental insert lands in an IVF list; overwrite keeps one row per ID.
+    idx.add(["NEW", "T7"], np.stack([q, q]))
+    idx.close()
+    idx = SimilarityIndex.open(str(tmp_path))
+    assert idx.count == 5001 and idx.stats()["mode"] == "ivf"
+    top = {t for t, d in idx.search(q, k=3) if d < 1e-3}
+    assert top == {"T42", "NEW", "T7"}
+
+
+def test_feature_vector_is_bounded():
+    v = feature_vector({"amount": 1e6, "account_age_days": 3650, "ip_reputation_score": 90, "ip_is_proxy": 1})
+    assert len(v) == DIM and all(0.0 <= x <= 1.5 for x in v)
+
+
+def test_rebuild_swaps_generations_and_old_handle_cannot_clobber(tmp_path):
+    rng = np.random.default_rng(1)
+    root = str(tmp_path)
+
+    first = SimilarityIndex.create(str(tmp_path / "gen-1"))
+    first.add([f"A{i}" for i in range(3000)], rng.random((3000, DIM), dtype=np.float32))
+    first.save()
+    publish(root, first.path)
+    live = SimilarityIndex.open(root)  # e.g. the running API
+
+    rebuilt = SimilarityIndex.create(str(tmp_path / "gen-2"))
+    rebuilt.add([f"B{i}" for i in range(10)], rng.random((10, DIM), dtype=np.float32))
+    rebuilt.save()
+    publish(root, rebuilt.path)
+
+    live.add(["LATE"], rng.random((1, DIM), dtype=np.float32))
+    assert live.save() is False and live.stale
+    live.close()
+
+    idx = SimilarityIndex.open(root)
+    assert idx.path == rebuilt.path and idx.count == 10
+    assert len(idx.search(rng.random(DIM, dtype=np.float32), k=5)) == 5
+
+
+def test_one_writer_per_generation_and_adds_run_on_the_background_writer(tmp_path):
+    # A second handle on the same generation (e.g. another uvicorn worker) is read-only.
+    first = SimilarityIndex.create(str(tmp_path / "gen-1"))
+    other = SimilarityIndex.open(str(tmp_path / "gen-1"))
+    assert first.writable and not other.writable
+    assert other.add(["X"], np.zeros((1, DIM), dtype=np.float32)) == 0 and other.save() is False
+    first.close()
+    other.close()
+    reopened = SimilarityIndex.open(str(tmp_path / "gen-1"))
+    assert reopened.writable  # closing the writer released write.lock
+    reopened.close()
+
+    root = settings().similarity_index_path
+    gen = SimilarityIndex.create(f"{root}/gen-test")
+    gen.close()
+    publish(root, gen.path)
+    close_similarity_index()
+    start_similarity_writer()
+    try:
+        index_decisions([{"trans_id": f"D{i}", "amount": 10.0 * i} for i in range(5)])
+        assert flush_similarity_writer(5.0)
+        idx = get_similarity_index()
+        assert idx is not None and idx.writable and idx.count == 5
+        assert similarity_writer_stats()["flushed"] == 5
+    finally:
+        stop_similarity_writer()
+        close_similarity_index()
+        shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,51 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fraudshield.util.cache import SingleFlightCache
+
+
+def test_coalesces_concurrent_misses_and_invalidates_on_generation():
+    calls = []
+    gen = [0]
+
+    def compute(key):
+        calls.append(key)
+        time.sleep(0.05)
+        return {"key": key, "n": len(calls)}
+
+    cache = SingleFlightCache(compute, ttl_s=60, stale_s=60, generation=lambda: gen[0])
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        results = list(ex.map(cache.get, [30] * 16))
+    assert len(calls) == 1 and all(r is results[0] for r in results)
+    first = cache.stats()
+    assert first["misses"] == 1 and first["coalesced"] + first["hits"] == 15
+
+    assert cache.get(30) is results[0]  # fresh hit
+    gen[0] += 1                          # new events landed
+    assert cache.get(30) is results[0]  # stale value served while refreshing
+    deadline = time.time() + 2
+    while cache.get(30)["n"] != 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get(30)["n"] == 2
+
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_constant_generation_bumps_only_shorten_the_ttl():
+    calls = []
+    gen = [0]
+
+    def compute(key):
+        calls.append(key)
+        return len(calls)
+
+    def bumped():
+        gen[0] += 1  # an event flush between every poll
+        return gen[0]
+
+    cache = SingleFlightCache(compute, ttl_s=60, stale_s=60, generation=bumped, min_fresh_s=30)
+    cache.get(7)
+    for _ in range(100):
+        assert cache.get(7) == 1
+    stats = cache.stats()
+    assert stats["hits"] == 100 and stats["refreshes"] == 0 and len(calls) == 1
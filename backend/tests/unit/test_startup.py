@@ -0,0 +1,83 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from fraudshield.core.settings import settings
+from fraudshield.core.warmup import warm_up
+from fraudshield.data.db import init_db
+from fraudshield.data.pool import get_pool
+from fraudshield.data.rows import fetch_one
+from fraudshield.monitoring.metrics import SCORING_FALLBACKS, STAGE_SECONDS
+
+# Cold `import fraudshield.api.main`, best of 3, measured with `python -X importtime`.
+# The total includes FastAPI / pydantic (~0.4s locally); the own-code budget covers
+# modules under `fraudshield.*` only. Both leave headroom for slow, shared CI runners.
+_IMPORT_BUDGET_MS = float(os.getenv("FRAUDSHIELD_IMPORT_BUDGET_MS", "1500"))
+_OWN_IMPORT_BUDGET_MS = float(os.getenv("FRAUDSHIELD_OWN_IMPORT_BUDGET_MS", "400"))
+
+# Loaded on first use of the KPI / ML / investigation paths, never by the API import.
+_LAZY = ("pandas", "numpy", "sklearn", "joblib", "crewai", "openai", "ibm_watsonx_ai", "langchain")
+
+
+def _importtime(module: str):
+    """(total_us, fraudshield self us, top-level packages imported) for one cold import."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    ).stderr
+    total, own, packages = 0, 0, set()
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        packages.add(name.split(".")[0])
+        if name.startswith("fraudshield"):
+            own += int(self_us)
+        if name == module:
+            total = int(cumulative_us)
+    return total, own, packages
+
+
+def test_api_import_stays_lazy_and_within_budget():
+    runs = [_importtime("fraudshield.api.main") for _ in range(3)]
+
+    leaked = sorted(set(_LAZY) & runs[0][2])
+    assert not leaked, f"heavy modules imported by fraudshield.api.main: {leaked}"
+
+    total_ms = min(r[0] for r in runs) / 1000.0
+    own_ms = min(r[1] for r in runs) / 1000.0
+    assert total_ms < _IMPORT_BUDGET_MS, f"api import took {total_ms:.0f}ms"
+    assert own_ms < _OWN_IMPORT_BUDGET_MS, f"fraudshield modules took {own_ms:.0f}ms to import"
+
+
+def test_warm_up_preloads_pool_without_recording_decisions():
+    init_db()
+    before = fetch_one("SELECT COUNT(*) AS n FROM decision_events")["n"]
+    scored = STAGE_SECONDS.count("decision", "score")
+    fallbacks = SCORING_FALLBACKS.value("no_model")
+
+    report = warm_up()
+
+    assert not report["errors"], report["errors"]
+    assert set(report["steps_ms"]) >= {"db_pool", "model", "decision"}
+    assert get_pool().stats()["idle"] >= 1
+    assert fetch_one("SELECT COUNT(*) AS n FROM decision_events")["n"] == before
+    assert STAGE_SECONDS.count("decision", "score") == scored
+    assert SCORING_FALLBACKS.value("no_model") == fallbacks
+
+
+def test_invalid_decision_rules_fail_at_startup(monkeypatch):
+    from fraudshield.api.main import app
+
+    monkeypatch.setattr(settings(), "decision_rules", "RULE_PROXY_SIGNAL,RULE_TYPO")
+
+    async def boot():
+        async with app.router.lifespan_context(app):
+            pass
+
+    with pytest.raises(ValueError, match="RULE_TYPO"):
+        asyncio.run(boot())
@@ -0,0 +1,47 @@
+import io
+import json
+
+from fraudshield.streaming.pipeline import run_stream
+from fraudshield.streaming.sources import to_transaction_row
+
+
+def test_stream_decides_upserts_and_resumes_from_checkpoint(tmp_path):
+    src = tmp_path / "feed.jsonl"
+    recs = [
+        {"trans_id": f"ST-{i}", "user_id": "U-ST", "amount": 100 + i, "device_ip": "10.0.0.1",
+         "shipping_addr": "A", "billing_addr": "A", "timestamp": "2024-01-01 00:00:00"}
+        for i in range(5)
+    ]
+    src.write_text("\n".join(json.dumps(r) for r in recs[:3]) + "\n{not json}\n")
+    ckpt = str(tmp_path / "feed.ckpt")
+
+    out = io.StringIO()
+    report = run_stream(str(src), out, batch_size=2, checkpoint_path=ckpt)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert report["rows"] == 4 and report["errors"] == 1 and report["batches"] == 2
+    assert [r["offset"] for r in lines] == [0, 1, 2, 3]
+    assert lines[0]["transaction_id"] == "ST-0" and lines[0]["decision"] in ("ALLOW", "CHALLENGE", "DENY")
+    assert lines[3]["error"] == "invalid_json"
+    assert set(report["stages_s"]) >= {"read", "upsert", "features", "score", "persist", "write"}
+
+    # Appended records: only the new ones are processed on resume.
+    with open(src, "a") as f:
+        f.write("\n".join(json.dumps(r) for r in recs[3:]) + "\n")
+    out = io.StringIO()
+    report = run_stream(str(src), out, batch_size=2, checkpoint_path=ckpt)
+    assert report["resumed_from"] == 4 and report["rows"] == 2
+    assert [json.loads(line)["transaction_id"] for line in out.getvalue().splitlines()] == ["ST-3", "ST-4"]
+
+
+def test_feed_timestamps_are_stored_as_utc_sqlite_text():
+    def ts(value):
+        row, err = to_transaction_row({"trans_id": "TS-1", "amount": 1, "timestamp": value})
+        return err or row[-1]
+
+    # ISO "T"/"Z" would otherwise sort after datetime('now', ...) strings and escape windows.
+    assert ts("2026-10-17T12:00:00Z") == "2026-10-17 12:00:00"
+    assert ts("2026-10-17T14:30:00+02:00") == "2026-10-17 12:30:00"
+    assert ts("2026-10-17 12:00:00") == "2026-10-17 12:00:00"
+    assert ts(1792238400) == "2026-10-17 12:00:00"
+    assert ts("17/10/2026") == "invalid_timestamp"
+    assert len(ts("")) == 19  # missing: ingest time